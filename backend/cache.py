@@ -0,0 +1,279 @@
+# backend/cache.py
+"""
+Two-tier cache shared by daily payloads, quotes, stats and user resolution.
+
+    daily_cache = Cache("daily", default_ttl=600)
+    payload = daily_cache.get_or_load(f"{subject}:{day}", lambda: build(...))
+
+Tier 1 is an in-process LRU with per-key TTLs. Tier 2 is optional: set
+REDIS_URL (any Redis-protocol server: redis, KeyDB, Dragonfly, or a local
+stand-in such as `fakeredis.TcpFakeServer` in tests) and all uvicorn
+workers share one copy. Local copies of shared entries live at most
+LOCAL_TTL_WITH_REDIS seconds so workers converge after a delete elsewhere,
+unless the invalidation bus (cache_bus.py) is connected: it evicts local
+copies on every worker as writes commit, so they keep their full TTL.
+
+get_or_load() is single-flight: concurrent misses for one key wait for a
+single loader in this process, and with Redis a short SET NX lock stops the
+other workers from stampeding the DB for the same key.
+
+Values go through JSON when Redis is on, so cache plain dicts/lists/numbers,
+never ORM objects. If Redis is unreachable the cache quietly runs local-only
+and retries the connection after REDIS_RETRY_SECONDS.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from metrics import register_cache
+
+log = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+LOCAL_TTL_WITH_REDIS = float(os.getenv("CACHE_LOCAL_TTL_WITH_REDIS", "5"))
+REDIS_RETRY_SECONDS = 30.0
+LOCK_MS = 5000      # how long a loader may hold the cross-worker lock
+WAIT_POLL = 0.05
+
+MISSING = object()
+
+
+class _RedisTier:
+    """Thin wrapper that turns connection errors into misses."""
+
+    def __init__(self, url: str):
+        self._url = url
+        self._client = None
+        self._down_until = 0.0
+
+    def _conn(self):
+        if time.monotonic() < self._down_until:
+            return None
+        if self._client is None:
+            try:
+                import redis  # optional dependency
+            except ImportError:
+                log.warning("REDIS_URL is set but the 'redis' package is missing; caches stay local")
+                self._down_until = float("inf")
+                return None
+            self._client = redis.Redis.from_url(self._url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        return self._client
+
+    def _failed(self, e: Exception):
+        log.warning("redis cache tier unavailable (%s); local-only for %.0fs", e, REDIS_RETRY_SECONDS)
+        self._down_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+    def call(self, op: str, *args, **kw):
+        conn = self._conn()
+        if conn is None:
+            return None
+        try:
+            return getattr(conn, op)(*args, **kw)
+        except Exception as e:
+            self._failed(e)
+            return None
+
+
+_redis: Optional[_RedisTier] = _RedisTier(REDIS_URL) if REDIS_URL else None
+
+# True while cache_bus.py delivers evictions to this worker
+_coherent = False
+
+
+def set_coherent(flag: bool):
+    global _coherent
+    _coherent = flag
+
+
+def is_coherent() -> bool:
+    return _coherent
+
+
+def _local_ttl(ttl: float) -> float:
+    return ttl if _coherent else min(ttl, LOCAL_TTL_WITH_REDIS)
+
+
+# namespace -> Cache, for flush-everything paths (admin edits, invalidation)
+_caches: dict[str, "Cache"] = {}
+
+
+class _Flight:
+    __slots__ = ("event", "value", "ok")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.ok = False
+
+
+class Cache:
+    def __init__(self, namespace: str, default_ttl: float = 60.0, max_entries: int = 10_000,
+                 shared: bool = True, snapshot_stamp: Optional[str] = None):
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.shared = shared and _redis is not None
+        # scalar SQL whose value changes when the cached data goes stale; set it
+        # to have the local tier saved/restored across restarts (cache_snapshot.py)
+        self.snapshot_stamp = snapshot_stamp
+
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()  # key -> (expires_at, value)
+        self._flights: dict[str, _Flight] = {}
+        self._epoch = 0  # bumped by delete()/forget()/clear(): loads that started earlier aren't kept
+        self.hits = self.misses = 0
+
+        _caches[namespace] = self
+        register_cache(namespace, lambda: (self.hits, self.misses))
+
+    def _rkey(self, key: str) -> str:
+        return f"crakk:{self.namespace}:{key}"
+
+    # ---------- local tier ----------
+
+    def _local_get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISSING
+            if item[0] <= time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return item[1]
+
+    def _local_set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def export_local(self) -> list[tuple[str, float, Any]]:
+        """Live local entries as (key, seconds left, value)."""
+        now = time.monotonic()
+        with self._lock:
+            return [(k, exp - now, v) for k, (exp, v) in self._data.items() if exp > now]
+
+    def import_local(self, entries) -> int:
+        """Restore export_local() output; keys already present are kept."""
+        n = 0
+        now = time.monotonic()
+        with self._lock:
+            for key, left, value in entries:
+                if left > 0 and key not in self._data:
+                    self._data[key] = (now + left, value)
+                    n += 1
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return n
+
+    # ---------- public API ----------
+
+    def get(self, key: str, default=MISSING):
+        value = self._local_get(key)
+        if value is MISSING and self.shared:
+            raw = _redis.call("get", self._rkey(key))
+            if raw is not None:
+                value = json.loads(raw)
+                self._local_set(key, value, _local_ttl(self.default_ttl))
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if self.shared:
+            _redis.call("set", self._rkey(key), json.dumps(value), px=max(int(ttl * 1000), 1))
+            self._local_set(key, value, _local_ttl(ttl))
+        else:
+            self._local_set(key, value, ttl)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            self._epoch += 1
+            for k in keys:
+                self._data.pop(k, None)
+        if self.shared and keys:
+            _redis.call("delete", *(self._rkey(k) for k in keys))
+
+    def forget(self, *keys: str):
+        """Drop keys from the local tier only (the shared copy was deleted by the writer)."""
+        with self._lock:
+            self._epoch += 1
+            for k in keys:
+                self._data.pop(k, None)
+
+    def clear(self):
+        """Drop the local tier (shared entries expire on their own TTL)."""
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None):
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            # someone in this process is already loading it
+            if flight.event.wait(LOCK_MS / 1000.0) and flight.ok:
+                return flight.value
+            return loader()
+
+        try:
+            value = self._load_shared(key, loader, ttl)
+            flight.value, flight.ok = value, True
+            return value
+        finally:
+            flight.event.set()
+            with self._lock:
+                self._flights.pop(key, None)
+
+    def _load_shared(self, key: str, loader: Callable[[], Any], ttl: Optional[float]):
+        lock_key = self._rkey(key) + ":lock"
+        acquired = False
+        if self.shared:
+            acquired = bool(_redis.call("set", lock_key, b"1", nx=True, px=LOCK_MS))
+            # another worker is loading: wait for its value instead of hitting the DB too
+            deadline = time.monotonic() + LOCK_MS / 1000.0
+            while not acquired and time.monotonic() < deadline and _redis.call("exists", lock_key):
+                time.sleep(WAIT_POLL)
+                raw = _redis.call("get", self._rkey(key))
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._local_set(key, value, _local_ttl(self.default_ttl if ttl is None else ttl))
+                    return value
+        epoch = self._epoch
+        try:
+            value = loader()
+            if self._epoch == epoch:
+                self.set(key, value, ttl)
+            # else: evicted while loading, so the value may predate the write
+            return value
+        finally:
+            if acquired:
+                _redis.call("delete", lock_key)
+
+
+def get_cache(namespace: str) -> Optional[Cache]:
+    return _caches.get(namespace)
+
+
+def clear_all():
+    for c in list(_caches.values()):
+        c.clear()
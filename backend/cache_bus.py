@@ -0,0 +1,201 @@
+# backend/cache_bus.py
+"""
+Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+Every uvicorn worker keeps its own local cache tier (cache.py), so a write in
+one worker (an admin edit, a re-seeded quote table, scripts/seed_daily.py
+overriding a rollout) leaves stale copies in the others. Writers announce the
+keys they made stale, in their own transaction:
+
+    cache_bus.notify(db, "daily", f"{subject}:{day}")
+    cache_bus.notify(db, "bundle")          # no keys: the whole namespace
+    db.commit()
+
+Postgres delivers the message only if that transaction commits, to every
+session LISTENing on the channel. Each worker runs one listener thread on its
+own connection and evicts the keys from its local tier (Cache.forget); the
+writer still deletes the shared Redis copy itself.
+
+Messages can be lost while a listener is disconnected, so on every drop and
+every reconnect the listener flushes all local caches. A heartbeat query
+catches dead connections that never report an error. While connected, local
+copies of shared entries keep their full TTL (cache.set_coherent); while not,
+they fall back to LOCAL_TTL_WITH_REDIS.
+
+Postgres + psycopg2 only: on other databases notify() is a no-op and the
+listener does not start.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import select
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import cache
+from db_routing import pin_primary
+from lifecycle import on_shutdown, on_startup
+from metrics import CACHE_BUS_CONNECTED, CACHE_BUS_FLUSHES, CACHE_BUS_MESSAGES
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "crakk_cache"
+ENABLED = os.getenv("CACHE_BUS", "1") != "0"
+HEARTBEAT_SECONDS = float(os.getenv("CACHE_BUS_HEARTBEAT", "15"))
+MAX_BACKOFF_SECONDS = 30.0
+MAX_PAYLOAD = 7900       # Postgres caps NOTIFY payloads at 8000 bytes
+MAX_KEYS = 500           # past this, evict the whole namespace instead
+POLL_SECONDS = 1.0       # how quickly stop() is noticed
+
+
+def _payload(namespace: str, keys) -> list[str]:
+    """JSON messages for `keys` in `namespace`, chunked under the payload cap."""
+    if not keys or len(keys) > MAX_KEYS:
+        return [json.dumps({"ns": namespace})]
+    out, chunk = [], []
+    for k in keys:
+        chunk.append(k)
+        if len(json.dumps({"ns": namespace, "keys": chunk})) > MAX_PAYLOAD:
+            if len(chunk) == 1:  # one huge key: evict everything instead
+                return [json.dumps({"ns": namespace})]
+            chunk.pop()
+            out.append(json.dumps({"ns": namespace, "keys": chunk}))
+            chunk = [k]
+    out.append(json.dumps({"ns": namespace, "keys": chunk}))
+    return out
+
+
+def notify(db: Session, namespace: str, *keys: str):
+    """Evict `keys` (every key when none are given) of cache `namespace` on all
+    workers once `db` commits. Call before the commit; a rollback drops it."""
+    if not ENABLED:
+        return
+    # a NOTIFY is a write: on a read-routed session it must go out (and commit)
+    # on the primary, a hot standby rejects it
+    pin_primary(db)
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for payload in _payload(namespace, sorted(set(keys))):
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+def apply(payload: str):
+    """Evict what one message names from this worker's local caches."""
+    try:
+        msg = json.loads(payload)
+        namespace = msg["ns"]
+    except (ValueError, KeyError, TypeError):
+        log.warning("ignoring malformed cache bus message %r", payload[:200])
+        return
+    CACHE_BUS_MESSAGES.inc()
+    c = cache.get_cache(namespace)
+    if c is None:
+        return  # that cache lives in a module this worker never imported
+    keys = msg.get("keys")
+    if keys:
+        c.forget(*keys)
+    else:
+        c.clear()
+
+
+class Listener:
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.connected = False
+        self.reconnects = 0
+
+    # ---------- connection ----------
+
+    def _connect(self):
+        from database import get_engine
+        # long-lived and autocommit: a plain driver connection, outside the pool
+        engine = get_engine()
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        conn = engine.dialect.connect(*cargs, **cparams)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    def _set_connected(self, flag: bool):
+        self.connected = flag
+        cache.set_coherent(flag)
+        CACHE_BUS_CONNECTED.set(1 if flag else 0)
+
+    def _flush(self, reason: str):
+        log.warning("cache bus %s; flushing local caches", reason)
+        CACHE_BUS_FLUSHES.inc()
+        cache.clear_all()
+
+    # ---------- loop ----------
+
+    def _run(self):
+        conn, backoff, first = None, 1.0, True
+        while not self._stop.is_set():
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception as e:
+                    log.warning("cache bus cannot connect (%s); retrying in %.0fs", type(e).__name__, backoff)
+                    self._stop.wait(backoff)
+                    backoff, first = min(backoff * 2, MAX_BACKOFF_SECONDS), False
+                    continue
+                if not first:
+                    # messages sent while we were away are gone
+                    self.reconnects += 1
+                    self._flush("reconnected")
+                self._set_connected(True)
+                backoff, first, last_seen = 1.0, False, time.monotonic()
+            try:
+                ready, _, _ = select.select([conn], [], [], POLL_SECONDS)
+                if ready:
+                    conn.poll()
+                    while conn.notifies:
+                        apply(conn.notifies.pop(0).payload)
+                    last_seen = time.monotonic()
+                elif time.monotonic() - last_seen > HEARTBEAT_SECONDS:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+                    last_seen = time.monotonic()
+            except Exception as e:
+                self._set_connected(False)
+                self._flush(f"connection lost ({type(e).__name__})")
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+        if conn is not None:
+            self._set_connected(False)
+            conn.close()
+
+    def start(self):
+        if not ENABLED or (self._thread and self._thread.is_alive()):
+            return
+        from database import get_engine
+        engine = get_engine()
+        if engine.dialect.name != "postgresql" or engine.driver != "psycopg2":
+            log.info("cache bus needs Postgres + psycopg2; local caches rely on TTLs")
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=POLL_SECONDS + 5)
+            self._thread = None
+
+
+listener = Listener()
+
+on_startup("cache-bus")(listener.start)
+on_shutdown("cache-bus")(listener.stop)
@@ -0,0 +1,225 @@
+# backend/cache_snapshot.py
+"""
+Warm restarts: save the local tier of hot caches to a file, load it at startup.
+
+Caches opt in with a stamp query next to their definition:
+
+    quotes_cache = Cache("quotes", default_ttl=3600,
+                         snapshot_stamp="SELECT count(*) || ':' || coalesce(max(id), 0) FROM quotes")
+
+At shutdown and every CACHE_SNAPSHOT_INTERVAL seconds, each opted-in cache's
+live entries (key, seconds left, value) are written to
+CACHE_SNAPSHOT_PATH.<pid>, together with the current value of its stamp and
+the alembic revision. Every worker writes its own file, so workers never
+overwrite each other's snapshots. A file is msgpack (JSON if msgpack isn't
+installed), zlib-compressed, written with an atomic rename, and starts with
+a format version.
+
+At startup a worker picks the newest readable file with the current format
+and schema revision, and prunes files older than CACHE_SNAPSHOT_MAX_AGE. The
+stamps are read again (one round trip) and a namespace is restored only if
+its stamp still matches; everything else starts cold as before. Restoring is
+a dict fill, so a worker serves its first requests from memory instead of all
+workers rebuilding the same daily payloads, quote list and uid -> user id
+mappings at once.
+"""
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Optional
+
+from sqlalchemy import text
+
+import database
+from cache import _caches
+from lifecycle import on_shutdown, on_startup
+
+try:
+    import msgpack  # optional: smaller and faster than JSON, and keeps bytes values
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+log = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+PATH = os.getenv("CACHE_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "crakk-cache.snapshot"))
+INTERVAL = float(os.getenv("CACHE_SNAPSHOT_INTERVAL", "300"))  # seconds; 0 = only at shutdown
+MAX_AGE = float(os.getenv("CACHE_SNAPSHOT_MAX_AGE", "86400"))  # seconds; older files are deleted
+ENABLED = os.getenv("CACHE_SNAPSHOT", "1") != "0"
+
+_MAGIC_MSGPACK = b"CKS1M"
+_MAGIC_JSON = b"CKS1J"
+
+
+def _snapshotted() -> dict:
+    return {ns: c for ns, c in _caches.items() if c.snapshot_stamp is not None}
+
+
+def _pack(doc: dict) -> bytes:
+    if msgpack is not None:
+        return _MAGIC_MSGPACK + zlib.compress(msgpack.packb(doc, use_bin_type=True), 1)
+    return _MAGIC_JSON + zlib.compress(json.dumps(doc, separators=(",", ":")).encode(), 1)
+
+
+def _unpack(blob: bytes) -> dict:
+    magic, body = blob[:5], zlib.decompress(blob[5:])
+    if magic == _MAGIC_MSGPACK:
+        if msgpack is None:
+            raise ValueError("snapshot is msgpack but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    if magic == _MAGIC_JSON:
+        return json.loads(body)
+    raise ValueError("not a cache snapshot")
+
+
+def read_stamps(namespaces) -> Optional[dict]:
+    """namespace -> current stamp (as text), plus "__schema__". None if the DB can't say."""
+    try:
+        with database.get_engine().connect() as conn:
+            try:
+                schema = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+            except Exception:
+                conn.rollback()
+                schema = None  # tables made by create_all (benchmarks)
+            stamps = {"__schema__": str(schema)}
+            cols = [(ns, c.snapshot_stamp) for ns, c in namespaces.items()]
+            if cols:
+                row = conn.execute(text(
+                    "SELECT " + ", ".join(f"({sql}) AS s{i}" for i, (_, sql) in enumerate(cols))
+                )).one()
+                stamps.update({ns: str(v) for (ns, _), v in zip(cols, row)})
+            return stamps
+    except Exception:
+        log.warning("cache snapshot: could not read DB stamps", exc_info=True)
+        return None
+
+
+def _own_file(path: str) -> str:
+    return f"{path}.{os.getpid()}"
+
+
+def _candidates(path: str) -> list[str]:
+    """Snapshot files of all workers, newest first; deletes the expired ones."""
+    now = time.time()
+    found = []
+    for name in glob.glob(glob.escape(path) + ".*"):
+        if name.endswith(".tmp"):
+            continue
+        try:
+            mtime = os.path.getmtime(name)
+            if now - mtime > MAX_AGE:
+                os.remove(name)
+                continue
+        except OSError:
+            continue
+        found.append((mtime, name))
+    return [name for _, name in sorted(found, reverse=True)]
+
+
+def save(path: str = PATH) -> int:
+    caches = _snapshotted()
+    stamps = read_stamps(caches)
+    if stamps is None:
+        return 0
+    doc = {
+        "version": FORMAT_VERSION,
+        "created": time.time(),
+        "stamps": stamps,
+        "caches": {ns: c.export_local() for ns, c in caches.items()},
+    }
+    blob = _pack(doc)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(blob)
+    os.replace(tmp, _own_file(path))
+    return sum(len(v) for v in doc["caches"].values())
+
+
+def _read(name: str) -> Optional[dict]:
+    try:
+        with open(name, "rb") as f:
+            doc = _unpack(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception:
+        log.warning("cache snapshot %s unreadable; skipping it", name, exc_info=True)
+        return None
+    return doc if doc.get("version") == FORMAT_VERSION else None
+
+
+def load(path: str = PATH) -> dict[str, int]:
+    """Restore from the newest valid worker snapshot the namespaces whose stamps
+    still match. Returns namespace -> entries restored."""
+    names = _candidates(path)
+    if not names:
+        return {}
+    caches = _snapshotted()
+    stamps = read_stamps(caches)
+    if stamps is None:
+        return {}
+    for name in names:
+        doc = _read(name)
+        if doc is not None and doc["stamps"].get("__schema__") == stamps["__schema__"]:
+            break
+    else:
+        return {}
+
+    # the file is from a stopped process; entries kept aging while it was down
+    aged = max(0.0, time.time() - doc["created"])
+    restored = {}
+    for ns, entries in doc["caches"].items():
+        c = caches.get(ns)
+        if c is None or stamps.get(ns) != doc["stamps"].get(ns):
+            continue
+        restored[ns] = c.import_local((k, left - aged, v) for k, left, v in entries)
+    return restored
+
+
+class _Snapshotter:
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self):
+        while not self._stop.wait(INTERVAL):
+            try:
+                save()
+            except Exception:
+                log.exception("cache snapshot failed")
+
+    def start(self):
+        if not ENABLED:
+            return
+        t0 = time.perf_counter()
+        restored = load()
+        if restored:
+            log.info("cache snapshot restored %s in %.1f ms", restored, (time.perf_counter() - t0) * 1000.0)
+        if INTERVAL > 0 and not (self._thread and self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-snapshot", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if not ENABLED:
+            return
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            save()
+        except Exception:
+            log.exception("cache snapshot at shutdown failed")
+
+
+snapshotter = _Snapshotter()
+
+on_startup("cache-snapshot")(snapshotter.start)
+on_shutdown("cache-snapshot")(snapshotter.stop)
@@ -1,29 +1,112 @@
 # backend/database.py
+import logging
 import os
-from sqlalchemy import create_engine
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 
+from lifecycle import on_shutdown, on_startup
+
 # Load environment variables from .env
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+log = logging.getLogger(__name__)
 
-if not DATABASE_URL:
-    raise RuntimeError("DATABASE_URL is not set in your .env file")
+# ⚠️ Nothing here touches the network or raises at import time: the engine is
+# built on first use (or in main.lifespan), so `import main` stays cheap and
+# works in tests/scripts without DATABASE_URL.
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+_engine_hooks: list[Callable[[Engine], None]] = []
+
+
+def on_engine_created(fn: Callable[[Engine], None]):
+    """Run `fn(engine)` once the engine exists (immediately if it already does)."""
+    _engine_hooks.append(fn)
+    if _engine is not None:
+        fn(_engine)
+    return fn
+
+
+def adopt_engine(engine: Engine):
+    """Apply the on_engine_created hooks to an extra engine (read replicas)."""
+    for hook in _engine_hooks:
+        hook(engine)
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                url = os.getenv("DATABASE_URL")
+                if not url:
+                    raise RuntimeError("DATABASE_URL is not set in your .env file")
+                engine = create_engine(
+                    url,
+                    pool_pre_ping=True,    # ✅ prevents stale connection errors
+                    echo=False             # set to True to debug SQL queries
+                )
+                for hook in _engine_hooks:
+                    hook(engine)
+                _engine = engine
+    return _engine
+
+
+def current_engine() -> Optional[Engine]:
+    """The engine if it has been created, without creating it."""
+    return _engine
+
+
+def dispose_engine():
+    # closes pooled connections; the engine reconnects lazily if used again
+    if _engine is not None:
+        _engine.dispose()
+
+
+@on_startup("database")
+def _warm_up():
+    engine = get_engine()  # raises here (not at import) if DATABASE_URL is missing
+    # open DB_WARM_CONNECTIONS pooled connections so the first requests skip the handshake
+    try:
+        conns = [engine.connect() for _ in range(int(os.getenv("DB_WARM_CONNECTIONS", "1")))]
+    except OperationalError:
+        # start anyway: health.py reports not-ready and reads fall back to snapshots
+        log.warning("database unreachable at startup; starting degraded", exc_info=True)
+        return
+    for c in conns:
+        c.execute(text("SELECT 1"))
+        c.close()
+
+
+@on_shutdown("database")
+def _close():
+    dispose_engine()
+
+
+def __getattr__(name):
+    # keeps `from database import engine` working for scripts (builds it on access)
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LazySessionmaker(sessionmaker):
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and local_kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,    # ✅ prevents stale connection errors
-    echo=False             # set to True to debug SQL queries
-)
 
-# Create session
-SessionLocal = sessionmaker(
+# Create session (bound to the engine on first use)
+SessionLocal = _LazySessionmaker(
     autocommit=False,
     autoflush=False,
-    bind=engine
 )
 
 # Base class for models
@@ -1,7 +1,12 @@
 # deps.py
 from typing import Generator
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from cache import Cache
 from database import SessionLocal
+from db_routing import in_ryw_window, pin_primary, read_session, reading_from_replica
+from tasks import post_commit, post_commit_hook
 
 # ⚠️ Remove side-effects from deps; do this in main.py instead:
 # import firebase_admin_init
@@ -13,6 +18,14 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+def get_read_db() -> Generator[Session, None, None]:
+    """For read-mostly GET routes: replica reads, primary once the session writes."""
+    db: Session = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def _ensure_db_user(db: Session, claims: dict):
     # ⬇️ Lazy import avoids circular import issues
     from models import User
@@ -21,11 +34,19 @@ def _ensure_db_user(db: Session, claims: dict):
     if not firebase_uid:
         raise ValueError("Firebase token missing uid")
 
+    # just submitted/liked? read your own writes from the primary
+    if in_ryw_window(firebase_uid):
+        pin_primary(db)
+
     email = (claims.get("email") or f"{firebase_uid}@firebase.local").lower()
     display_name = claims.get("name") or claims.get("display_name")
     photo_url = claims.get("picture") or claims.get("photo_url")
 
     user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
+    if not user and reading_from_replica(db):
+        # the replica may not have the row yet; ask the primary before inserting
+        pin_primary(db)
+        user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
     if user:
         changed = False
         if email and user.email != email:
@@ -49,6 +70,40 @@ def _ensure_db_user(db: Session, claims: dict):
     db.refresh(user)
     return user
 
+# firebase uid -> {"id", "fp"}; skips the users lookup on hot paths
+# (a uid's row id never changes, so only the schema revision guards the snapshot)
+users_cache = Cache("users", default_ttl=900, snapshot_stamp="SELECT 1")
+
+_PROFILE_CLAIMS = ("uid", "email", "name", "display_name", "picture", "photo_url")
+
+def _profile_fingerprint(claims: dict) -> str:
+    return "|".join(str(claims.get(k) or "") for k in _PROFILE_CLAIMS[1:])
+
+def resolve_user_id(db: Session, claims: dict) -> int:
+    """Like _ensure_db_user(...).id, but served from cache while the token's profile is unchanged."""
+    firebase_uid = claims.get("uid")
+    if not firebase_uid:
+        raise ValueError("Firebase token missing uid")
+    if in_ryw_window(firebase_uid):
+        pin_primary(db)
+
+    fp = _profile_fingerprint(claims)
+    cached = users_cache.get(firebase_uid, None)
+    if cached:
+        if cached.get("fp") != fp:
+            # new name/photo in the token: the id is unchanged, sync the row after the response
+            users_cache.set(firebase_uid, {"id": cached["id"], "fp": fp})
+            post_commit.emit("profile-changed", claims={k: claims.get(k) for k in _PROFILE_CLAIMS})
+        return cached["id"]
+
+    user = _ensure_db_user(db, claims)
+    users_cache.set(firebase_uid, {"id": user.id, "fp": fp})
+    return user.id
+
+@post_commit_hook("profile-changed")
+def _sync_profile(db: Session, claims: dict):
+    _ensure_db_user(db, claims)
+
 # Re-export for convenience (safe as long as these don’t import deps at module import)
 from firebase_auth import (
     get_current_firebase_user as _get_current_firebase_user,
@@ -58,4 +113,16 @@ from firebase_auth import (
 get_current_firebase_user = _get_current_firebase_user
 get_current_firebase_user_optional = _get_current_firebase_user_optional
 
-__all__ = ["get_db", "_ensure_db_user", "get_current_firebase_user", "get_current_firebase_user_optional"]
+def get_admin_user_id(
+    db: Session = Depends(get_db),
+    firebase_claims = Depends(get_current_firebase_user),
+) -> int:
+    """For admin routes: the caller's user id, 403 unless users.is_admin."""
+    from models import User
+
+    user_id = resolve_user_id(db, firebase_claims)
+    if not db.scalar(select(User.is_admin).where(User.id == user_id)):
+        raise HTTPException(403, "Admins only")
+    return user_id
+
+__all__ = ["get_db", "get_read_db", "_ensure_db_user", "resolve_user_id", "get_current_firebase_user", "get_current_firebase_user_optional", "get_admin_user_id"]
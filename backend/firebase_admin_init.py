@@ -1,14 +1,60 @@
 # backend/firebase_admin_init.py
 import os
-import firebase_admin
-from firebase_admin import credentials
+import threading
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+
+from lifecycle import on_startup
 
 load_dotenv()
 
 # Prefer env var; fall back to local file
 SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "serviceAccountKey.json")
 
-if not firebase_admin._apps:
-    cred = credentials.Certificate(SERVICE_ACCOUNT_FILE)
-    firebase_admin.initialize_app(cred)
+# Load tests run a server with fake tokens (see firebase_auth.py) and no credential file
+FAKE_AUTH = os.getenv("FIREBASE_AUTH_FAKE") == "1"
+
+_LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+_init_lock = threading.Lock()
+_fake_checked = False
+
+
+def _is_local_db(url: str) -> bool:
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite":
+        return True
+    host = u.host or u.query.get("host") or ""
+    return host == "" or host.startswith("/") or host in _LOCAL_HOSTS  # "" / "/...": unix socket
+
+
+def check_fake_auth():
+    """Refuse fake tokens anywhere that could be production: real credentials
+    configured, or a database that is not on this machine."""
+    global _fake_checked
+    if _fake_checked:
+        return
+    if os.getenv("GOOGLE_APPLICATION_CREDENTIALS") or os.path.exists(SERVICE_ACCOUNT_FILE):
+        raise RuntimeError("FIREBASE_AUTH_FAKE=1 together with Firebase credentials; refusing to start")
+    url = os.getenv("DATABASE_URL")
+    if url and not _is_local_db(url):
+        raise RuntimeError("FIREBASE_AUTH_FAKE=1 with a non-local DATABASE_URL; refusing to start")
+    _fake_checked = True
+
+
+@on_startup("firebase")
+def ensure_initialized():
+    """Initialize Firebase Admin once. Called from the app lifespan and lazily before verifying tokens."""
+    if FAKE_AUTH:
+        check_fake_auth()
+        return
+    # firebase_admin pulls in google-auth & friends; import only when needed
+    import firebase_admin
+    from firebase_admin import credentials
+
+    if firebase_admin._apps:
+        return
+    with _init_lock:
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(SERVICE_ACCOUNT_FILE)
+            firebase_admin.initialize_app(cred)
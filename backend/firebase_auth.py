@@ -1,7 +1,21 @@
+import logging
+import time
 from typing import Optional, Dict, Any
 from fastapi import Header, HTTPException
-from firebase_admin import auth as fb_auth
-import firebase_admin_init  # side-effect init
+import firebase_admin_init
+from metrics import FIREBASE_VERIFY_LATENCY
+
+log = logging.getLogger(__name__)
+
+if firebase_admin_init.FAKE_AUTH:
+    log.warning("FIREBASE_AUTH_FAKE=1: accepting unsigned 'fake:<uid>' tokens. Never enable in production!")
+
+def fake_token_claims(token: str) -> Dict[str, Any]:
+    # "fake:<uid>" -> claims shaped like a real Firebase ID token (benchmarks / load tests only)
+    if not token.startswith("fake:") or len(token) == 5:
+        raise HTTPException(status_code=401, detail="Invalid fake ID token")
+    uid = token[5:]
+    return {"uid": uid, "email": f"{uid}@fake.local", "name": uid}
 
 def _verify_bearer_token(authorization: Optional[str]) -> Dict[str, Any]:
     if not authorization or not authorization.startswith("Bearer "):
@@ -11,15 +25,28 @@ def _verify_bearer_token(authorization: Optional[str]) -> Dict[str, Any]:
     if not token:
         raise HTTPException(status_code=401, detail="Missing ID token")
 
+    firebase_admin_init.ensure_initialized()  # with FAKE_AUTH: refuses anything that looks like production
+    if firebase_admin_init.FAKE_AUTH:
+        return fake_token_claims(token)
+
+    from firebase_admin import auth as fb_auth  # heavy; keep out of import time
+
+    started = time.perf_counter()
+    outcome = "ok"
     try:
         claims = fb_auth.verify_id_token(token, check_revoked=True)
         return claims
     except fb_auth.RevokedIdTokenError:
+        outcome = "revoked"
         raise HTTPException(status_code=401, detail="Token has been revoked")
     except fb_auth.ExpiredIdTokenError:
+        outcome = "expired"
         raise HTTPException(status_code=401, detail="Token has expired")
     except Exception:
+        outcome = "invalid"
         raise HTTPException(status_code=401, detail="Invalid Firebase ID token")
+    finally:
+        FIREBASE_VERIFY_LATENCY.labels(outcome).observe(time.perf_counter() - started)
 
 def get_current_firebase_user(authorization: str = Header(...)) -> Dict[str, Any]:
     return _verify_bearer_token(authorization)
@@ -0,0 +1,196 @@
+# backend/health.py
+"""
+Liveness, readiness and degraded mode.
+
+- GET /livez   the process is up and serving (never touches the DB)
+- GET /readyz  200 while the primary DB answers, 503 while it doesn't
+- GET /        kept for old probes: last probe result, no query per call
+
+A background prober runs `SELECT 1` on the primary every
+HEALTH_PROBE_INTERVAL seconds. Request handlers that hit a connection error
+report it with note_db_failure(), which flips to degraded right away; the
+prober flips back on its next successful probe.
+
+While degraded:
+- read endpoints wrapped in lkg.serve() answer from the last-known-good
+  snapshot (lkg.py) with `X-Served-From: last-known-good`, without waiting
+  on DB connect timeouts;
+- writes (POST/PUT/PATCH/DELETE) are rejected up front with 503, a
+  Retry-After header and {"degraded": true}, instead of failing halfway;
+- any connection error that still escapes a handler becomes the same 503.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+import database
+from lifecycle import on_shutdown, on_startup
+
+log = logging.getLogger(__name__)
+
+PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "2"))  # seconds
+RETRY_AFTER = str(max(1, int(PROBE_INTERVAL * 2)))
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+# SQLSTATE class 08 (connection exception) and the server shutting down / starting up
+_DOWN_SQLSTATES = ("08", "57P01", "57P02", "57P03")
+# what libpq says when there is no server to get a SQLSTATE from
+_DOWN_MESSAGES = (
+    "could not connect", "connection refused", "connection timed out", "timeout expired",
+    "server closed the connection", "terminating connection", "connection reset",
+    "no route to host", "could not translate host name", "ssl connection has been closed",
+    "connection to server", "connection already closed",
+)
+
+
+def is_db_down_error(exc: BaseException) -> bool:
+    """Connection-level failures (refused, reset, timed out), not bad SQL, constraint
+    violations, deadlocks or a locked SQLite file."""
+    if not isinstance(exc, DBAPIError):
+        return False
+    if exc.connection_invalidated:
+        return True
+    if not isinstance(exc, OperationalError):
+        return False
+    code = getattr(exc.orig, "pgcode", None)
+    if code:
+        return code.startswith(_DOWN_SQLSTATES)
+    message = str(exc.orig).lower()
+    return any(m in message for m in _DOWN_MESSAGES)
+
+
+class DbProber:
+    def __init__(self, interval: float = PROBE_INTERVAL):
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.up = True  # start() probes before the app serves; scripts never probe
+        self.version: Optional[str] = None
+        self.last_ok: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.down_since: Optional[float] = None
+
+    def probe(self) -> bool:
+        try:
+            with database.get_engine().connect() as conn:
+                version = conn.execute(text("SELECT version()" if conn.dialect.name == "postgresql" else "SELECT 1")).scalar()
+        except Exception as e:
+            self._mark_down(f"{type(e).__name__}: {e}".splitlines()[0])
+            return False
+        if self.down_since is not None:
+            log.warning("database reachable again; leaving degraded mode")
+        self.up = True
+        self.version = str(version)
+        self.last_ok = time.time()
+        self.last_error = None
+        self.down_since = None
+        return True
+
+    def _mark_down(self, reason: str):
+        if self.up or self.down_since is None:
+            log.error("database unreachable (%s); serving degraded", reason)
+            self.down_since = time.time()
+        self.up = False
+        self.last_error = reason
+
+    def note_failure(self, exc: BaseException):
+        """A request saw the DB fail: degrade now rather than at the next probe."""
+        self._mark_down(f"{type(exc).__name__}: {exc}".splitlines()[0])
+
+    def status(self) -> dict:
+        return {
+            "database": "up" if self.up else "down",
+            "degraded": not self.up,
+            "last_ok": self.last_ok,
+            "down_since": self.down_since,
+            "error": self.last_error,
+        }
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.probe()
+
+    def start(self):
+        self.probe()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-prober", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+db_health = DbProber()
+
+on_startup("db-prober")(db_health.start)
+on_shutdown("db-prober")(db_health.stop)
+
+
+def note_db_failure(exc: BaseException):
+    db_health.note_failure(exc)
+
+
+def _unavailable() -> JSONResponse:
+    return JSONResponse(
+        {"detail": "Database unavailable; please retry shortly", "degraded": True},
+        status_code=503,
+        headers={"Retry-After": RETRY_AFTER},
+    )
+
+
+class WriteGuardMiddleware:
+    """503 for writes while degraded, before any handler opens a transaction."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] in WRITE_METHODS and not db_health.up:
+            await _unavailable()(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+def livez():
+    return {"status": "ok"}
+
+
+def readyz():
+    status = db_health.status()
+    return JSONResponse(status, status_code=200 if db_health.up else 503)
+
+
+def root():
+    # old health route: report the last probe instead of querying per call
+    return {"postgres": db_health.version if db_health.up else None, **db_health.status()}
+
+
+def install(app: FastAPI):
+    """Probe endpoints, the write guard and the DB-down exception handler."""
+    app.add_middleware(WriteGuardMiddleware)
+    app.add_api_route("/livez", livez, methods=["GET"], include_in_schema=False)
+    app.add_api_route("/readyz", readyz, methods=["GET"], include_in_schema=False)
+    app.add_api_route("/", root, methods=["GET"], include_in_schema=False)
+
+    @app.exception_handler(DBAPIError)
+    async def _db_error(request: Request, exc: DBAPIError):
+        if not is_db_down_error(exc):
+            raise exc
+        note_db_failure(exc)
+        return _unavailable()
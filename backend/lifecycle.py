@@ -0,0 +1,61 @@
+# backend/lifecycle.py
+"""
+Startup / shutdown hooks, run by the app lifespan in main.py.
+
+Modules register work here instead of doing it at import time, so importing
+`main` (or any router) has no side effects and new workers come up fast:
+
+    @on_startup("like-flusher")
+    def _start(): like_buffer.start()
+
+Startup hooks run in registration order, shutdown hooks in reverse. A failing
+startup hook aborts startup; a failing shutdown hook is logged and skipped so
+the rest still get to drain.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+Hook = Callable[[], None]
+
+_startup: list[tuple[str, Hook]] = []
+_shutdown: list[tuple[str, Hook]] = []
+
+
+def on_startup(name: str):
+    def deco(fn: Hook) -> Hook:
+        _startup.append((name, fn))
+        return fn
+    return deco
+
+
+def on_shutdown(name: str):
+    def deco(fn: Hook) -> Hook:
+        _shutdown.append((name, fn))
+        return fn
+    return deco
+
+
+def skip(name: str):
+    """Unregister `name`'s hooks (in-process benchmarks that stub that subsystem out)."""
+    _startup[:] = [(n, fn) for n, fn in _startup if n != name]
+    _shutdown[:] = [(n, fn) for n, fn in _shutdown if n != name]
+
+
+def run_startup():
+    for name, fn in _startup:
+        t0 = time.perf_counter()
+        fn()
+        log.info("startup %-20s %.1f ms", name, (time.perf_counter() - t0) * 1000.0)
+
+
+def run_shutdown():
+    for name, fn in reversed(_shutdown):
+        try:
+            fn()
+        except Exception:
+            log.exception("shutdown hook %s failed", name)
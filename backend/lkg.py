@@ -0,0 +1,154 @@
+# backend/lkg.py
+"""
+Last-known-good snapshots for read endpoints (degraded mode, see health.py).
+
+    payload = lkg.serve(f"daily:{subject}:{day}", lambda: build_payload(db))
+
+While the DB is up, serve() runs the loader and remembers the result: in
+memory, and on disk under LKG_DIR (one JSON file per key, written with an
+atomic rename, when the value changed and at most every LKG_WRITE_INTERVAL
+seconds per key, so hot keys whose stats tick don't turn into disk churn). While the DB is down, or when
+the loader fails with a connection error, it returns the remembered value
+instead and tags the response `X-Served-From: last-known-good`. Keys with
+nothing remembered raise DatabaseUnavailable (503).
+
+Files survive restarts, so a worker started mid-outage still serves today's
+DPP, quotes and hints. Values must be JSON-serializable (plain dicts/lists).
+"""
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from health import RETRY_AFTER, db_health, is_db_down_error, note_db_failure
+
+log = logging.getLogger(__name__)
+
+LKG_DIR = os.getenv("LKG_DIR", os.path.join(tempfile.gettempdir(), "crakk-lkg"))
+MAX_MEMORY_KEYS = int(os.getenv("LKG_MAX_MEMORY_KEYS", "5000"))
+WRITE_INTERVAL = float(os.getenv("LKG_WRITE_INTERVAL", "30"))  # seconds, per key
+
+# per-request flag, set by serve() when it answered from a snapshot
+_served_stale: contextvars.ContextVar[dict | None] = contextvars.ContextVar("lkg_served_stale", default=None)
+
+
+class DatabaseUnavailable(Exception):
+    """DB is down and there is no snapshot for this key."""
+
+
+class SnapshotStore:
+    def __init__(self, directory: str = LKG_DIR):
+        self._dir = directory
+        self._lock = threading.Lock()
+        self._mem: dict[str, Any] = {}
+        self._written: dict[str, float] = {}  # key -> monotonic time of the last file write
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._dir, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def save(self, key: str, value: Any):
+        value = jsonable_encoder(value)
+        with self._lock:
+            if self._mem.get(key) == value:
+                return
+            if key not in self._mem and len(self._mem) >= MAX_MEMORY_KEYS:
+                old = next(iter(self._mem))  # disk still has it
+                self._mem.pop(old)
+                self._written.pop(old, None)
+            self._mem[key] = value
+            now = time.monotonic()
+            if now - self._written.get(key, -WRITE_INTERVAL) < WRITE_INTERVAL:
+                return
+            self._written[key] = now
+        try:
+            os.makedirs(self._dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"key": key, "value": value}, f, separators=(",", ":"))
+            os.replace(tmp, self._path(key))
+        except OSError:
+            log.warning("could not persist snapshot %s", key, exc_info=True)
+
+    def load(self, key: str) -> Any:
+        with self._lock:
+            if key in self._mem:
+                return self._mem[key]
+        try:
+            with open(self._path(key)) as f:
+                doc = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if doc.get("key") != key:
+            return None
+        with self._lock:
+            self._mem[key] = doc["value"]
+        return doc["value"]
+
+
+snapshots = SnapshotStore()
+
+
+def serve(key: str, loader: Callable[[], Any]) -> Any:
+    """loader() while the DB is up (remembering the result), else the snapshot."""
+    if db_health.up:
+        try:
+            value = loader()
+        except Exception as e:
+            if not is_db_down_error(e):
+                raise
+            note_db_failure(e)
+        else:
+            snapshots.save(key, value)
+            return value
+
+    value = snapshots.load(key)
+    if value is None:
+        raise DatabaseUnavailable(key)
+    flag = _served_stale.get()
+    if flag is not None:
+        flag["stale"] = True
+    return value
+
+
+class StaleHeaderMiddleware:
+    """Adds X-Served-From: last-known-good when a handler answered from a snapshot."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        flag = {"stale": False}
+        _served_stale.set(flag)  # sync handlers run in a copied context; they mutate this dict
+
+        async def _send(message):
+            if message["type"] == "http.response.start" and flag["stale"]:
+                message["headers"] = [*message.get("headers", ()), (b"x-served-from", b"last-known-good")]
+            await send(message)
+
+        await self.app(scope, receive, _send)
+
+
+def install(app: FastAPI):
+    app.add_middleware(StaleHeaderMiddleware)
+
+    @app.exception_handler(DatabaseUnavailable)
+    async def _no_snapshot(request: Request, exc: DatabaseUnavailable):
+        return JSONResponse(
+            {"detail": "Database unavailable and no cached copy yet; please retry shortly", "degraded": True},
+            status_code=503,
+            headers={"Retry-After": RETRY_AFTER},
+        )
@@ -1,10 +1,20 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import text
 
+# ⚠️ No side effects at import: DB + Firebase are set up in lifespan() below
+# (database / firebase_admin_init register their warm-ups with lifecycle first)
 from database import SessionLocal
-import firebase_admin_init  # side-effect: init Firebase Admin
+import firebase_admin_init  # noqa: F401
+import cache_snapshot  # noqa: F401  (warm restarts: restores hot caches at startup)
+import cache_bus  # noqa: F401  (cross-worker cache invalidation over LISTEN/NOTIFY)
+import health
+import lifecycle
+import lkg
+import sql_profiler
+import metrics
 
 # Routers
 from routes.daily import router as daily_router
@@ -12,7 +22,7 @@ from routes.attempts import router as attempts_router
 from routes.likes import router as likes_router
 from routes.quotes import router as quotes_router
 from routes.quotes import router as quotes_router
-from routes import daily, questions, auth
+from routes import daily, questions, auth, pyq, review, admin, stats, contests
 
 # Optional routers – include ONLY if you actually have these files/models
 # from routes.quotes import router as quotes_router
@@ -26,7 +36,20 @@ def get_db():
     finally:
         db.close()
 
-app = FastAPI(title="Crakk Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(lifecycle.run_startup)
+    try:
+        yield
+    finally:
+        await run_in_threadpool(lifecycle.run_shutdown)
+
+app = FastAPI(title="Crakk Backend", lifespan=lifespan)
+
+# /livez, /readyz, degraded mode (503 for writes, last-known-good reads while the DB is down);
+# installed before CORS so those 503s still carry CORS headers
+health.install(app)
+lkg.install(app)
 
 # CORS (add your dev frontend ports)
 origins = [
@@ -43,10 +66,11 @@ app.add_middleware(
     allow_headers=["*"],  # includes Authorization
 )
 
-@app.get("/")
-def health(db: Session = Depends(get_db)):
-    res = db.execute(text("SELECT version();"))
-    return {"postgres": res.scalar()}
+# Per-request SQL counts/time as Server-Timing headers (SQL_PROFILE=1 only)
+sql_profiler.install(app)
+
+# Prometheus: route latency, in-flight, DB pool, Firebase verify, cache hit ratios
+metrics.install(app)
 
 # Mount routers under /api
 API_PREFIX = "/api"
@@ -56,6 +80,11 @@ app.include_router(attempts_router, prefix=API_PREFIX)
 app.include_router(likes_router,    prefix=API_PREFIX)
 app.include_router(daily.router, prefix=API_PREFIX)
 app.include_router(questions.router, prefix=API_PREFIX)
+app.include_router(pyq.router, prefix=API_PREFIX)
+app.include_router(review.router, prefix=API_PREFIX)
+app.include_router(admin.router, prefix=API_PREFIX)
+app.include_router(stats.router, prefix=API_PREFIX)
+app.include_router(contests.router, prefix=API_PREFIX)
 app.include_router(auth.router, prefix="/api") 
 
 # Optional routers (uncomment only if you actually have them)
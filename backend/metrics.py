@@ -0,0 +1,174 @@
+# backend/metrics.py
+"""
+Prometheus metrics, exposed at GET /metrics (text exposition format).
+
+- crakk_http_request_duration_seconds{method,route,status}  histogram
+- crakk_http_requests_in_flight{method}                     gauge
+- crakk_db_pool_*                                            pool gauges, read at scrape time
+- crakk_db_replica_lag_seconds{replica}                     gauge, see db_routing.py
+- crakk_firebase_verify_duration_seconds{outcome}           histogram
+- crakk_stats_stream_subscribers                             gauge, open SSE stats streams
+- crakk_post_commit_queue_depth / crakk_post_commit_tasks_total{hook,outcome}  see tasks.py
+- crakk_cache_{hits,misses}_total / crakk_cache_hit_ratio   per registered cache
+
+Request timing is a plain ASGI middleware (no BaseHTTPMiddleware task hop),
+and pool/cache numbers are only read when Prometheus scrapes, so this is
+cheap enough to leave on. Set METRICS_ENABLED=0 to turn it off.
+
+Each uvicorn worker keeps its own numbers; scrape every worker (or put the
+workers behind separate ports) rather than the load balancer.
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable
+
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+import database
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "crakk_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "crakk_http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["method"],
+)
+FIREBASE_VERIFY_LATENCY = Histogram(
+    "crakk_firebase_verify_duration_seconds",
+    "Time spent verifying Firebase ID tokens",
+    ["outcome"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+REPLICA_LAG = Gauge(
+    "crakk_db_replica_lag_seconds",
+    "Replication lag per read replica (-1 = unreachable)",
+    ["replica"],
+)
+STATS_STREAM_SUBSCRIBERS = Gauge(
+    "crakk_stats_stream_subscribers",
+    "Open live-stats SSE connections in this worker",
+)
+POST_COMMIT_QUEUE_DEPTH = Gauge(
+    "crakk_post_commit_queue_depth",
+    "Post-commit tasks waiting for a worker",
+)
+POST_COMMIT_TASKS = Counter(
+    "crakk_post_commit_tasks",
+    "Post-commit hook runs by outcome (ok, retried, failed, inline = queue full)",
+    ["hook", "outcome"],
+)
+
+CACHE_BUS_CONNECTED = Gauge(
+    "crakk_cache_bus_connected",
+    "1 while this worker's cache invalidation listener is connected",
+)
+CACHE_BUS_MESSAGES = Counter(
+    "crakk_cache_bus_messages",
+    "Cache invalidation messages received",
+)
+CACHE_BUS_FLUSHES = Counter(
+    "crakk_cache_bus_flushes",
+    "Full local cache flushes after the invalidation listener dropped or reconnected",
+)
+
+# name -> callable returning (hits, misses); see register_cache()
+_caches: dict[str, Callable[[], tuple[int, int]]] = {}
+
+
+def register_cache(name: str, stats: Callable[[], tuple[int, int]]):
+    """Expose hit/miss counters and hit ratio for a cache. `stats` is called at scrape time."""
+    _caches[name] = stats
+
+
+class _CacheCollector:
+    def collect(self):
+        hits = CounterMetricFamily("crakk_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("crakk_cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("crakk_cache_hit_ratio", "Lifetime cache hit ratio", labels=["cache"])
+        for name, stats in list(_caches.items()):
+            h, m = stats()
+            hits.add_metric([name], h)
+            misses.add_metric([name], m)
+            ratio.add_metric([name], (h / (h + m)) if (h + m) else 0.0)
+        yield hits
+        yield misses
+        yield ratio
+
+
+class _PoolCollector:
+    def collect(self):
+        engine = database.current_engine()  # never create the engine just to scrape
+        if engine is None:
+            return
+        pool = engine.pool
+        for name, help_, fn in (
+            ("crakk_db_pool_size", "Configured pool size", "size"),
+            ("crakk_db_pool_checked_out", "Connections currently checked out", "checkedout"),
+            ("crakk_db_pool_checked_in", "Idle connections in the pool", "checkedin"),
+            ("crakk_db_pool_overflow", "Connections opened beyond pool_size", "overflow"),
+        ):
+            getter = getattr(pool, fn, None)  # SQLite pools don't have all of these
+            if getter is not None:
+                yield GaugeMetricFamily(name, help_, value=getter())
+
+
+def route_template(scope) -> str:
+    # Newer FastAPI keeps scope["route"] router-local and puts the prefixed
+    # template under scope["fastapi"]; older versions only have the route.
+    ctx = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(ctx, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "<unmatched>"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = IN_FLIGHT.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            in_flight.dec()
+            # route template keeps label cardinality bounded (no raw ids)
+            REQUEST_LATENCY.labels(method, route_template(scope), str(status["code"])).observe(time.perf_counter() - started)
+
+
+def metrics_endpoint() -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+def install(app: FastAPI):
+    """Add the timing middleware, pool/cache collectors and GET /metrics."""
+    if not ENABLED:
+        return
+    REGISTRY.register(_PoolCollector())
+    REGISTRY.register(_CacheCollector())
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
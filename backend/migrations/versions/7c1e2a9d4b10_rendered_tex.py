@@ -0,0 +1,34 @@
+"""rendered_tex cache table
+
+Revision ID: 7c1e2a9d4b10
+Revises: 56f0447f325f
+Create Date: 2026-10-19 10:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e2a9d4b10"
+down_revision: Union[str, Sequence[str], None] = "56f0447f325f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "rendered_tex",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("renderer", sa.String(length=32), nullable=False),
+        sa.Column("html", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("content_hash"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rendered_tex")
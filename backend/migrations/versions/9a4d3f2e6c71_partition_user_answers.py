@@ -0,0 +1,139 @@
+"""partition user_answers by month, BRIN on created_at, archive stats table
+
+Revision ID: 9a4d3f2e6c71
+Revises: 7c1e2a9d4b10
+Create Date: 2026-10-19 12:00:00.000000
+
+Postgres: user_answers is rebuilt as a RANGE (created_at) partitioned table
+with one partition per month from the oldest answer through two months
+ahead, plus user_answers_default. Rows are copied, so run it in a
+maintenance window (the table is locked for the copy). Later months are
+created by services/answer_partitions.py.
+
+Indexes: ix_user_answers_problem_id (covered by ix_answers_problem_user) and
+ix_user_answers_id (covered by the primary key) are dropped; a BRIN index on
+created_at is added. Other databases only get the index changes.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4d3f2e6c71"
+down_revision: Union[str, Sequence[str], None] = "7c1e2a9d4b10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+AHEAD_MONTHS = 2
+
+
+def _add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_answer_archive_stats",
+        sa.Column("problem_id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("attempted", sa.Integer(), nullable=False),
+        sa.Column("solved", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["problem_id"], ["problems.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("problem_id", "month"),
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        op.drop_index(op.f("ix_user_answers_problem_id"), table_name="user_answers")
+        op.drop_index(op.f("ix_user_answers_id"), table_name="user_answers")
+        op.create_index("ix_user_answers_created_brin", "user_answers", ["created_at"], unique=False)
+        return
+
+    # --- move the old table out of the way (its indexes are rebuilt on the new one) ---
+    op.execute("ALTER TABLE user_answers RENAME TO user_answers_legacy")
+    op.execute("ALTER TABLE user_answers_legacy RENAME CONSTRAINT user_answers_pkey TO user_answers_legacy_pkey")
+    for ix in ("ix_answers_problem_user", "ix_user_answers_id", "ix_user_answers_problem_id", "ix_user_answers_user_id"):
+        op.execute(f"DROP INDEX IF EXISTS {ix}")
+
+    # --- partitioned parent (the partition key must be part of the PK) ---
+    op.execute("""
+        CREATE TABLE user_answers (
+            id integer NOT NULL DEFAULT nextval('user_answers_id_seq'::regclass),
+            user_id integer CONSTRAINT user_answers_user_id_fkey REFERENCES users(id) ON DELETE SET NULL,
+            problem_id integer NOT NULL CONSTRAINT user_answers_problem_id_fkey REFERENCES problems(id) ON DELETE CASCADE,
+            chosen_option varchar(1) NOT NULL,
+            is_correct boolean NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT ck_chosen_option CHECK (chosen_option IN ('A','B','C','D')),
+            CONSTRAINT user_answers_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE user_answers_id_seq OWNED BY user_answers.id")
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM user_answers_legacy")).scalar()
+    month = (oldest.date() if oldest else date.today()).replace(day=1)
+    last = _add_months(date.today().replace(day=1), AHEAD_MONTHS)
+    while month <= last:
+        nxt = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE user_answers_{month.year}{month.month:02d} PARTITION OF user_answers "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{nxt.isoformat()}')"
+        )
+        month = nxt
+    op.execute("CREATE TABLE user_answers_default PARTITION OF user_answers DEFAULT")
+
+    # --- copy, then index (faster than maintaining indexes row by row) ---
+    op.execute("""
+        INSERT INTO user_answers (id, user_id, problem_id, chosen_option, is_correct, created_at)
+        SELECT id, user_id, problem_id, chosen_option, is_correct, created_at FROM user_answers_legacy
+    """)
+    op.execute("CREATE INDEX ix_answers_problem_user ON user_answers (problem_id, user_id)")
+    op.execute("CREATE INDEX ix_user_answers_user_id ON user_answers (user_id)")
+    op.execute("CREATE INDEX ix_user_answers_created_brin ON user_answers USING brin (created_at)")
+    op.execute("DROP TABLE user_answers_legacy")
+    op.execute("ANALYZE user_answers")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        op.drop_index("ix_user_answers_created_brin", table_name="user_answers")
+        op.create_index(op.f("ix_user_answers_id"), "user_answers", ["id"], unique=False)
+        op.create_index(op.f("ix_user_answers_problem_id"), "user_answers", ["problem_id"], unique=False)
+        op.drop_table("user_answer_archive_stats")
+        return
+
+    # archived (detached) partitions are not brought back; their totals go with the stats table
+    op.execute("ALTER TABLE user_answers RENAME TO user_answers_partitioned")
+    op.execute("ALTER TABLE user_answers_partitioned RENAME CONSTRAINT user_answers_pkey TO user_answers_partitioned_pkey")
+    for ix in ("ix_answers_problem_user", "ix_user_answers_user_id", "ix_user_answers_created_brin"):
+        op.execute(f"DROP INDEX IF EXISTS {ix}")
+    op.execute("""
+        CREATE TABLE user_answers (
+            id integer NOT NULL DEFAULT nextval('user_answers_id_seq'::regclass),
+            user_id integer CONSTRAINT user_answers_user_id_fkey REFERENCES users(id) ON DELETE SET NULL,
+            problem_id integer NOT NULL CONSTRAINT user_answers_problem_id_fkey REFERENCES problems(id) ON DELETE CASCADE,
+            chosen_option varchar(1) NOT NULL,
+            is_correct boolean NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT ck_chosen_option CHECK (chosen_option IN ('A','B','C','D')),
+            CONSTRAINT user_answers_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE user_answers_id_seq OWNED BY user_answers.id")
+    op.execute("""
+        INSERT INTO user_answers (id, user_id, problem_id, chosen_option, is_correct, created_at)
+        SELECT id, user_id, problem_id, chosen_option, is_correct, created_at FROM user_answers_partitioned
+    """)
+    op.execute("DROP TABLE user_answers_partitioned")  # drops its partitions too
+    op.create_index("ix_answers_problem_user", "user_answers", ["problem_id", "user_id"], unique=False)
+    op.create_index(op.f("ix_user_answers_id"), "user_answers", ["id"], unique=False)
+    op.create_index(op.f("ix_user_answers_problem_id"), "user_answers", ["problem_id"], unique=False)
+    op.create_index(op.f("ix_user_answers_user_id"), "user_answers", ["user_id"], unique=False)
+    op.drop_table("user_answer_archive_stats")
@@ -0,0 +1,72 @@
+"""contests, contest questions, submissions and precomputed reports
+
+Revision ID: a5d2e8f1c7b3
+Revises: f3c8d1a6b5e4
+Create Date: 2026-10-19 20:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a5d2e8f1c7b3"
+down_revision: Union[str, Sequence[str], None] = "f3c8d1a6b5e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+subject_enum = postgresql.ENUM("math", "physics", "chemistry", name="subjectenum", create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "contests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("starts_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ends_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("question_count", sa.Integer(), nullable=False),
+        sa.Column("closed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("participant_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "contest_questions",
+        sa.Column("contest_id", sa.Integer(), nullable=False),
+        sa.Column("question_no", sa.Integer(), nullable=False),
+        sa.Column("problem_id", sa.Integer(), nullable=False),
+        sa.Column("subject", subject_enum, nullable=False),
+        sa.ForeignKeyConstraint(["contest_id"], ["contests.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["problem_id"], ["problems.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("contest_id", "question_no"),
+    )
+    op.create_table(
+        "contest_submissions",
+        sa.Column("contest_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("answers", sa.String(length=500), nullable=False),
+        sa.Column("time_spent_seconds", sa.Integer(), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["contest_id"], ["contests.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("contest_id", "user_id"),
+    )
+    op.create_table(
+        "contest_reports",
+        sa.Column("contest_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("blob", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(["contest_id"], ["contests.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("contest_id", "user_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("contest_reports")
+    op.drop_table("contest_submissions")
+    op.drop_table("contest_questions")
+    op.drop_table("contests")
@@ -0,0 +1,105 @@
+"""pyq papers, question mapping, chapter counts, paper attempts
+
+Revision ID: b3e8c1d5a7f2
+Revises: 9a4d3f2e6c71
+Create Date: 2026-10-19 14:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8c1d5a7f2"
+down_revision: Union[str, Sequence[str], None] = "9a4d3f2e6c71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# subjectenum/difficultyenum come from the baseline; examenum is created here once
+exam_enum = postgresql.ENUM("mains", "advanced", name="examenum", create_type=False)
+subject_enum = postgresql.ENUM("math", "physics", "chemistry", name="subjectenum", create_type=False)
+difficulty_enum = postgresql.ENUM("easy", "medium", "hard", name="difficultyenum", create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    exam_enum.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        "pyq_papers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("exam", exam_enum, nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("exam_date", sa.Date(), nullable=False),
+        sa.Column("shift", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("question_count", sa.Integer(), nullable=False),
+        sa.Column("max_score", sa.Integer(), nullable=False),
+        sa.Column("attempt_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("exam", "exam_date", "shift", name="uq_pyq_paper_sitting"),
+    )
+    op.create_index("ix_pyq_papers_year_exam", "pyq_papers", ["year", "exam"], unique=False)
+
+    op.create_table(
+        "pyq_questions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("paper_id", sa.Integer(), nullable=False),
+        sa.Column("problem_id", sa.Integer(), nullable=False),
+        sa.Column("question_no", sa.Integer(), nullable=False),
+        sa.Column("exam", exam_enum, nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("exam_date", sa.Date(), nullable=False),
+        sa.Column("shift", sa.Integer(), nullable=False),
+        sa.Column("subject", subject_enum, nullable=False),
+        sa.Column("chapter", sa.String(length=120), nullable=False),
+        sa.Column("difficulty", difficulty_enum, nullable=False),
+        sa.ForeignKeyConstraint(["paper_id"], ["pyq_papers.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["problem_id"], ["problems.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("paper_id", "question_no", name="uq_pyq_paper_question_no"),
+    )
+    op.create_index("ix_pyq_questions_chapter", "pyq_questions", ["subject", "chapter", "exam", "exam_date"], unique=False)
+    op.create_index("ix_pyq_questions_year", "pyq_questions", ["year", "shift", "subject"], unique=False)
+    op.create_index("ix_pyq_questions_problem", "pyq_questions", ["problem_id"], unique=False)
+
+    op.create_table(
+        "pyq_chapter_counts",
+        sa.Column("subject", subject_enum, nullable=False),
+        sa.Column("chapter", sa.String(length=120), nullable=False),
+        sa.Column("exam", exam_enum, nullable=False),
+        sa.Column("question_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("subject", "chapter", "exam"),
+    )
+
+    op.create_table(
+        "pyq_attempts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("paper_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("correct", sa.Integer(), nullable=False),
+        sa.Column("wrong", sa.Integer(), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["paper_id"], ["pyq_papers.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_pyq_attempts_user_paper", "pyq_attempts", ["user_id", "paper_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_pyq_attempts_user_paper", table_name="pyq_attempts")
+    op.drop_table("pyq_attempts")
+    op.drop_table("pyq_chapter_counts")
+    op.drop_index("ix_pyq_questions_problem", table_name="pyq_questions")
+    op.drop_index("ix_pyq_questions_year", table_name="pyq_questions")
+    op.drop_index("ix_pyq_questions_chapter", table_name="pyq_questions")
+    op.drop_table("pyq_questions")
+    op.drop_index("ix_pyq_papers_year_exam", table_name="pyq_papers")
+    op.drop_table("pyq_papers")
+    exam_enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,40 @@
+"""problem_neighbors: precomputed similar problems
+
+Revision ID: b8e3f0a2d9c4
+Revises: a5d2e8f1c7b3
+Create Date: 2026-10-19 21:00:00.000000
+
+Starts empty; the first refresh (app background job or
+`python -m scripts.build_similar`) indexes every active problem, later
+refreshes only search for problems added or edited since.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e3f0a2d9c4"
+down_revision: Union[str, Sequence[str], None] = "a5d2e8f1c7b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "problem_neighbors",
+        sa.Column("problem_id", sa.Integer(), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("neighbor_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["problem_id"], ["problems.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["neighbor_id"], ["problems.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("problem_id", "rank"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("problem_neighbors")
@@ -0,0 +1,34 @@
+"""daily_rollouts.updated_at: a touched timestamp for the daily cache stamp
+
+Revision ID: c2d6f9a4e1b8
+Revises: b8e3f0a2d9c4
+Create Date: 2026-10-19 22:00:00.000000
+
+max(id) missed rollouts re-pointed in place (scripts/seed_daily.py), so a
+warm restart could bring back yesterday's payload. Existing rows take the
+server default; the ORM bumps it on every UPDATE.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2d6f9a4e1b8"
+down_revision: Union[str, Sequence[str], None] = "b8e3f0a2d9c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "daily_rollouts",
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("daily_rollouts", "updated_at")
@@ -0,0 +1,45 @@
+"""review_items: SM-2 review queue
+
+Revision ID: c4f9a2b6d8e3
+Revises: b3e8c1d5a7f2
+Create Date: 2026-10-19 15:00:00.000000
+
+Existing wrong answers are not queued here; run
+`python -m scripts.replan_reviews --backfill` once after upgrading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f9a2b6d8e3"
+down_revision: Union[str, Sequence[str], None] = "b3e8c1d5a7f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "review_items",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("problem_id", sa.Integer(), nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("interval_days", sa.Integer(), nullable=False),
+        sa.Column("ease", sa.Float(), nullable=False),
+        sa.Column("repetitions", sa.Integer(), nullable=False),
+        sa.Column("lapses", sa.Integer(), nullable=False),
+        sa.Column("last_reviewed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["problem_id"], ["problems.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "problem_id"),
+    )
+    op.create_index("ix_review_items_user_due", "review_items", ["user_id", "due_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_review_items_user_due", table_name="review_items")
+    op.drop_table("review_items")
@@ -0,0 +1,85 @@
+"""rationalize indexes: drop duplicates, add composites that match the queries
+
+Revision ID: d7a1e5c3b902
+Revises: c4f9a2b6d8e3
+Create Date: 2026-10-19 16:00:00.000000
+
+Dropped (covered by a primary key, a unique constraint or another index):
+  problem_likes  ix_problem_likes_id, ix_problem_likes_problem_id,
+                 ix_problem_likes_user, ix_problem_likes_user_id
+                 (uq_like_once (user_id, problem_id) serves user lookups,
+                 ix_problem_likes_problem serves per-problem counts)
+  problems       ix_problems_id, ix_problems_difficulty (3 values, never selective)
+  users          ix_users_id
+  comments       ix_comments_id
+  daily_problems ix_daily_problems_id, ix_daily_problems_date, ix_daily_problems_subject
+
+Replaced:
+  problems       ix_problems_subject -> ix_problems_subject_id (subject, id):
+                 next daily pick is WHERE subject = ? AND id > ? ORDER BY id
+  daily_rollouts ix_daily_rollouts_subject_date -> ix_daily_rollouts_subject_date_desc
+                 (subject, date DESC) INCLUDE (problem_id): latest rollout per subject
+                 is an index-only scan
+  user_answers   ix_user_answers_user_id -> ix_user_answers_user_problem (user_id, problem_id):
+                 "already answered?" and per-user answered ids
+
+Check with `python -m scripts.explain_check` against a seeded database.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a1e5c3b902"
+down_revision: Union[str, Sequence[str], None] = "c4f9a2b6d8e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DROPPED = [
+    ("problem_likes", "ix_problem_likes_id", ["id"]),
+    ("problem_likes", "ix_problem_likes_problem_id", ["problem_id"]),
+    ("problem_likes", "ix_problem_likes_user", ["user_id"]),
+    ("problem_likes", "ix_problem_likes_user_id", ["user_id"]),
+    ("problems", "ix_problems_id", ["id"]),
+    ("problems", "ix_problems_difficulty", ["difficulty"]),
+    ("users", "ix_users_id", ["id"]),
+    ("comments", "ix_comments_id", ["id"]),
+    ("daily_problems", "ix_daily_problems_id", ["id"]),
+    ("daily_problems", "ix_daily_problems_date", ["date"]),
+    ("daily_problems", "ix_daily_problems_subject", ["subject"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, name, _ in DROPPED:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+    op.create_index("ix_problems_subject_id", "problems", ["subject", "id"], unique=False)
+    op.drop_index("ix_problems_subject", table_name="problems", if_exists=True)
+
+    op.create_index(
+        "ix_daily_rollouts_subject_date_desc", "daily_rollouts", ["subject", "date"], unique=False,
+        postgresql_ops={"date": "DESC"}, postgresql_include=["problem_id"],
+    )
+    op.drop_index("ix_daily_rollouts_subject_date", table_name="daily_rollouts", if_exists=True)
+
+    # on Postgres user_answers is partitioned: this cascades to every partition
+    op.create_index("ix_user_answers_user_problem", "user_answers", ["user_id", "problem_id"], unique=False)
+    op.drop_index("ix_user_answers_user_id", table_name="user_answers", if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_user_answers_user_id", "user_answers", ["user_id"], unique=False)
+    op.drop_index("ix_user_answers_user_problem", table_name="user_answers")
+
+    op.create_index("ix_daily_rollouts_subject_date", "daily_rollouts", ["subject", "date"], unique=False)
+    op.drop_index("ix_daily_rollouts_subject_date_desc", table_name="daily_rollouts")
+
+    op.create_index("ix_problems_subject", "problems", ["subject"], unique=False)
+    op.drop_index("ix_problems_subject_id", table_name="problems")
+
+    for table, name, cols in reversed(DROPPED):
+        op.create_index(name, table, cols, unique=False)
@@ -0,0 +1,33 @@
+"""problems.is_active: soft-deactivate problems from the admin API
+
+Revision ID: e1b7f4c9a2d6
+Revises: d7a1e5c3b902
+Create Date: 2026-10-19 18:00:00.000000
+
+The daily picker already filters on Problem.is_active; existing rows stay
+active. The server default fills the column without rewriting the table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1b7f4c9a2d6"
+down_revision: Union[str, Sequence[str], None] = "d7a1e5c3b902"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "problems",
+        sa.Column("is_active", sa.Boolean(), server_default=sa.text("true"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("problems", "is_active")
@@ -0,0 +1,51 @@
+"""chapter_stats rollup and rollup_watermarks
+
+Revision ID: f3c8d1a6b5e4
+Revises: e1b7f4c9a2d6
+Create Date: 2026-10-19 19:00:00.000000
+
+Both tables start empty; the first refresh (app background job or
+`python -m scripts.refresh_stats`) builds the rollup from archived totals
+and all live answers, later refreshes only read answers past the watermark.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c8d1a6b5e4"
+down_revision: Union[str, Sequence[str], None] = "e1b7f4c9a2d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+subject_enum = postgresql.ENUM("math", "physics", "chemistry", name="subjectenum", create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "chapter_stats",
+        sa.Column("subject", subject_enum, nullable=False),
+        sa.Column("chapter", sa.String(length=120), nullable=False),
+        sa.Column("topic", sa.String(length=120), nullable=False),
+        sa.Column("problem_count", sa.Integer(), nullable=False),
+        sa.Column("attempted", sa.BigInteger(), nullable=False),
+        sa.Column("solved", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("subject", "chapter", "topic"),
+    )
+    op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rollup_watermarks")
+    op.drop_table("chapter_stats")
@@ -1,6 +1,6 @@
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Boolean, Text, Enum, ForeignKey,
-    UniqueConstraint, CheckConstraint, Date, func, Index
+    Column, Integer, BigInteger, Float, String, DateTime, Boolean, Text, Enum, ForeignKey,
+    UniqueConstraint, CheckConstraint, Date, func, Index, LargeBinary
 )
 from sqlalchemy.orm import relationship
 from database import Base
@@ -14,7 +14,7 @@ import enum
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     firebase_uid = Column(String(128), unique=True, index=True, nullable=False)
     email = Column(String(320), unique=True, index=True, nullable=False)
     display_name = Column(String(200), nullable=True)
@@ -52,11 +52,11 @@ class DifficultyEnum(str, enum.Enum):
 class Problem(Base):
     __tablename__ = "problems"
 
-    id = Column(Integer, primary_key=True, index=True)
-    subject = Column(Enum(SubjectEnum), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    subject = Column(Enum(SubjectEnum), nullable=False)
     topic = Column(String(120), nullable=False)
     chapter = Column(String(120), nullable=False)
-    difficulty = Column(Enum(DifficultyEnum), nullable=False, index=True)
+    difficulty = Column(Enum(DifficultyEnum), nullable=False)
 
     question_tex = Column(Text, nullable=False)
     option_a_tex = Column(Text, nullable=False)
@@ -71,7 +71,11 @@ class Problem(Base):
     attempt_count = Column(Integer, default=0, nullable=False)
     solve_count   = Column(Integer, default=0, nullable=False)
 
+    # deactivated problems are skipped by the daily picker (admin API)
+    is_active = Column(Boolean, default=True, server_default="true", nullable=False)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # optimistic concurrency token for admin batch edits (services/problem_admin.py)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     answers  = relationship("UserAnswer", back_populates="problem", cascade="all, delete-orphan", lazy="noload")
@@ -80,6 +84,7 @@ class Problem(Base):
 
     __table_args__ = (
         CheckConstraint("correct_option IN ('A','B','C','D')", name="ck_correct_option"),
+        Index("ix_problems_subject_id", "subject", "id"),   # next daily pick: subject = ? AND id > ?
         Index("ix_problems_topic", "topic"),
         Index("ix_problems_chapter", "chapter"),
     )
@@ -92,9 +97,9 @@ USER_TABLE    = "users"
 class DailyProblem(Base):
     __tablename__ = "daily_problems"
 
-    id = Column(Integer, primary_key=True, index=True)
-    date = Column(Date, nullable=False, index=True)
-    subject = Column(Enum(SubjectEnum), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    subject = Column(Enum(SubjectEnum), nullable=False)
     problem_id = Column(Integer, ForeignKey("problems.id", ondelete="CASCADE"), unique=True, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
 
@@ -113,20 +118,26 @@ class DailyRollout(Base):
     subject = Column(String(20), nullable=False)
     problem_id = Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # bumped when a rollout is re-pointed (scripts/seed_daily.py); part of the daily cache stamp
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     problem = relationship("Problem", lazy="joined")
 
     __table_args__ = (
         UniqueConstraint("date", "subject", name="uq_daily_rollouts_date_subject"),
-        Index("ix_daily_rollouts_subject_date", "subject", "date"),
+        # latest rollout per subject, index-only on Postgres
+        Index("ix_daily_rollouts_subject_date_desc", "subject", "date",
+              postgresql_ops={"date": "DESC"}, postgresql_include=["problem_id"]),
     )
 
+# ⚠️ On Postgres this table is range-partitioned by month on created_at (PK is
+# (id, created_at) there); see migrations 9a4d3f2e6c71 and services/answer_partitions.py.
 class UserAnswer(Base):
     __tablename__ = "user_answers"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id   = Column(Integer, ForeignKey(f"{USER_TABLE}.id", ondelete="SET NULL"), index=True, nullable=True)
-    problem_id= Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    user_id   = Column(Integer, ForeignKey(f"{USER_TABLE}.id", ondelete="SET NULL"), nullable=True)
+    problem_id= Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), nullable=False)
     chosen_option = Column(String(1), nullable=False)
     is_correct    = Column(Boolean, default=False, nullable=False)
     created_at    = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -136,30 +147,40 @@ class UserAnswer(Base):
 
     __table_args__ = (
         CheckConstraint("chosen_option IN ('A','B','C','D')", name="ck_chosen_option"),
-        Index("ix_answers_problem_user", "problem_id", "user_id"),
+        Index("ix_answers_problem_user", "problem_id", "user_id"),   # also serves problem_id lookups
+        Index("ix_user_answers_user_problem", "user_id", "problem_id"),  # also serves user_id lookups
+        Index("ix_user_answers_created_brin", "created_at", postgresql_using="brin"),
     )
 
+class AnswerArchiveStat(Base):
+    """Per-problem, per-month totals of user_answers partitions that were archived."""
+    __tablename__ = "user_answer_archive_stats"
+
+    problem_id = Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), primary_key=True)
+    month      = Column(Date, primary_key=True)   # first day of the month
+    attempted  = Column(Integer, nullable=False)
+    solved     = Column(Integer, nullable=False)
+
 class ProblemLike(Base):
     __tablename__ = "problem_likes"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id   = Column(Integer, ForeignKey(f"{USER_TABLE}.id", ondelete="CASCADE"), index=True, nullable=False)
-    problem_id= Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    user_id   = Column(Integer, ForeignKey(f"{USER_TABLE}.id", ondelete="CASCADE"), nullable=False)
+    problem_id= Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), nullable=False)
     created_at= Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     user    = relationship("User", back_populates="likes", lazy="joined")
     problem = relationship("Problem", back_populates="likes")
 
     __table_args__ = (
-        UniqueConstraint("user_id", "problem_id", name="uq_like_once"),
-        Index("ix_like_problem", "problem_id"),
-        Index("ix_like_user", "user_id"),
+        UniqueConstraint("user_id", "problem_id", name="uq_like_once"),   # also serves user_id lookups
+        Index("ix_problem_likes_problem", "problem_id"),
     )
 
 class Comment(Base):
     __tablename__ = "comments"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     problem_id = Column(Integer, ForeignKey("problems.id", ondelete="CASCADE"), index=True, nullable=False)
     user_id    = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     parent_id  = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"), nullable=True)
@@ -169,3 +190,200 @@ class Comment(Base):
 
     problem = relationship("Problem", back_populates="comments")
     user    = relationship("User", back_populates="comments")
+
+# =========================
+# ✅ PRE-RENDERED TEX (services/tex_render.py)
+# =========================
+class RenderedTex(Base):
+    __tablename__ = "rendered_tex"
+
+    # sha256 of (renderer version, mode, source TeX); identical text is stored once
+    content_hash = Column(String(64), primary_key=True)
+    renderer     = Column(String(32), nullable=False)
+    html         = Column(Text, nullable=False)
+    created_at   = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+# =========================
+# 📚 PYQ (previous-year papers)
+# =========================
+
+class ExamEnum(str, enum.Enum):
+    mains = "mains"
+    advanced = "advanced"
+
+class PyqPaper(Base):
+    __tablename__ = "pyq_papers"
+
+    id = Column(Integer, primary_key=True)
+    exam = Column(Enum(ExamEnum), nullable=False)
+    year = Column(Integer, nullable=False)
+    exam_date = Column(Date, nullable=False)
+    shift = Column(Integer, nullable=False, default=1)
+    title = Column(String(200), nullable=False)
+    question_count = Column(Integer, nullable=False, default=0)
+    max_score = Column(Integer, nullable=False, default=0)
+
+    # running totals, bumped in the same transaction as each attempt (services/pyq.py)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("exam", "exam_date", "shift", name="uq_pyq_paper_sitting"),
+        Index("ix_pyq_papers_year_exam", "year", "exam"),
+    )
+
+class PyqQuestion(Base):
+    """Maps a problem into a paper. Filter columns are copied from the paper/problem
+    at import so listings never join back to them."""
+    __tablename__ = "pyq_questions"
+
+    id = Column(Integer, primary_key=True)
+    paper_id = Column(Integer, ForeignKey("pyq_papers.id", ondelete="CASCADE"), nullable=False)
+    problem_id = Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), nullable=False)
+    question_no = Column(Integer, nullable=False)
+
+    exam = Column(Enum(ExamEnum), nullable=False)
+    year = Column(Integer, nullable=False)
+    exam_date = Column(Date, nullable=False)
+    shift = Column(Integer, nullable=False)
+    subject = Column(Enum(SubjectEnum), nullable=False)
+    chapter = Column(String(120), nullable=False)
+    difficulty = Column(Enum(DifficultyEnum), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("paper_id", "question_no", name="uq_pyq_paper_question_no"),
+        # chapter page: WHERE subject, chapter [, exam] ORDER BY exam_date DESC
+        Index("ix_pyq_questions_chapter", "subject", "chapter", "exam", "exam_date"),
+        # year/shift browsing
+        Index("ix_pyq_questions_year", "year", "shift", "subject"),
+        Index("ix_pyq_questions_problem", "problem_id"),
+    )
+
+class PyqChapterCount(Base):
+    """Question counts per (subject, chapter, exam), refreshed by the importer."""
+    __tablename__ = "pyq_chapter_counts"
+
+    subject = Column(Enum(SubjectEnum), primary_key=True)
+    chapter = Column(String(120), primary_key=True)
+    exam = Column(Enum(ExamEnum), primary_key=True)
+    question_count = Column(Integer, nullable=False)
+
+class PyqAttempt(Base):
+    __tablename__ = "pyq_attempts"
+
+    id = Column(Integer, primary_key=True)
+    paper_id = Column(Integer, ForeignKey("pyq_papers.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey(f"{USER_TABLE}.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Integer, nullable=False)
+    correct = Column(Integer, nullable=False)
+    wrong = Column(Integer, nullable=False)
+    submitted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_pyq_attempts_user_paper", "user_id", "paper_id"),
+    )
+
+# =========================
+# 🔁 Spaced repetition (SM-2)
+# =========================
+
+class ReviewItem(Base):
+    """One per (user, problem) answered wrong at least once; see services/review.py."""
+    __tablename__ = "review_items"
+
+    user_id = Column(Integer, ForeignKey(f"{USER_TABLE}.id", ondelete="CASCADE"), primary_key=True)
+    problem_id = Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), primary_key=True)
+    due_at = Column(DateTime(timezone=True), nullable=False)
+    interval_days = Column(Integer, nullable=False, default=1)
+    ease = Column(Float, nullable=False, default=2.5)
+    repetitions = Column(Integer, nullable=False, default=0)
+    lapses = Column(Integer, nullable=False, default=0)
+    last_reviewed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # review queue: WHERE user_id = ? AND due_at <= now() ORDER BY due_at LIMIT n
+        Index("ix_review_items_user_due", "user_id", "due_at"),
+    )
+
+# =========================
+# 📊 Chapter / topic stats rollup
+# =========================
+
+class ChapterStat(Base):
+    """Answer totals per (subject, chapter, topic), rolled up incrementally from
+    user_answers.created_at; see services/chapter_stats.py."""
+    __tablename__ = "chapter_stats"
+
+    subject = Column(Enum(SubjectEnum), primary_key=True)
+    chapter = Column(String(120), primary_key=True)
+    topic = Column(String(120), primary_key=True)
+    problem_count = Column(Integer, nullable=False, default=0)   # active problems
+    attempted = Column(BigInteger, nullable=False, default=0)
+    solved = Column(BigInteger, nullable=False, default=0)
+
+class RollupWatermark(Base):
+    """How far each rollup has consumed its source: rows with created_at < watermark are in."""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(64), primary_key=True)
+    watermark = Column(DateTime(timezone=True), nullable=False)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
+
+# =========================
+# 🏁 Contests
+# =========================
+
+class Contest(Base):
+    __tablename__ = "contests"
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(200), nullable=False)
+    starts_at = Column(DateTime(timezone=True), nullable=False)
+    ends_at = Column(DateTime(timezone=True), nullable=False)
+    question_count = Column(Integer, nullable=False, default=0)
+    # set when the contest is closed and its reports are built (services/contest_report.py)
+    closed_at = Column(DateTime(timezone=True), nullable=True)
+    participant_count = Column(Integer, nullable=False, default=0)
+
+class ContestQuestion(Base):
+    """Question `question_no` (1-based) of a contest; subject is copied from the problem."""
+    __tablename__ = "contest_questions"
+
+    contest_id = Column(Integer, ForeignKey("contests.id", ondelete="CASCADE"), primary_key=True)
+    question_no = Column(Integer, primary_key=True)
+    problem_id = Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), nullable=False)
+    subject = Column(Enum(SubjectEnum), nullable=False)
+
+class ContestSubmission(Base):
+    """One per (contest, user). `answers` has one character per question in
+    question_no order: 'A'-'D', or '-' for unanswered."""
+    __tablename__ = "contest_submissions"
+
+    contest_id = Column(Integer, ForeignKey("contests.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey(f"{USER_TABLE}.id", ondelete="CASCADE"), primary_key=True)
+    answers = Column(String(500), nullable=False)
+    time_spent_seconds = Column(Integer, nullable=False, default=0)
+    submitted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class ContestReport(Base):
+    """Precomputed report documents: user_id 0 is the contest-wide part (gzip'd
+    JSON), every other row one participant's part (JSON)."""
+    __tablename__ = "contest_reports"
+
+    contest_id = Column(Integer, ForeignKey("contests.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    blob = Column(LargeBinary, nullable=False)
+
+# =========================
+# 🔎 Similar problems
+# =========================
+
+class ProblemNeighbor(Base):
+    """Precomputed nearest neighbours: the `rank`-th (1-based) most similar problem
+    to `problem_id`, by TF-IDF cosine; see services/similar.py."""
+    __tablename__ = "problem_neighbors"
+
+    problem_id = Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    neighbor_id = Column(Integer, ForeignKey(f"{PROBLEM_TABLE}.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)
@@ -0,0 +1,74 @@
+# backend/routes/admin.py
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from deps import get_admin_user_id, get_db
+from models import SubjectEnum
+from schemas import (
+    AdminProblemOut, ContestCloseOut, ContestCreate, ContestOut,
+    ProblemBatchOut, ProblemCreateBatch, ProblemDeactivateBatch, ProblemPatchBatch,
+)
+from services import contests, problem_admin
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(get_admin_user_id)])
+
+
+def _run(fn, *args) -> dict:
+    try:
+        result = fn(*args)
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+    if result["conflicts"] and not result["applied"]:
+        # 🔒 stale updated_at (or unknown id): re-read those rows and retry
+        raise HTTPException(409, {"message": "Problems changed since read", "conflicts": jsonable_encoder(result["conflicts"])})
+    return result
+
+
+# 📋 read from the primary: the versions returned here are what patches must quote
+@router.get("/problems", response_model=List[AdminProblemOut])
+def list_problems(
+    ids: Optional[List[int]] = Query(None),
+    subject: Optional[SubjectEnum] = None,
+    chapter: Optional[str] = None,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    return problem_admin.list_problems(db, ids, subject, chapter, after_id, limit)
+
+
+@router.post("/problems/batch", response_model=ProblemBatchOut)
+def create_problems(body: ProblemCreateBatch, db: Session = Depends(get_db)):
+    return _run(problem_admin.create_batch, db, [p.model_dump() for p in body.problems])
+
+
+@router.patch("/problems/batch", response_model=ProblemBatchOut)
+def patch_problems(body: ProblemPatchBatch, db: Session = Depends(get_db)):
+    patches = [p.model_dump(exclude_unset=True) for p in body.problems]
+    return _run(problem_admin.patch_batch, db, patches, body.atomic)
+
+
+@router.post("/problems/deactivate", response_model=ProblemBatchOut)
+def deactivate_problems(body: ProblemDeactivateBatch, db: Session = Depends(get_db)):
+    versions = [p.model_dump() for p in body.problems]
+    return _run(problem_admin.deactivate_batch, db, versions, body.atomic)
+
+
+# 🏁 contests: create from a list of problems; closing builds every participant's report
+@router.post("/contests", response_model=ContestOut)
+def create_contest(body: ContestCreate, db: Session = Depends(get_db)):
+    try:
+        return contests.create(db, body.title, body.starts_at, body.ends_at, body.problem_ids)
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+
+
+@router.post("/contests/{contest_id}/close", response_model=ContestCloseOut)
+def close_contest(contest_id: int, db: Session = Depends(get_db)):
+    result = contests.close(db, contest_id)
+    if result is None:
+        raise HTTPException(404, "Contest not found")
+    return result
@@ -1,13 +1,16 @@
 # backend/routes/attempts.py
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import Optional
 
-from deps import get_db, _ensure_db_user
+from db_routing import mark_write
+from deps import get_db, resolve_user_id
 from firebase_auth import get_current_firebase_user_optional
 from models import Problem as Question, UserAnswer
 from schemas import SubmitAnswerIn, SubmitAnswerOut
+from services.daily import stats_after_answer
+from services.user_state import user_state
+from tasks import post_commit
 
 router = APIRouter(prefix="/questions", tags=["attempts"])
 
@@ -61,8 +64,7 @@ def submit_answer(
 
     user_id = None
     if firebase_claims:
-        user = _ensure_db_user(db, firebase_claims)
-        user_id = user.id
+        user_id = resolve_user_id(db, firebase_claims)
 
         # block re-submission for authed users
         already = db.query(UserAnswer.id).filter_by(
@@ -83,18 +85,13 @@ def submit_answer(
         )
     )
     db.commit()
+    if firebase_claims:
+        mark_write(firebase_claims.get("uid"))
+        user_state.note_answer(user_id, question_id)
 
-    # recompute simple stats
-    attempted = db.query(func.count(UserAnswer.id)).filter(
-        UserAnswer.problem_id == question_id
-    ).scalar() or 0
-
-    solved = db.query(func.count(UserAnswer.id)).filter(
-        UserAnswer.problem_id == question_id,
-        UserAnswer.is_correct.is_(True)
-    ).scalar() or 0
-
-    accuracy = float(solved) / float(attempted) if attempted else 0.0
+    # cached stats + this answer; recount, review queue etc. run after the response
+    attempted, solved, _, accuracy = stats_after_answer(db, question_id, is_correct)
+    post_commit.emit("answer-recorded", problem_id=question_id, user_id=user_id, is_correct=is_correct)
 
     return {
         "isCorrect": is_correct,
@@ -2,7 +2,8 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
-from firebase_admin import auth as fb_auth
+
+import firebase_admin_init
 
 router = APIRouter(
     prefix="/auth",
@@ -22,6 +23,9 @@ def exchange_firebase_token(data: FirebaseExchangeRequest):
     Verify Firebase ID token and issue a backend JWT.
     For now, we'll return the same Firebase token or a dummy JWT.
     """
+    firebase_admin_init.ensure_initialized()
+    from firebase_admin import auth as fb_auth  # heavy; keep out of import time
+
     try:
         decoded = fb_auth.verify_id_token(data.id_token, check_revoked=True)
     except fb_auth.ExpiredIdTokenError:
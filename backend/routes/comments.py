@@ -2,7 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from deps import get_db, get_current_firebase_user
+from deps import get_db, get_read_db, get_current_firebase_user
 from models import Problem, Comment
 
 router = APIRouter()
@@ -29,7 +29,7 @@ def _ensure_db_user(db: Session, claims: dict):
     return user
 
 @router.get("/{problem_id}")
-def list_comments(problem_id: int, db: Session = Depends(get_db)):
+def list_comments(problem_id: int, db: Session = Depends(get_read_db)):
     if not db.get(Problem, problem_id):
         raise HTTPException(404, "Problem not found")
 
@@ -0,0 +1,69 @@
+# backend/routes/contests.py
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from db_routing import mark_write
+from deps import get_db, get_read_db, resolve_user_id
+from firebase_auth import get_current_firebase_user
+from models import Contest
+from schemas import ContestDetailOut, ContestOut, ContestSubmissionIn
+from services import contest_report, contests
+from services.daily import problem_payload
+
+router = APIRouter(prefix="/contests", tags=["contests"])
+
+
+@router.get("", response_model=List[ContestOut])
+def list_contests(limit: int = Query(50, ge=1, le=200), db: Session = Depends(get_read_db)):
+    return contests.list_contests(db, limit)
+
+
+@router.get("/{contest_id}", response_model=ContestDetailOut)
+def get_contest(contest_id: int, db: Session = Depends(get_read_db)):
+    contest = db.get(Contest, contest_id)
+    if not contest:
+        raise HTTPException(404, "Contest not found")
+    # 🔒 questions stay hidden until the contest starts
+    started = contests.started(contest)
+    questions = [problem_payload(p) for p in contests.questions(db, contest_id)] if started else []
+    return {**ContestOut.model_validate(contest).model_dump(), "questions": questions}
+
+
+@router.post("/{contest_id}/submission")
+def submit(
+    contest_id: int,
+    body: ContestSubmissionIn,
+    db: Session = Depends(get_db),
+    firebase_claims = Depends(get_current_firebase_user),
+):
+    user_id = resolve_user_id(db, firebase_claims)
+    try:
+        found = contests.submit(db, contest_id, user_id, body.answers, max(body.time_spent_seconds, 0))
+    except contests.ContestClosed:
+        raise HTTPException(409, "Contest is not open for submissions")
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+    if not found:
+        raise HTTPException(404, "Contest not found")
+    mark_write(firebase_claims.get("uid"))
+    return {"ok": True}
+
+
+# 📈 precomputed at close: the contest-wide part (cached) + one primary-key lookup for "me"
+@router.get("/{contest_id}/report")
+def get_report(
+    contest_id: int,
+    db: Session = Depends(get_read_db),
+    firebase_claims = Depends(get_current_firebase_user),
+):
+    contest = db.get(Contest, contest_id)
+    if not contest:
+        raise HTTPException(404, "Contest not found")
+    if contest.closed_at is None:
+        raise HTTPException(409, "Report is available once the contest is closed")
+    report = contest_report.report(db, contest_id, resolve_user_id(db, firebase_claims))
+    if report is None:
+        raise HTTPException(404, "Report not built")
+    return report
@@ -1,63 +1,91 @@
 # backend/routes/daily.py
-from fastapi import APIRouter, Depends, HTTPException
+from collections.abc import AsyncIterable
+import gzip
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.sse import EventSourceResponse, ServerSentEvent
 from sqlalchemy.orm import Session
 from datetime import date
 
-from deps import get_db, _ensure_db_user
+import lkg
+from deps import get_read_db, resolve_user_id
+from health import db_health
 from firebase_auth import get_current_firebase_user_optional
 from schemas import ProblemOut, ProblemStats
-from services.daily import get_or_create_daily_rollout, compute_stats, has_liked
-from models import SubjectEnum, DifficultyEnum, UserAnswer
+from services.bundle import MAX_DAYS, get_bundle
+from services.daily import get_daily_problem, compute_stats, has_liked
+from services.stats_stream import stats_hub
+from services.user_state import user_state
+from models import SubjectEnum, DifficultyEnum
 
 router = APIRouter(prefix="/daily", tags=["daily"])
 
+@router.get("/bundle")
+def get_offline_bundle(
+    request: Request,
+    days: int = Query(3, ge=0, le=MAX_DAYS),
+    db: Session = Depends(get_read_db),
+):
+    """Last/next `days` days of DPPs (all subjects) with hints and solutions, pre-gzipped."""
+    bundle = get_bundle(db, date.today(), days)
+    headers = {
+        "ETag": bundle["etag"],
+        "Cache-Control": "public, max-age=3600",
+        "Vary": "Accept-Encoding",
+    }
+    if request.headers.get("if-none-match") == bundle["etag"]:
+        return Response(status_code=304, headers=headers)
+
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(bundle["gz"], media_type="application/json",
+                        headers={**headers, "Content-Encoding": "gzip"})
+    return Response(gzip.decompress(bundle["gz"]), media_type="application/json", headers=headers)
+
 @router.get("/{subject}/today", response_model=ProblemOut)
 def get_today_question(
     subject: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     firebase_claims = Depends(get_current_firebase_user_optional)
 ):
-    # 🧠 Get today's question or create if missing
-    q = get_or_create_daily_rollout(db, subject, date.today())
-    if not q:
-        raise HTTPException(404, "No question found")
+    today = date.today()
+
+    def load():
+        # 🧠 Get today's question or create if missing (cached per subject/day)
+        q = get_daily_problem(db, subject, today)
+        if not q:
+            raise HTTPException(404, "No question found")
+
+        # 🧠 Compute stats
+        attempted, solved, likes_count, accuracy = compute_stats(db, q["id"])
+        return {**q, "stats": {"attempted": attempted, "solved": solved, "accuracy": accuracy}, "likes_count": likes_count}
+
+    # 🛟 DB down: last-known-good copy (lkg.py), without the per-user flags; keyed by
+    # day so yesterday's problem is never served as today's (no copy yet -> 503)
+    q = lkg.serve(f"daily:{subject}:{today.isoformat()}", load)
 
     # 🧠 Identify user if logged in
     user_id = None
     has_answered = False
-    if firebase_claims:
-        user = _ensure_db_user(db, firebase_claims)
-        user_id = user.id
-        has_answered = (
-            db.query(UserAnswer.id)
-            .filter(UserAnswer.user_id == user_id, UserAnswer.problem_id == q.id)
-            .first()
-            is not None
-        )
-
-    # 🧠 Compute stats
-    attempted, solved, likes_count, accuracy = compute_stats(db, q.id)
-    stats_obj = ProblemStats(attempted=attempted, solved=solved, accuracy=accuracy)
-
-    # 🧠 Enums
-    subj_val = SubjectEnum(q.subject) if isinstance(q.subject, str) else q.subject
-    diff_val = DifficultyEnum(q.difficulty) if isinstance(q.difficulty, str) else q.difficulty
+    if firebase_claims and db_health.up:
+        user_id = resolve_user_id(db, firebase_claims)
+        has_answered = user_state.has_answered(db, user_id, q["id"])
 
     return ProblemOut.model_validate({
-        "id": q.id,
-        "subject": subj_val,
-        "topic": q.topic,
-        "chapter": q.chapter,
-        "difficulty": diff_val,
-        "question_tex": q.question_tex,
-        "options": {
-            "A": q.option_a_tex,
-            "B": q.option_b_tex,
-            "C": q.option_c_tex,
-            "D": q.option_d_tex,
-        },
-        "stats": stats_obj,
-        "likes_count": likes_count,
-        "has_liked": has_liked(db, q.id, user_id),   # ✅ frontend depends on this
+        **q,
+        "subject": SubjectEnum(q["subject"]),
+        "difficulty": DifficultyEnum(q["difficulty"]),
+        "stats": ProblemStats(**q["stats"]),
+        "has_liked": has_liked(db, q["id"], user_id),   # ✅ frontend depends on this
         "has_answered": has_answered,
     })
+
+
+@router.get("/problems/{problem_id}/stats/stream", response_class=EventSourceResponse)
+async def stream_problem_stats(problem_id: int) -> AsyncIterable[ServerSentEvent]:
+    """Live attempted/solved/accuracy/likes for one problem (replaces polling)."""
+    # no DB session here: the per-process aggregator does the reads (services/stats_stream.py)
+    sub = stats_hub.subscribe(problem_id)
+    try:
+        while True:
+            yield ServerSentEvent(data=await sub.next(), event="stats")
+    finally:
+        stats_hub.unsubscribe(sub)
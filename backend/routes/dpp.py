@@ -3,8 +3,11 @@ from sqlalchemy.orm import Session
 from datetime import date as _date
 from typing import Optional
 
-from deps import get_db, get_current_firebase_user, get_current_firebase_user_optional
-from models import Problem, DailyProblem, ProblemLike, UserAnswer, SubjectEnum
+from db_routing import mark_write
+from deps import get_db, get_read_db, get_current_firebase_user, get_current_firebase_user_optional
+from models import Problem, DailyProblem, UserAnswer, SubjectEnum
+from services.like_buffer import like_buffer
+from services.user_state import user_state
 from schemas import (
     ProblemOut, ProblemStats, AnswerIn, AnswerOut,
     TodayAllOut, TodaySubjectBundle, HintOut, SolutionOut
@@ -43,7 +46,7 @@ def _ensure_db_user(db: Session, claims: dict):
 @router.get("/today", response_model=ProblemOut)
 def get_today_problem(
     subject: str = Query(..., pattern="^(math|physics|chemistry)$"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     claims: Optional[dict] = Depends(get_current_firebase_user_optional),
 ):
     today = _date.today()
@@ -61,7 +64,7 @@ def get_today_problem(
 
     p = dp.problem
 
-    likes_count = db.query(ProblemLike).filter_by(problem_id=p.id).count()
+    likes_count = like_buffer.count(db, p.id)
 
     has_liked = False
     has_answered = False
@@ -71,9 +74,9 @@ def get_today_problem(
 
     if claims:
         user = _ensure_db_user(db, claims)
-        has_liked = db.query(ProblemLike).filter_by(problem_id=p.id, user_id=user.id).first() is not None
-        ua = db.query(UserAnswer).filter_by(problem_id=p.id, user_id=user.id).first()
-        has_answered = ua is not None
+        has_liked = user_state.has_liked(db, user.id, p.id)
+        has_answered = user_state.has_answered(db, user.id, p.id)
+        ua = db.query(UserAnswer).filter_by(problem_id=p.id, user_id=user.id).first() if has_answered else None
         if ua:
             my_choice = ua.chosen_option
             is_correct = ua.is_correct
@@ -105,7 +108,7 @@ def get_today_problem(
 # ✅ GET today problems for all subjects
 @router.get("/today/all", response_model=TodayAllOut)
 def get_today_all(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     claims: Optional[dict] = Depends(get_current_firebase_user_optional),
 ):
     today = _date.today()
@@ -114,22 +117,32 @@ def get_today_all(
     if claims:
         user_id = _ensure_db_user(db, claims).id
 
+    todays = {
+        dp.subject.value: dp
+        for dp in db.query(DailyProblem).filter(DailyProblem.date == today, DailyProblem.is_active == True)
+    }
+    # 🧠 hydrate per-user flags for all subjects at once (services/user_state.py)
+    answered: set[int] = set()
+    liked: set[int] = set()
+    answers: dict[int, UserAnswer] = {}
+    if user_id:
+        ids = [dp.problem_id for dp in todays.values()]
+        answered = user_state.answered(db, user_id, ids)
+        liked = user_state.liked(db, user_id, ids)
+        if answered:
+            answers = {
+                ua.problem_id: ua
+                for ua in db.query(UserAnswer).filter(UserAnswer.user_id == user_id, UserAnswer.problem_id.in_(answered))
+            }
+
     for s in ["math", "physics", "chemistry"]:
-        dp = (
-            db.query(DailyProblem)
-            .filter(
-                DailyProblem.date == today,
-                DailyProblem.subject == _subject_enum(s),
-                DailyProblem.is_active == True
-            )
-            .first()
-        )
+        dp = todays.get(s)
         if not dp:
             items.append(TodaySubjectBundle(subject=s, problem=None))
             continue
 
         p = dp.problem
-        likes_count = db.query(ProblemLike).filter_by(problem_id=p.id).count()
+        likes_count = like_buffer.count(db, p.id)
 
         has_liked = False
         has_answered = False
@@ -138,9 +151,9 @@ def get_today_all(
         correct_option = None
 
         if user_id:
-            has_liked = db.query(ProblemLike).filter_by(problem_id=p.id, user_id=user_id).first() is not None
-            ua = db.query(UserAnswer).filter_by(problem_id=p.id, user_id=user_id).first()
-            has_answered = ua is not None
+            has_liked = p.id in liked
+            has_answered = p.id in answered
+            ua = answers.get(p.id)
             if ua:
                 my_choice = ua.chosen_option
                 is_correct = ua.is_correct
@@ -177,14 +190,14 @@ def get_today_all(
 
 # PUBLIC
 @router.get("/{problem_id}/hint", response_model=HintOut)
-def get_hint(problem_id: int, db: Session = Depends(get_db)):
+def get_hint(problem_id: int, db: Session = Depends(get_read_db)):
     p = db.get(Problem, problem_id)
     if not p:
         raise HTTPException(status_code=404, detail="Problem not found")
     return {"hint_tex": p.hint_tex}
 
 @router.get("/{problem_id}/solution", response_model=SolutionOut)
-def get_solution(problem_id: int, db: Session = Depends(get_db)):
+def get_solution(problem_id: int, db: Session = Depends(get_read_db)):
     p = db.get(Problem, problem_id)
     if not p:
         raise HTTPException(status_code=404, detail="Problem not found")
@@ -209,6 +222,8 @@ def submit_answer(payload: AnswerIn, db: Session = Depends(get_db), claims: dict
     if is_correct:
         p.solve_count += 1
     db.commit()
+    mark_write(claims.get("uid"))
+    user_state.note_answer(user.id, p.id)
     return AnswerOut(is_correct=is_correct, correct_option=p.correct_option)
 
 @router.post("/{problem_id}/like/toggle")
@@ -219,15 +234,10 @@ def toggle_like(problem_id: int, db: Session = Depends(get_db), claims: dict = D
 
     user = _ensure_db_user(db, claims)
 
-    existing = db.query(ProblemLike).filter_by(problem_id=problem_id, user_id=user.id).first()
-    if existing:
-        db.delete(existing)
-        db.commit()
-        return {"liked": False}
-
-    db.add(ProblemLike(problem_id=problem_id, user_id=user.id))
-    db.commit()
-    return {"liked": True}
+    # ✅ buffered: the flusher writes the net state in bulk (services/like_buffer.py)
+    liked = like_buffer.toggle(db, user.id, problem_id)
+    mark_write(claims.get("uid"))
+    return {"liked": liked}
 
 # PUBLIC: quick check (no writes)
 @router.post("/answer/check", response_model=AnswerOut)
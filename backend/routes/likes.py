@@ -1,12 +1,13 @@
 # backend/routes/likes.py
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
-from deps import get_db, _ensure_db_user
+from db_routing import mark_write
+from deps import get_db, resolve_user_id
 from firebase_auth import get_current_firebase_user
-from models import Problem as Question, ProblemLike
+from models import Problem as Question
 from schemas import LikeResponse
+from services.like_buffer import like_buffer
 
 router = APIRouter(prefix="/questions", tags=["likes"])
 
@@ -17,27 +18,15 @@ def toggle_like(
     db: Session = Depends(get_db),
     firebase_claims = Depends(get_current_firebase_user),
 ):
-    user = _ensure_db_user(db, firebase_claims)
+    user_id = resolve_user_id(db, firebase_claims)
 
     q = db.get(Question, question_id)
     if not q:
         raise HTTPException(404, "Question not found")
 
-    existing = db.query(ProblemLike).filter_by(
-        user_id=user.id, problem_id=question_id
-    ).first()
-
-    if existing:
-        db.delete(existing)
-        db.commit()
-        has_liked = False
-    else:
-        db.add(ProblemLike(user_id=user.id, problem_id=question_id))
-        db.commit()
-        has_liked = True
-
-    like_count = db.query(func.count(ProblemLike.id)).filter(
-        ProblemLike.problem_id == question_id
-    ).scalar() or 0
+    # ✅ buffered: the flusher writes the net state in bulk (services/like_buffer.py)
+    has_liked = like_buffer.toggle(db, user_id, question_id)
+    mark_write(firebase_claims.get("uid"))
+    like_count = like_buffer.count(db, question_id)
 
     return {"likeCount": like_count, "hasLiked": has_liked}
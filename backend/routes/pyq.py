@@ -0,0 +1,108 @@
+# backend/routes/pyq.py
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from db_routing import mark_write
+from deps import get_db, get_read_db, resolve_user_id
+from firebase_auth import get_current_firebase_user, get_current_firebase_user_optional
+from models import DifficultyEnum, ExamEnum, PyqPaper, SubjectEnum
+from schemas import PyqAttemptIn, PyqAttemptOut, PyqChapterOut, PyqPaperDetail, PyqPaperOut, PyqQuestionOut
+from services import pyq
+from services.user_state import user_state
+
+router = APIRouter(prefix="/pyq", tags=["pyq"])
+
+
+def _subject(name: str) -> SubjectEnum:
+    try:
+        return pyq.subject_of(name)
+    except KeyError:
+        raise HTTPException(404, "Unknown subject")
+
+
+def _mark_solved(db: Session, firebase_claims, rows: list[dict]) -> list[dict]:
+    if firebase_claims and rows:
+        user_id = resolve_user_id(db, firebase_claims)
+        # answered (in memory) narrows it down; only those need a look at is_correct
+        answered = user_state.answered(db, user_id, [r["problem_id"] for r in rows])
+        solved = pyq.solved_ids(db, user_id, answered)
+        for r in rows:
+            r["solved"] = r["problem_id"] in solved
+    return rows
+
+
+@router.get("/papers", response_model=List[PyqPaperOut])
+def list_papers(
+    year: Optional[int] = None,
+    exam: Optional[ExamEnum] = None,
+    db: Session = Depends(get_read_db),
+):
+    return pyq.list_papers(db, year, exam)
+
+
+@router.get("/papers/{paper_id}", response_model=PyqPaperDetail)
+def get_paper(paper_id: int, db: Session = Depends(get_read_db)):
+    p = db.get(PyqPaper, paper_id)
+    if not p:
+        raise HTTPException(404, "Paper not found")
+    return {**pyq.paper_view(p), "problem_ids": pyq.paper_problem_ids(db, paper_id)}
+
+
+@router.post("/papers/{paper_id}/attempts", response_model=PyqAttemptOut)
+def submit_paper(
+    paper_id: int,
+    body: PyqAttemptIn,
+    db: Session = Depends(get_db),
+    firebase_claims = Depends(get_current_firebase_user),
+):
+    user_id = resolve_user_id(db, firebase_claims)
+    if not db.get(PyqPaper, paper_id):
+        raise HTTPException(404, "Paper not found")
+
+    # 🧮 graded server-side; paper totals are bumped in the same transaction
+    result = pyq.score_attempt(db, paper_id, user_id, body.answers)
+    mark_write(firebase_claims.get("uid"))
+    return result
+
+
+@router.get("/{subject}/chapters", response_model=List[PyqChapterOut])
+def get_chapters(subject: str, db: Session = Depends(get_read_db)):
+    return pyq.chapter_grid(db, _subject(subject))
+
+
+@router.get("/{subject}/chapters/{chapter}", response_model=List[PyqQuestionOut])
+def get_chapter_questions(
+    subject: str,
+    chapter: str,
+    exam: Optional[ExamEnum] = None,
+    difficulty: Optional[DifficultyEnum] = None,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    firebase_claims = Depends(get_current_firebase_user_optional),
+):
+    subj = _subject(subject)
+    name = pyq.resolve_chapter(db, subj, chapter)
+    if not name:
+        raise HTTPException(404, "Chapter not found")
+
+    rows = pyq.chapter_questions(db, subj, name, exam, difficulty, limit, offset)
+    return _mark_solved(db, firebase_claims, rows)
+
+
+@router.get("/years/{year}", response_model=List[PyqQuestionOut])
+def get_year_questions(
+    year: int,
+    shift: Optional[int] = Query(None, ge=1),
+    subject: Optional[str] = None,
+    exam: Optional[ExamEnum] = None,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    firebase_claims = Depends(get_current_firebase_user_optional),
+):
+    subj = _subject(subject) if subject else None
+    rows = pyq.year_questions(db, year, shift, subj, exam, limit, offset)
+    return _mark_solved(db, firebase_claims, rows)
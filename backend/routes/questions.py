@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, ConfigDict
 from typing import Optional, Literal
 from sqlalchemy import select, func
 
-from deps import get_db
+import lkg
+from deps import get_db, get_read_db
 from models import Problem, ProblemLike
+from services import similar
+from services.tex_render import rendered_views
 
 router = APIRouter(prefix="/questions", tags=["questions"])
 
@@ -45,19 +48,33 @@ def submit_answer(problem_id: int, body: SubmitBody, db: Session = Depends(get_d
     }
 
 # ---------- (Optional) Hint / Solution (if you haven’t added yet) ----------
-@router.get("/{problem_id}/hint")
-def get_hint(problem_id: int, db: Session = Depends(get_db)):
+def _tex_field(db: Session, problem_id: int, field: str) -> dict:
     problem = db.get(Problem, problem_id)
     if not problem:
         raise HTTPException(status_code=404, detail="Problem not found")
-    return {"hint_tex": problem.hint_tex or ""}
+    html = rendered_views(db, [problem], (f"{field}_tex",))[problem.id][f"{field}_tex"]
+    return {f"{field}_tex": getattr(problem, f"{field}_tex") or "", f"{field}_html": html}
+
+@router.get("/{problem_id}/hint")
+def get_hint(problem_id: int, db: Session = Depends(get_read_db)):
+    return lkg.serve(f"hint:{problem_id}", lambda: _tex_field(db, problem_id, "hint"))
 
 @router.get("/{problem_id}/solution")
-def get_solution(problem_id: int, db: Session = Depends(get_db)):
-    problem = db.get(Problem, problem_id)
-    if not problem:
+def get_solution(problem_id: int, db: Session = Depends(get_read_db)):
+    return lkg.serve(f"solution:{problem_id}", lambda: _tex_field(db, problem_id, "solution"))
+
+# ---------- Similar problems (precomputed by services/similar.py) ----------
+def _similar(db: Session, problem_id: int, limit: int) -> dict:
+    items = similar.similar(db, problem_id, limit)
+    if not items and not db.get(Problem, problem_id):
         raise HTTPException(status_code=404, detail="Problem not found")
-    return {"solution_tex": problem.solution_tex or ""}
+    return {"problem_id": problem_id, "similar": items}
+
+@router.get("/{problem_id}/similar")
+def get_similar(problem_id: int, limit: int = Query(similar.K, ge=1, le=similar.K),
+                db: Session = Depends(get_read_db)):
+    found = lkg.serve(f"similar:{problem_id}", lambda: _similar(db, problem_id, similar.K))
+    return {**found, "similar": found["similar"][:limit]}
 
 # ---------- (Optional) Like toggle with idempotency ----------
 class LikeResponse(BaseModel):
@@ -1,36 +1,41 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select
 import datetime, hashlib, random
 
-from deps import get_db
+import lkg
+from cache import Cache
+from deps import get_read_db
 from models import Quote
 
 router = APIRouter()
 
-def _count(db: Session) -> int:
-    return db.execute(select(func.count(Quote.id))).scalar_one()
+# formatted quotes in id order; the table only changes when someone re-seeds it
+quotes_cache = Cache("quotes", default_ttl=3600,
+                     snapshot_stamp="SELECT count(*) || ':' || coalesce(max(id), 0) FROM quotes")
 
-def _by_offset(db: Session, offset: int):
-    q = db.execute(select(Quote).order_by(Quote.id).offset(offset).limit(1))
-    return q.scalars().first()
+def _fmt(row) -> str:
+    return f"{row.text}" if not row.author else f"{row.text} - {row.author}"
+
+def _all_quotes(db: Session) -> list[str]:
+    def load():
+        rows = db.execute(select(Quote.text, Quote.author).order_by(Quote.id)).all()
+        return [_fmt(r) for r in rows]
+    # last-known-good copy while the DB is down (lkg.py)
+    return lkg.serve("quotes:all", lambda: quotes_cache.get_or_load("all", load))
 
 @router.get("/daily-quote")
-def daily_quote(db: Session = Depends(get_db)):
-    total = _count(db)
-    if total == 0:
+def daily_quote(db: Session = Depends(get_read_db)):
+    quotes = _all_quotes(db)
+    if not quotes:
         return {"quote": "Stay motivated!"}
     today = datetime.date.today().isoformat()
     hv = int(hashlib.sha256(today.encode()).hexdigest(), 16)
-    idx = hv % total
-    row = _by_offset(db, idx)
-    return {"quote": f"{row.text}" if not row.author else f"{row.text} - {row.author}"}
+    return {"quote": quotes[hv % len(quotes)]}
 
 @router.get("/random-quote")
-def random_quote(db: Session = Depends(get_db)):
-    total = _count(db)
-    if total == 0:
+def random_quote(db: Session = Depends(get_read_db)):
+    quotes = _all_quotes(db)
+    if not quotes:
         return {"quote": "Keep going!"}
-    idx = random.randrange(total)
-    row = _by_offset(db, idx)
-    return {"quote": f"{row.text}" if not row.author else f"{row.text} - {row.author}"}
+    return {"quote": random.choice(quotes)}
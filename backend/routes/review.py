@@ -0,0 +1,53 @@
+# backend/routes/review.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from db_routing import mark_write
+from deps import get_db, resolve_user_id
+from firebase_auth import get_current_firebase_user
+from models import Problem as Question
+from routes.attempts import _normalize_choice
+from schemas import ReviewAnswerOut, ReviewQueueOut, SubmitAnswerIn
+from services import review
+
+router = APIRouter(prefix="/review", tags=["review"])
+
+
+@router.get("/due", response_model=ReviewQueueOut)
+def get_due(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    firebase_claims = Depends(get_current_firebase_user),
+):
+    user_id = resolve_user_id(db, firebase_claims)
+    items = review.due_items(db, user_id, limit)
+    # nothing due: tell the client when to come back
+    return {"items": items, "next_due_at": None if items else review.next_due_at(db, user_id)}
+
+
+@router.post("/{question_id}/answer", response_model=ReviewAnswerOut)
+def answer_review(
+    question_id: int,
+    body: SubmitAnswerIn,
+    db: Session = Depends(get_db),
+    firebase_claims = Depends(get_current_firebase_user),
+):
+    selected = _normalize_choice(body.selected())
+    if selected not in {"A", "B", "C", "D"}:
+        raise HTTPException(422, "selectedOption must be one of A/B/C/D")
+
+    q = db.get(Question, question_id)
+    if not q:
+        raise HTTPException(404, "Question not found")
+
+    user_id = resolve_user_id(db, firebase_claims)
+    correct = _normalize_choice(q.correct_option)
+    is_correct = selected == correct
+
+    # reviews only reschedule; user_answers keeps the first attempt (stats stay first-try)
+    item = review.record_answer(db, user_id, question_id, is_correct)
+    next_due = item.due_at if item is not None else None
+    db.commit()
+    mark_write(firebase_claims.get("uid"))
+
+    return {"isCorrect": is_correct, "correctOption": correct, "nextDueAt": next_due}
@@ -0,0 +1,19 @@
+# backend/routes/stats.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from deps import get_read_db
+from schemas import SubjectStatsOut
+from services import chapter_stats, pyq
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+# 📊 served from the chapter_stats rollup (refreshed in the background), never from user_answers
+@router.get("/{subject}/chapters", response_model=SubjectStatsOut)
+def get_chapter_stats(subject: str, db: Session = Depends(get_read_db)):
+    try:
+        subj = pyq.subject_of(subject)
+    except KeyError:
+        raise HTTPException(404, "Unknown subject")
+    return chapter_stats.subject_view(db, subj)
@@ -57,6 +57,12 @@ class ProblemStats(BaseModel):
     accuracy: float  # 0.0 .. 1.0
 
 
+class RenderedProblem(BaseModel):
+    # server-side HTML+MathML (services/tex_render.py); None = not rendered yet, use the TeX
+    question: Optional[str] = None
+    options: Dict[Literal["A", "B", "C", "D"], Optional[str]] = {}
+
+
 class ProblemOut(BaseModel):
     model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
@@ -71,6 +77,7 @@ class ProblemOut(BaseModel):
     likes_count: int
     has_liked: bool
     has_answered: bool
+    rendered: Optional[RenderedProblem] = None
 
     # ✅ New fields to restore state after refresh
     my_choice: Optional[Literal["A", "B", "C", "D"]] = None
@@ -103,3 +110,210 @@ class SubmitAnswerOut(BaseModel):
 class LikeResponse(BaseModel):
     likeCount: int
     hasLiked: bool
+
+
+# ---- PYQ ----
+class PyqChapterOut(BaseModel):
+    chapter: str
+    slug: str
+    mains: int
+    advanced: int
+    total: int
+
+
+class PyqQuestionOut(BaseModel):
+    problem_id: int
+    paper_id: int
+    question_no: int
+    exam: Literal["mains", "advanced"]
+    date: date
+    shift: int
+    difficulty: DifficultyEnum
+    preview: str
+    solved: bool = False
+
+
+class PyqPaperOut(BaseModel):
+    id: int
+    exam: Literal["mains", "advanced"]
+    year: int
+    exam_date: date
+    shift: int
+    title: str
+    question_count: int
+    max_score: int
+    attempt_count: int
+    average_score: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PyqPaperDetail(PyqPaperOut):
+    problem_ids: List[int]
+
+
+class PyqAttemptIn(BaseModel):
+    # problem_id -> chosen option; unanswered questions are simply left out
+    answers: Dict[int, Literal["A", "B", "C", "D"]]
+
+
+class PyqAttemptOut(BaseModel):
+    score: int
+    correct: int
+    wrong: int
+    unanswered: int
+    paper_attempts: int
+    paper_average: float
+
+
+# ---- Review queue ----
+class ReviewItemOut(BaseModel):
+    problem_id: int
+    due_at: datetime
+    repetitions: int
+    lapses: int
+    subject: SubjectEnum
+    chapter: str
+    difficulty: DifficultyEnum
+    preview: str
+
+
+class ReviewQueueOut(BaseModel):
+    items: List[ReviewItemOut]
+    next_due_at: Optional[datetime] = None
+
+
+class ReviewAnswerOut(BaseModel):
+    isCorrect: bool
+    correctOption: Literal["A", "B", "C", "D"]
+    nextDueAt: Optional[datetime] = None  # None: learnt, dropped from the queue
+
+
+# ---- Admin: batch problem edits ----
+class AdminProblemOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
+    id: int
+    subject: SubjectEnum
+    topic: str
+    chapter: str
+    difficulty: DifficultyEnum
+    question_tex: str
+    option_a_tex: str
+    option_b_tex: str
+    option_c_tex: str
+    option_d_tex: str
+    correct_option: Literal["A", "B", "C", "D"]
+    hint_tex: Optional[str] = None
+    solution_tex: Optional[str] = None
+    is_active: bool
+    updated_at: datetime  # quote it back in patches (optimistic concurrency)
+
+
+class ProblemVersion(BaseModel):
+    id: int
+    updated_at: datetime
+
+
+class ProblemPatch(ProblemVersion):
+    """Only the fields sent are changed; hint_tex/solution_tex may be set to null."""
+    model_config = ConfigDict(use_enum_values=True)
+
+    subject: Optional[SubjectEnum] = None
+    topic: Optional[str] = None
+    chapter: Optional[str] = None
+    difficulty: Optional[DifficultyEnum] = None
+    question_tex: Optional[str] = None
+    option_a_tex: Optional[str] = None
+    option_b_tex: Optional[str] = None
+    option_c_tex: Optional[str] = None
+    option_d_tex: Optional[str] = None
+    correct_option: Optional[Literal["A", "B", "C", "D"]] = None
+    hint_tex: Optional[str] = None
+    solution_tex: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class ProblemCreateBatch(BaseModel):
+    problems: List[ProblemCreate]
+
+
+class ProblemPatchBatch(BaseModel):
+    problems: List[ProblemPatch]
+    atomic: bool = True  # False: apply what matched, report the rest
+
+
+class ProblemDeactivateBatch(BaseModel):
+    problems: List[ProblemVersion]
+    atomic: bool = True
+
+
+class BatchConflictOut(BaseModel):
+    id: int
+    current_updated_at: Optional[datetime] = None  # None: no such problem
+
+
+class ProblemBatchOut(BaseModel):
+    applied: List[ProblemVersion]
+    conflicts: List[BatchConflictOut] = []
+
+
+# ---- Chapter / topic stats ----
+class TopicStatsOut(BaseModel):
+    topic: str
+    problem_count: int
+    attempted: int
+    solved: int
+    accuracy: float  # 0.0 .. 1.0
+
+
+class ChapterStatsOut(BaseModel):
+    chapter: str
+    slug: str
+    problem_count: int
+    attempted: int
+    solved: int
+    accuracy: float
+    topics: List[TopicStatsOut]
+
+
+class SubjectStatsOut(BaseModel):
+    subject: SubjectEnum
+    as_of: Optional[datetime] = None  # answers up to here are counted; None = not built yet
+    chapters: List[ChapterStatsOut]
+
+
+# ---- Contests ----
+class ContestOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    starts_at: datetime
+    ends_at: datetime
+    question_count: int
+    closed_at: Optional[datetime] = None  # set once reports are available
+    participant_count: int
+
+
+class ContestDetailOut(ContestOut):
+    questions: List[Dict]  # problem payloads in question_no order
+
+
+class ContestCreate(BaseModel):
+    title: str
+    starts_at: datetime
+    ends_at: datetime
+    problem_ids: List[int]  # question 1, 2, ... in this order
+
+
+class ContestSubmissionIn(BaseModel):
+    answers: Dict[int, Literal["A", "B", "C", "D"]]  # question_no -> option; omitted = unanswered
+    time_spent_seconds: int = 0
+
+
+class ContestCloseOut(BaseModel):
+    contest_id: int
+    closed_at: datetime
+    participants: int
+    seconds: Dict[str, float]  # load / compute / encode / store
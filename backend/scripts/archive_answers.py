@@ -0,0 +1,62 @@
+# backend/scripts/archive_answers.py
+"""
+Maintain the monthly partitions of user_answers (Postgres only).
+
+Usage (from backend/):
+  python -m scripts.archive_answers list
+  python -m scripts.archive_answers ensure --ahead 3
+  python -m scripts.archive_answers archive --keep-months 12          # detach older months
+  python -m scripts.archive_answers archive --keep-months 12 --drop   # ...and drop them
+
+`archive` first saves per-problem totals of each old month into
+user_answer_archive_stats (so attempted/solved stats stay the same), then
+detaches the partition. A detached table is left as user_answers_YYYYMM for
+pg_dump/cold storage unless --drop is given. Per-user history in archived
+months no longer shows up as "already answered".
+"""
+import argparse
+from datetime import date
+
+from sqlalchemy import text
+
+from database import get_engine
+from services.answer_partitions import (
+    AHEAD_MONTHS, add_months, archive, ensure_partitions, is_partitioned, month_start, monthly_partitions,
+)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="user_answers partition maintenance")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    p_ensure = sub.add_parser("ensure")
+    p_ensure.add_argument("--ahead", type=int, default=AHEAD_MONTHS)
+    p_archive = sub.add_parser("archive")
+    p_archive.add_argument("--keep-months", type=int, default=12, help="months to keep attached, incl. current")
+    p_archive.add_argument("--drop", action="store_true")
+    args = ap.parse_args()
+
+    engine = get_engine()
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            raise SystemExit("user_answers is not partitioned (Postgres + migration 9a4d3f2e6c71 required)")
+
+    if args.cmd == "list":
+        with engine.connect() as conn:
+            for month, name in monthly_partitions(conn):
+                n = conn.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+                print(f"{month:%Y-%m}  {name:<24} {n:>10} rows")
+            n = conn.execute(text("SELECT count(*) FROM user_answers_default")).scalar()
+            print(f"default  user_answers_default     {n:>10} rows")
+    elif args.cmd == "ensure":
+        with engine.begin() as conn:
+            created = ensure_partitions(conn, ahead=args.ahead)
+        print("created: " + (", ".join(created) or "nothing"))
+    else:
+        before = add_months(month_start(date.today()), -(args.keep_months - 1))
+        done = archive(engine, before, drop=args.drop)
+        print(f"archived before {before}: " + (", ".join(done) or "nothing"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# backend/scripts/bench_import.py
+"""
+Cold-start benchmark: how long a fresh worker takes to `import main`.
+
+Usage (from backend/):
+  python -m scripts.bench_import                     # 10 fresh interpreters
+  python -m scripts.bench_import -n 20 --top 15
+  python -m scripts.bench_import --budget-ms 800     # exit 1 if median import is slower
+  python -m scripts.bench_import --compare bench_results/import-<old>.json
+
+Each run is a new `python -X importtime -c "import main"` with DATABASE_URL and
+Firebase credentials removed from the environment, so it also proves that
+importing the app has no side effects (no DB connection, no Firebase init).
+Reports median/p95 wall time plus the slowest modules by cumulative import
+time, and saves JSON next to the endpoint benchmarks.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from scripts.bench_endpoints import BACKEND_DIR, git_rev, percentile
+
+_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def _one_run(env) -> tuple[float, dict[str, int]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SNIPPET],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"`import main` failed:\n{proc.stderr[-2000:]}")
+
+    # stderr lines: "import time:  self [us] | cumulative | imported package"
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cum_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        cumulative[name.strip()] = int(cum_us)
+    return float(proc.stdout.strip().splitlines()[-1]) * 1000.0, cumulative
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Measure cold `import main` time")
+    ap.add_argument("-n", type=int, default=10)
+    ap.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    ap.add_argument("--budget-ms", type=float, help="fail if median exceeds this")
+    ap.add_argument("--out")
+    ap.add_argument("--compare")
+    args = ap.parse_args()
+
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("DATABASE_URL", "GOOGLE_APPLICATION_CREDENTIALS", "FIREBASE_AUTH_FAKE")}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # measure with warm .pyc like a real deploy
+
+    _one_run(env)  # populate __pycache__
+    walls, modules = [], {}
+    for _ in range(args.n):
+        wall, cum = _one_run(env)
+        walls.append(wall)
+        for name, us in cum.items():
+            modules.setdefault(name, []).append(us)
+
+    walls.sort()
+    slowest = sorted(
+        ((name, statistics.median(v) / 1000.0) for name, v in modules.items() if "." not in name),
+        key=lambda x: -x[1],
+    )[: args.top]
+    report = {
+        "git_rev": git_rev(),
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "runs": args.n,
+        "median_ms": round(statistics.median(walls), 2),
+        "p95_ms": round(percentile(walls, 95), 2),
+        "min_ms": round(walls[0], 2),
+        "slowest_top_level_modules_ms": {name: round(ms, 2) for name, ms in slowest},
+    }
+
+    print(f"import main: median={report['median_ms']}ms p95={report['p95_ms']}ms min={report['min_ms']}ms")
+    for name, ms in report["slowest_top_level_modules_ms"].items():
+        print(f"  {name:<30} {ms:>8.2f} ms")
+
+    out = Path(args.out) if args.out else (
+        BACKEND_DIR / "bench_results" / f"import-{report['git_rev']}-{int(time.time())}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"saved {out}")
+
+    if args.compare:
+        old = json.loads(Path(args.compare).read_text())
+        delta = report["median_ms"] - old["median_ms"]
+        print(f"compare {old.get('git_rev')} -> {report['git_rev']}: "
+              f"{old['median_ms']} -> {report['median_ms']} ms ({delta:+.1f})")
+    if args.budget_ms is not None and report["median_ms"] > args.budget_ms:
+        print(f"median import {report['median_ms']}ms is over budget {args.budget_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# backend/scripts/build_contest_report.py
+"""
+Close a contest and build its reports (services/contest_report.py), or
+rebuild them for a closed one, e.g. after an answer key was corrected.
+
+Usage (from backend/):
+  python -m scripts.build_contest_report 12
+
+Same as POST /api/admin/contests/12/close; prints where the time went.
+"""
+import argparse
+
+from database import SessionLocal
+from services.contests import close
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Close a contest and build its reports")
+    ap.add_argument("contest_id", type=int)
+    args = ap.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = close(db, args.contest_id)
+    finally:
+        db.close()
+    if result is None:
+        raise SystemExit(f"no contest {args.contest_id}")
+    secs = result["seconds"]
+    print(f"contest {result['contest_id']}: {result['participants']} participants, "
+          + ", ".join(f"{k} {v:.2f}s" for k, v in secs.items())
+          + f" (total {sum(secs.values()):.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
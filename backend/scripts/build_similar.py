@@ -0,0 +1,40 @@
+# backend/scripts/build_similar.py
+"""
+Refresh the similar-problems table (services/similar.py).
+
+Usage (from backend/):
+  python -m scripts.build_similar              # search problems added/edited since the last run
+  python -m scripts.build_similar --rebuild    # recompute every problem's neighbours
+
+The app already refreshes every SIMILAR_REFRESH_INTERVAL seconds; this is
+for cron when that is off, the first build after upgrading, and a periodic
+full rebuild (idf drifts as problems are added). If a worker is refreshing
+at the same moment this one skips.
+"""
+import argparse
+import time
+
+from database import SessionLocal
+from services.similar import refresh
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Refresh the similar-problems table")
+    ap.add_argument("--rebuild", action="store_true", help="recompute every problem's neighbours")
+    args = ap.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        result = refresh(db, full=args.rebuild)
+    finally:
+        db.close()
+    if result is None:
+        print("another process is refreshing; skipped")
+        return
+    print(f"{'full' if result['full'] else 'incremental'}: searched {result['searched']} problems, "
+          f"rewrote {result['rewritten']} lists in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,539 @@
+# backend/scripts/gen_dataset.py
+"""
+Synthetic dataset at production scale: problems, users, daily rollouts,
+answers (skewed toward each day's DPP), likes and comments.
+
+Usage (from backend/), against a DISPOSABLE, migrated Postgres database:
+  python -m scripts.gen_dataset --problems 20000 --users 200000 --answers 5000000
+  python -m scripts.gen_dataset --problems 1000000 --users 10000000 --answers 500000000 \\
+      --likes 50000000 --comments 5000000 --defer-indexes --no-fk-checks
+  python -m scripts.gen_dataset --only answers --answers 10000000 --seed 7
+
+Every column is generated as a numpy array and the rows are encoded
+straight into Postgres' binary COPY format (no per-row Python, no CSV
+parsing on the server), --chunk rows at a time. Text columns are templates
+with zero-padded ids, or picks from a small vocabulary (chapters, comment
+lines), so they stay vectorized too.
+
+Deterministic: each (table, chunk) draws from its own generator seeded with
+(--seed, table, chunk), so the same --seed, --chunk and --end-date give the
+same rows on the same starting database. Rows are appended after the current max(id) of each table and sequences
+are moved past them. Answers are generated in time order over --days days
+(monthly partitions are created for the span), --daily-share of them on
+that day's DPP, the rest on a long-tailed set of popular problems; problem
+attempt/solve counters are updated to match at the end.
+
+--defer-indexes drops the secondary indexes of the big tables before the
+load and rebuilds them after (much faster than maintaining them row by
+row). --no-fk-checks sets session_replication_role = replica for the load
+(needs superuser); the generated ids are consistent by construction.
+Needs numpy.
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import text
+
+from database import get_engine
+from services.answer_partitions import AHEAD_MONTHS, ensure_partitions
+
+SUBJECTS = ("math", "physics", "chemistry")
+DIFFICULTIES = ("easy", "medium", "hard")
+P_CORRECT = np.array([0.7, 0.5, 0.3])  # by difficulty
+CHAPTERS = {
+    "math": ("Sets & Relations", "Complex Numbers", "Quadratic Equations", "Matrices", "Permutations",
+             "Binomial Theorem", "Sequences & Series", "Limits & Continuity", "Differentiation",
+             "Integration", "Differential Equations", "Straight Lines", "Circles", "Conic Sections",
+             "Vectors", "3D Geometry", "Probability", "Statistics", "Trigonometry"),
+    "physics": ("Units & Measurements", "Kinematics", "Laws of Motion", "Work Energy Power",
+                "Rotational Motion", "Gravitation", "Properties of Matter", "Thermodynamics",
+                "Kinetic Theory", "Oscillations", "Waves", "Electrostatics", "Current Electricity",
+                "Magnetism", "Electromagnetic Induction", "Alternating Current", "Optics",
+                "Modern Physics", "Semiconductors"),
+    "chemistry": ("Mole Concept", "Atomic Structure", "Chemical Bonding", "States of Matter",
+                  "Thermodynamics", "Equilibrium", "Redox Reactions", "Electrochemistry",
+                  "Chemical Kinetics", "Solutions", "Periodic Table", "Coordination Compounds",
+                  "p-Block Elements", "d and f Block", "Hydrocarbons", "Haloalkanes",
+                  "Alcohols Phenols Ethers", "Aldehydes & Ketones", "Amines", "Biomolecules"),
+}
+COMMENT_LINES = (
+    "Nice one!", "Got it on the second try.", "Can someone explain the last step?",
+    "Used the shortcut from the hint.", "This was in my mock test too.", "Tricky units here.",
+    "Solution is very clear, thanks.", "Option C looked right at first.",
+)
+CLASS_LEVELS = ("11", "12", "dropper")
+
+PG_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+_HEADER = b"PGCOPY\n\xff\r\n\x00" + b"\x00" * 8   # signature, flags, header extension length
+_TRAILER = b"\xff\xff"
+TABLE_NO = {"users": 1, "problems": 2, "daily_rollouts": 3, "answers": 4, "likes": 5, "comments": 6}
+DEFERRED_INDEX_TABLES = ("user_answers", "problem_likes", "comments")
+
+
+# ---------- binary COPY encoding ----------
+# A column is either a fixed-width (n, w) uint8 matrix, or a Vocab: codes into
+# a list of byte strings of any length.
+
+class Vocab:
+    def __init__(self, words, codes: np.ndarray):
+        encoded = [w.encode() for w in words]
+        self.lengths = np.array([len(w) for w in encoded], dtype=np.int64)
+        self.starts = np.concatenate([[0], np.cumsum(self.lengths)[:-1]]).astype(np.int64)
+        self.flat = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        self.codes = codes
+
+
+def _be(arr: np.ndarray, dtype: str) -> np.ndarray:
+    """Numbers as big-endian bytes, (n, itemsize)."""
+    a = np.ascontiguousarray(arr, dtype=dtype)
+    return a.view(np.uint8).reshape(len(a), a.dtype.itemsize)
+
+
+def int4(arr):
+    return _be(arr, ">i4")
+
+
+def int8(arr):
+    return _be(arr, ">i8")
+
+
+def boolean(arr):
+    return np.asarray(arr, dtype=np.uint8).reshape(-1, 1)
+
+
+def timestamp(arr):
+    """datetime64 -> Postgres timestamp(tz): microseconds since 2000-01-01 UTC."""
+    return int8((arr.astype("datetime64[us]") - PG_EPOCH).astype(np.int64))
+
+
+def pg_date(arr):
+    return int4((arr.astype("datetime64[D]") - PG_EPOCH.astype("datetime64[D]")).astype(np.int64))
+
+
+def chars(codes, alphabet: bytes):
+    """One-character text picked from `alphabet` ('ABCD')."""
+    return np.frombuffer(alphabet, dtype=np.uint8)[codes].reshape(-1, 1)
+
+
+def padded(prefix: str, ids: np.ndarray, width: int, suffix: str = ""):
+    """prefix + zero-padded id + suffix, fixed width so it stays a matrix."""
+    n = len(ids)
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    digits = (ids.astype(np.int64)[:, None] // powers % 10 + 48).astype(np.uint8)
+    parts = [np.tile(np.frombuffer(prefix.encode(), dtype=np.uint8), (n, 1)), digits]
+    if suffix:
+        parts.append(np.tile(np.frombuffer(suffix.encode(), dtype=np.uint8), (n, 1)))
+    return np.hstack(parts)
+
+
+def constant(value: str, n: int):
+    return np.tile(np.frombuffer(value.encode(), dtype=np.uint8), (n, 1))
+
+
+def encode_rows(columns: list) -> memoryview:
+    """Tuples in Postgres binary COPY format (no header/trailer)."""
+    n = len(columns[0].codes) if isinstance(columns[0], Vocab) else len(columns[0])
+    lengths = [c.lengths[c.codes] if isinstance(c, Vocab) else np.full(n, c.shape[1], np.int64)
+               for c in columns]
+    row_len = 2 + sum(4 + ln for ln in lengths)
+    starts = np.cumsum(row_len) - row_len
+    buf = np.empty(int(row_len.sum()), dtype=np.uint8)
+
+    def put(pos, matrix):
+        buf[pos[:, None] + np.arange(matrix.shape[1])] = matrix
+
+    put(starts, _be(np.full(n, len(columns)), ">i2"))
+    pos = starts + 2
+    for col, ln in zip(columns, lengths):
+        put(pos, int4(ln))
+        pos = pos + 4
+        if isinstance(col, Vocab):
+            total = int(ln.sum())
+            within = np.arange(total) - np.repeat(np.cumsum(ln) - ln, ln)
+            buf[np.repeat(pos, ln) + within] = col.flat[np.repeat(col.starts[col.codes], ln) + within]
+        else:
+            put(pos, col)
+        pos = pos + ln
+    return memoryview(buf)
+
+
+class _Reader:
+    """File-like over one COPY payload, for cursor.copy_expert()."""
+
+    def __init__(self, *parts):
+        self._parts = [memoryview(p) for p in parts]
+
+    def read(self, size=-1):
+        while self._parts and not len(self._parts[0]):
+            self._parts.pop(0)
+        if not self._parts:
+            return b""
+        head = self._parts[0]
+        size = len(head) if size is None or size < 0 else size
+        chunk, self._parts[0] = head[:size], head[size:]
+        return bytes(chunk)
+
+
+def copy(raw, table: str, columns: list[str], values: list):
+    with raw.cursor() as cur:
+        cur.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary)",
+            _Reader(_HEADER, encode_rows(values), _TRAILER),
+        )
+
+
+# ---------- generators ----------
+
+class Gen:
+    def __init__(self, args, engine):
+        self.args = args
+        self.engine = engine
+        # end of --end-date (UTC), not "now": the data must not depend on when it runs
+        self.end = (np.datetime64(args.end_date) + np.timedelta64(1, "D")).astype("datetime64[us]")
+        self.start = self.end - np.timedelta64(args.days, "D")
+        self.vocab_chapters = [c for s in SUBJECTS for c in CHAPTERS[s]]
+        offsets = np.cumsum([0] + [len(CHAPTERS[s]) for s in SUBJECTS])
+        self.chapter_range = {i: (offsets[i], offsets[i + 1]) for i in range(len(SUBJECTS))}
+
+    def rng(self, table: str, chunk: int = 0) -> np.random.Generator:
+        return np.random.default_rng([self.args.seed, TABLE_NO[table], chunk])
+
+    def chunks(self, total: int):
+        for i, lo in enumerate(range(0, total, self.args.chunk)):
+            yield i, lo, min(lo + self.args.chunk, total)
+
+    def max_id(self, table: str) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"SELECT coalesce(max(id), 0) FROM {table}")).scalar()
+
+    def times(self, rng, n: int, lo=None, hi=None) -> np.ndarray:
+        lo = self.start if lo is None else lo
+        hi = self.end if hi is None else hi
+        span = (hi - lo).astype(np.int64)
+        return lo + rng.integers(0, max(span, 1), n).astype("timedelta64[us]")
+
+    def run_copy(self, label: str, table: str, total: int, make):
+        """make(rng, chunk_no, lo, hi) -> (column names, values); one COPY + commit per chunk."""
+        t0 = time.perf_counter()
+        raw = self.engine.raw_connection()
+        try:
+            with raw.cursor() as cur:
+                if self.args.no_fk_checks:
+                    cur.execute("SET session_replication_role = replica")
+            for i, lo, hi in self.chunks(total):
+                names, values = make(self.rng(label, i), i, lo, hi)
+                copy(raw, table, names, values)
+                raw.commit()
+                if self.args.verbose:
+                    print(f"  {table}: {hi:,}/{total:,}")
+        finally:
+            raw.close()
+        dt = time.perf_counter() - t0
+        print(f"{table:<16} {total:>14,} rows {dt:>8.1f}s {total / dt if dt else 0:>12,.0f} rows/s")
+
+    # --- users ---
+    def users(self):
+        base = self.max_id("users")
+
+        def make(rng, _, lo, hi):
+            ids = np.arange(base + lo + 1, base + hi + 1, dtype=np.int64)
+            n = len(ids)
+            return (
+                ["id", "firebase_uid", "email", "display_name", "class_level", "is_admin", "created_at"],
+                [int4(ids), padded("syn", ids, 10), padded("syn", ids, 10, "@synthetic.local"),
+                 padded("Student ", ids, 10), Vocab(CLASS_LEVELS, rng.integers(0, 3, n)),
+                 boolean(np.zeros(n, bool)), timestamp(self.times(rng, n, self.start - np.timedelta64(365, "D")))],
+            )
+        self.run_copy("users", "users", self.args.users, make)
+
+    # --- problems ---
+    def problems(self):
+        base = self.max_id("problems")
+
+        def make(rng, _, lo, hi):
+            ids = np.arange(base + lo + 1, base + hi + 1, dtype=np.int64)
+            n = len(ids)
+            subject = rng.integers(0, 3, n)
+            c_lo = np.array([self.chapter_range[i][0] for i in range(3)])[subject]
+            c_hi = np.array([self.chapter_range[i][1] for i in range(3)])[subject]
+            chapter = c_lo + (rng.random(n) * (c_hi - c_lo)).astype(np.int64)
+            topic = chapter * 4 + rng.integers(0, 4, n)
+            topics = [f"{c} {k}" for c in self.vocab_chapters for k in ("basics", "standard", "advanced", "pyq")]
+            created = self.times(rng, n, self.start - np.timedelta64(365, "D"), self.start)
+            return (
+                ["id", "subject", "topic", "chapter", "difficulty", "question_tex",
+                 "option_a_tex", "option_b_tex", "option_c_tex", "option_d_tex", "correct_option",
+                 "hint_tex", "solution_tex", "attempt_count", "solve_count", "created_at", "updated_at"],
+                [int4(ids), Vocab(SUBJECTS, subject), Vocab(topics, topic), Vocab(self.vocab_chapters, chapter),
+                 Vocab(DIFFICULTIES, rng.choice(3, n, p=[0.3, 0.5, 0.2])),
+                 padded("Synthetic problem ", ids, 8, r": evaluate $\int_0^1 x^2\,dx$"),
+                 constant(r"$\frac{1}{2}$", n), constant(r"$\frac{1}{3}$", n),
+                 constant(r"$\frac{1}{4}$", n), constant("$1$", n),
+                 chars(rng.integers(0, 4, n), b"ABCD"),
+                 constant("Use the power rule.", n), constant(r"$\int_0^1 x^2\,dx = \frac{1}{3}$", n),
+                 int4(np.zeros(n)), int4(np.zeros(n)), timestamp(created), timestamp(created)],
+            )
+        self.run_copy("problems", "problems", self.args.problems, make)
+
+    # --- lookups the dependent tables need ---
+    def load_problems(self):
+        """id -> subject, difficulty, correct option (dense arrays indexed by id)."""
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT id, subject::text, difficulty::text, correct_option FROM problems ORDER BY id"
+            )).all()
+        if not rows:
+            raise SystemExit("no problems; generate them first")
+        ids = np.array([r[0] for r in rows], dtype=np.int64)
+        subj = np.array([SUBJECTS.index(r[1]) for r in rows])
+        diff = np.array([DIFFICULTIES.index(r[2]) for r in rows])
+        correct = np.array([ord(r[3]) - 65 for r in rows])
+        return ids, subj, diff, correct
+
+    def user_ids(self) -> np.ndarray:
+        with self.engine.connect() as conn:
+            ids = np.array(conn.execute(text("SELECT id FROM users ORDER BY id")).scalars().all(), dtype=np.int64)
+        if not len(ids):
+            raise SystemExit("no users; generate them first")
+        return ids
+
+    # --- daily rollouts: one per subject per day over the span, ids increasing like the app picks ---
+    def daily_rollouts(self, pids, subj) -> dict:
+        days = np.arange(self.start.astype("datetime64[D]"), self.end.astype("datetime64[D]"))
+        with self.engine.connect() as conn:
+            existing = {(d, s): p for d, s, p in conn.execute(text(
+                "SELECT date, subject, problem_id FROM daily_rollouts WHERE date >= :d"
+            ), {"d": days[0].astype(date)})}
+        table = np.zeros((len(days), 3), dtype=np.int64)
+        new = []
+        for s, name in enumerate(SUBJECTS):
+            pool = pids[subj == s]
+            for i, d in enumerate(days):
+                key = (d.astype(date), name)
+                table[i, s] = existing.get(key) or pool[i % len(pool)]
+                if key not in existing:
+                    new.append((d, s, table[i, s]))
+        if new:
+            base = self.max_id("daily_rollouts")
+
+            def make(rng, _, lo, hi):
+                part = new[lo:hi]
+                return (
+                    ["id", "date", "subject", "problem_id", "created_at"],
+                    [int4(np.arange(base + lo + 1, base + hi + 1)), pg_date(np.array([p[0] for p in part])),
+                     Vocab(SUBJECTS, np.array([p[1] for p in part])), int4(np.array([p[2] for p in part])),
+                     timestamp(np.array([p[0] for p in part]).astype("datetime64[us]"))],
+                )
+            self.run_copy("daily_rollouts", "daily_rollouts", len(new), make)
+        return {"days": days, "table": table}
+
+    # --- answers ---
+    def answers(self, pids, subj, diff, correct, uids, rollouts):
+        base = self.max_id("user_answers")
+        total = self.args.answers
+        n_chunks = max(1, -(-total // self.args.chunk))
+        span = (self.end - self.start) / n_chunks
+        popular = _Popularity(len(pids), self.args.skew, self.rng("answers", 10**6))
+        active = _Popularity(len(uids), self.args.skew, self.rng("answers", 10**6 + 1))
+        attempts = np.zeros(len(pids), dtype=np.int64)
+        solves = np.zeros(len(pids), dtype=np.int64)
+        day0 = self.start.astype("datetime64[D]")
+
+        def make(rng, i, lo, hi):
+            n = hi - lo
+            # chunk i covers the i-th time slice, so rows arrive in time order (partitions, BRIN)
+            ts = np.sort(self.times(rng, n, self.start + span * i, self.start + span * (i + 1)))
+            day = np.clip((ts.astype("datetime64[D]") - day0).astype(np.int64), 0, len(rollouts["days"]) - 1)
+            on_daily = rng.random(n) < self.args.daily_share
+            daily_pid = rollouts["table"][day, rng.integers(0, 3, n)]
+            # problem index: the day's DPP, or a popular problem from the long tail
+            pidx = np.where(on_daily, np.searchsorted(pids, daily_pid), popular.draw(rng, n))
+            uidx = active.draw(rng, n)
+            ok = rng.random(n) < P_CORRECT[diff[pidx]]
+            chosen = np.where(ok, correct[pidx], (correct[pidx] + rng.integers(1, 4, n)) % 4)
+            attempts[:] += np.bincount(pidx, minlength=len(pids))
+            solves[:] += np.bincount(pidx[ok], minlength=len(pids))
+            return (
+                ["id", "user_id", "problem_id", "chosen_option", "is_correct", "created_at"],
+                [int4(np.arange(base + lo + 1, base + hi + 1)), int4(uids[uidx]), int4(pids[pidx]),
+                 chars(chosen, b"ABCD"), boolean(ok), timestamp(ts)],
+            )
+        self.run_copy("answers", "user_answers", total, make)
+        return attempts, solves
+
+    def bump_counters(self, pids, attempts, solves):
+        """problems.attempt_count/solve_count += generated answers, through a staging table."""
+        hit = attempts > 0
+        raw = self.engine.raw_connection()
+        try:
+            with raw.cursor() as cur:
+                cur.execute("CREATE TEMP TABLE synth_counts (id integer, attempts bigint, solves bigint)")
+            copy(raw, "synth_counts", ["id", "attempts", "solves"],
+                 [int4(pids[hit]), int8(attempts[hit]), int8(solves[hit])])
+            with raw.cursor() as cur:
+                cur.execute(
+                    "UPDATE problems p SET attempt_count = p.attempt_count + c.attempts, "
+                    "solve_count = p.solve_count + c.solves FROM synth_counts c WHERE p.id = c.id"
+                )
+            raw.commit()
+        finally:
+            raw.close()
+
+    # --- likes: unique (user, problem) pairs ---
+    def likes(self, pids, uids):
+        base = self.max_id("problem_likes")
+        popular = _Popularity(len(pids), self.args.skew, self.rng("likes", 10**6))
+        with self.engine.connect() as conn:
+            have = np.array(conn.execute(text(
+                "SELECT user_id::bigint * :m + problem_id FROM problem_likes"
+            ), {"m": int(pids.max()) + 1}).scalars().all(), dtype=np.int64)
+        m = int(pids.max()) + 1
+        seen = have
+        written = 0
+
+        def make(rng, i, lo, hi):
+            nonlocal seen, written
+            n = hi - lo
+            keys = np.empty(0, dtype=np.int64)
+            while len(keys) < n:
+                k = n - len(keys)
+                cand = uids[rng.integers(0, len(uids), k + k // 10 + 16)] * m + pids[popular.draw(rng, k + k // 10 + 16)]
+                cand = np.unique(cand)
+                cand = cand[~np.isin(cand, seen)]
+                keys = np.unique(np.concatenate([keys, cand]))
+            keys = rng.permutation(keys)[:n]
+            seen = np.concatenate([seen, keys])
+            written += n
+            return (
+                ["id", "user_id", "problem_id", "created_at"],
+                [int4(np.arange(base + lo + 1, base + hi + 1)), int4(keys // m), int4(keys % m),
+                 timestamp(self.times(rng, n))],
+            )
+        self.run_copy("likes", "problem_likes", min(self.args.likes, len(uids) * len(pids)), make)
+
+    # --- comments ---
+    def comments(self, pids, uids):
+        base = self.max_id("comments")
+        popular = _Popularity(len(pids), self.args.skew, self.rng("comments", 10**6))
+
+        def make(rng, _, lo, hi):
+            n = hi - lo
+            return (
+                ["id", "problem_id", "user_id", "text", "created_at"],
+                [int4(np.arange(base + lo + 1, base + hi + 1)), int4(pids[popular.draw(rng, n)]),
+                 int4(uids[rng.integers(0, len(uids), n)]),
+                 Vocab(COMMENT_LINES, rng.integers(0, len(COMMENT_LINES), n)), timestamp(self.times(rng, n))],
+            )
+        self.run_copy("comments", "comments", self.args.comments, make)
+
+
+class _Popularity:
+    """Long-tailed picks over range(n): index = perm[floor(n * u**skew)], so a few
+    items get most of the traffic, and which ones is shuffled (not just low ids)."""
+
+    def __init__(self, n: int, skew: float, rng: np.random.Generator):
+        self.n, self.skew = n, skew
+        self.perm = rng.permutation(n)
+
+    def draw(self, rng: np.random.Generator, k: int) -> np.ndarray:
+        return self.perm[np.minimum((self.n * rng.random(k) ** self.skew).astype(np.int64), self.n - 1)]
+
+
+# ---------- indexes, partitions, sequences ----------
+
+def deferred_indexes(engine) -> list[tuple[str, str]]:
+    """Secondary indexes (not backing a constraint) of the big tables: (name, CREATE statement)."""
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            JOIN pg_class c ON c.relname = i.indexname AND c.relnamespace = 'public'::regnamespace
+            WHERE i.schemaname = 'public' AND i.tablename = ANY(:tables)
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = c.oid)
+        """), {"tables": list(DEFERRED_INDEX_TABLES)}).all()
+    # on the partitioned parent the definition says ON ONLY; rebuild for every partition
+    return [(name, ddl.replace(" ON ONLY ", " ON ")) for name, ddl in rows]
+
+
+def reset_sequences(engine, tables):
+    with engine.begin() as conn:
+        for table in tables:
+            seq = conn.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": table}).scalar()
+            if seq:
+                conn.execute(text(f"SELECT setval(:s, (SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"),
+                             {"s": seq})
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate a synthetic dataset with COPY")
+    ap.add_argument("--problems", type=int, default=20_000)
+    ap.add_argument("--users", type=int, default=100_000)
+    ap.add_argument("--answers", type=int, default=2_000_000)
+    ap.add_argument("--likes", type=int, default=200_000)
+    ap.add_argument("--comments", type=int, default=20_000)
+    ap.add_argument("--only", help="comma-separated: users,problems,answers,likes,comments")
+    ap.add_argument("--days", type=int, default=180, help="answers/likes/comments span this many days back")
+    ap.add_argument("--daily-share", type=float, default=0.6, help="fraction of answers on that day's DPP")
+    ap.add_argument("--skew", type=float, default=3.0, help="popularity skew (1 = uniform)")
+    ap.add_argument("--seed", type=int, default=45)
+    ap.add_argument("--end-date", default=date.today().isoformat(), help="last day of generated activity")
+    ap.add_argument("--chunk", type=int, default=1_000_000, help="rows per COPY")
+    ap.add_argument("--defer-indexes", action="store_true", help="drop secondary indexes during the load")
+    ap.add_argument("--no-fk-checks", action="store_true", help="session_replication_role = replica (superuser)")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args()
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("gen_dataset loads with COPY; point DATABASE_URL at Postgres")
+    wanted = set(args.only.split(",")) if args.only else {"users", "problems", "answers", "likes", "comments"}
+    g = Gen(args, engine)
+    started = time.perf_counter()
+
+    dropped = []
+    if args.defer_indexes:
+        dropped = deferred_indexes(engine)
+        with engine.begin() as conn:
+            for name, _ in dropped:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        print(f"dropped {len(dropped)} secondary indexes for the load")
+
+    try:
+        if "users" in wanted:
+            g.users()
+        if "problems" in wanted:
+            g.problems()
+        if wanted & {"answers", "likes", "comments"}:
+            pids, subj, diff, correct = g.load_problems()
+            uids = g.user_ids()
+            if "answers" in wanted and args.answers:
+                last = date.fromisoformat(args.end_date)
+                first = (last - timedelta(days=args.days)).replace(day=1)
+                months = (last.year - first.year) * 12 + last.month - first.month
+                with engine.begin() as conn:
+                    ensure_partitions(conn, ahead=months + AHEAD_MONTHS, today=first)
+                rollouts = g.daily_rollouts(pids, subj)
+                attempts, solves = g.answers(pids, subj, diff, correct, uids, rollouts)
+                g.bump_counters(pids, attempts, solves)
+            if "likes" in wanted and args.likes:
+                g.likes(pids, uids)
+            if "comments" in wanted and args.comments:
+                g.comments(pids, uids)
+    finally:
+        if dropped:
+            t0 = time.perf_counter()
+            with engine.begin() as conn:
+                for _, ddl in dropped:
+                    conn.execute(text(ddl))
+            print(f"rebuilt {len(dropped)} indexes in {time.perf_counter() - t0:.1f}s")
+
+    reset_sequences(engine, ("users", "problems", "daily_rollouts", "user_answers", "problem_likes", "comments"))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+    print(f"done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# backend/scripts/import_pyq.py
+"""
+Bulk import previous-year questions (services/pyq.py).
+
+Usage (from backend/):
+  python -m scripts.import_pyq data/jee_main_2024.csv
+  python -m scripts.import_pyq data/advanced.jsonl --batch 2000 --no-render
+
+One row per question, CSV with a header or JSON lines, with the columns
+  exam (mains|advanced), exam_date (YYYY-MM-DD), shift, question_no,
+  subject, chapter, [topic], difficulty, question_tex, option_a_tex ..
+  option_d_tex, correct_option, [hint_tex], [solution_tex]
+
+Papers are created on first sight; questions already imported for a paper
+(same question_no) are skipped, so re-running a file is safe. Each batch is
+one transaction. New problems are pre-rendered afterwards unless --no-render.
+"""
+import argparse
+import csv
+import json
+import time
+from itertools import islice
+
+from database import SessionLocal
+from models import Problem
+from services import pyq
+from services.tex_render import available, make_pool, prerender
+
+
+def read_rows(path: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Import PYQ papers/questions")
+    ap.add_argument("files", nargs="+")
+    ap.add_argument("--batch", type=int, default=1000)
+    ap.add_argument("--no-render", action="store_true", help="skip TeX pre-rendering of new problems")
+    args = ap.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    papers = questions = skipped = 0
+    new_ids: list[int] = []
+    try:
+        for path in args.files:
+            rows = read_rows(path)
+            while batch := list(islice(rows, args.batch)):
+                res = pyq.import_rows(db, batch)
+                papers += res["papers"]
+                questions += res["questions"]
+                skipped += res["skipped"]
+                new_ids += res["problem_ids"]
+                print(f"{path}: +{res['questions']} questions ({res['skipped']} already present)")
+
+        if new_ids and not args.no_render and available():
+            pool = make_pool()
+            try:
+                for i in range(0, len(new_ids), 500):
+                    chunk = db.query(Problem).filter(Problem.id.in_(new_ids[i:i + 500])).all()
+                    prerender(db, chunk, pool)
+                    db.expunge_all()
+            finally:
+                if pool:
+                    pool.shutdown()
+    finally:
+        db.close()
+
+    print(f"{papers} new papers, {questions} questions imported, {skipped} skipped "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+# backend/scripts/loadgen.py
+"""
+Load generator: scripted user journeys over HTTP, with arrival curves shaped
+like exam-day traffic (the DPP rollover spike, the evening before a session).
+
+Usage (from backend/), against a running deployment started with FIREBASE_AUTH_FAKE=1:
+  python -m scripts.loadgen --base-url http://127.0.0.1:8000 --curve ramp:1:200 --duration 300
+  python -m scripts.loadgen --curve spike:5:150:60:30 --duration 180     # rollover at t=60s for 30s
+  python -m scripts.loadgen --curve steps:10,25,50,100 --duration 240 --mix solver=8,lurker=2
+  python -m scripts.loadgen --curve constant:20 --think 0 --out loadgen_results/smoke.json
+
+Arrivals are journeys (users) per second, open model: a new journey starts
+on schedule whether or not earlier ones have finished, so a slow server
+piles up active journeys instead of quietly lowering the load the way a
+fixed pool of looping clients would. Curves:
+
+  constant:R                  R journeys/s
+  ramp:FROM:TO                linear from FROM to TO over --duration
+  steps:R1,R2,...             equal-length steps over --duration
+  spike:BASE:PEAK:AT:WIDTH    BASE, PEAK from AT for WIDTH seconds (DPP rollover)
+
+Journeys (weights with --mix):
+
+  solver    open today's DPP, read the hint, submit, maybe like, maybe comment
+  lurker    signed out: today's DPP, the quote, the solution
+  reviewer  spaced-repetition queue, answer the first due item
+
+Auth uses the fake verifier (tokens "fake:<uid>", firebase_auth.py), so the
+server must run with FIREBASE_AUTH_FAKE=1 and must not be production (it
+refuses to start with Firebase credentials or a non-local database). Steps
+whose route the server doesn't expose (per /openapi.json) are skipped.
+
+Every request is recorded; per-second series (arrivals, active journeys,
+requests, errors, p50/p95/p99 per step) go to a JSON file. The saturation
+point is the first --window seconds in which p95 exceeds --slo-ms or the
+error rate exceeds --max-error-rate; the report gives the arrival rate and
+throughput there and the best throughput before it. Needs httpx.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SUBJECTS = ("math", "physics", "chemistry")
+OPTIONS = "ABCD"
+
+# status codes a step may legitimately answer with (re-submits are rejected with 400)
+EXPECTED = {"submit": {200, 400}, "review_answer": {200, 404}}
+
+
+def percentile(sorted_vals, pct):
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def git_rev() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def parse_curve(spec: str, duration: float):
+    """'ramp:1:200' -> rate(t) in journeys per second."""
+    kind, _, rest = spec.partition(":")
+    try:
+        if kind == "constant":
+            r = float(rest)
+            return lambda t: r
+        if kind == "ramp":
+            lo, hi = map(float, rest.split(":"))
+            return lambda t: lo + (hi - lo) * min(t / duration, 1.0)
+        if kind == "steps":
+            rates = [float(x) for x in rest.split(",")]
+            width = duration / len(rates)
+            return lambda t: rates[min(int(t // width), len(rates) - 1)]
+        if kind == "spike":
+            base, peak, at, width = map(float, rest.split(":"))
+            return lambda t: peak if at <= t < at + width else base
+    except ValueError:
+        pass
+    raise SystemExit(f"bad --curve {spec!r} (constant:R | ramp:A:B | steps:R1,R2 | spike:BASE:PEAK:AT:WIDTH)")
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, w = part.partition("=")
+        if name not in JOURNEYS:
+            raise SystemExit(f"unknown journey {name!r}; choose from {', '.join(JOURNEYS)}")
+        mix[name] = float(w or 1)
+    return mix
+
+
+@dataclass
+class Recorder:
+    started: float = field(default_factory=time.perf_counter)
+    # second -> step -> [latencies ms]; second -> step -> errors
+    latencies: dict = field(default_factory=lambda: defaultdict(lambda: defaultdict(list)))
+    errors: dict = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    statuses: dict = field(default_factory=lambda: defaultdict(int))
+    arrivals: dict = field(default_factory=lambda: defaultdict(int))
+    shed: dict = field(default_factory=lambda: defaultdict(int))
+    target: dict = field(default_factory=dict)
+    active: dict = field(default_factory=dict)
+    skipped: set = field(default_factory=set)
+
+    def second(self) -> int:
+        return int(time.perf_counter() - self.started)
+
+    def request(self, step: str, status, ms: float):
+        s = self.second()
+        self.latencies[s][step].append(ms)
+        self.statuses[f"{step}:{status}"] += 1
+        if status not in EXPECTED.get(step, {200}):
+            self.errors[s][step] += 1
+
+    def series(self) -> list[dict]:
+        out = []
+        last = max([*self.latencies, *self.arrivals, 0])
+        for s in range(last + 1):
+            steps = self.latencies.get(s, {})
+            everything = sorted(ms for v in steps.values() for ms in v)
+            n = len(everything)
+            errors = sum(self.errors.get(s, {}).values())
+            out.append({
+                "t": s,
+                "target_rate": round(self.target.get(s, 0.0), 2),
+                "arrivals": self.arrivals.get(s, 0),
+                "shed": self.shed.get(s, 0),
+                "active": self.active.get(s, 0),
+                "requests": n,
+                "errors": errors,
+                "p50_ms": round(percentile(everything, 50), 2),
+                "p95_ms": round(percentile(everything, 95), 2),
+                "p99_ms": round(percentile(everything, 99), 2),
+                "steps": {
+                    name: {
+                        "n": len(v),
+                        "errors": self.errors.get(s, {}).get(name, 0),
+                        "p95_ms": round(percentile(sorted(v), 95), 2),
+                    }
+                    for name, v in steps.items()
+                },
+            })
+        return out
+
+
+class Session:
+    """One simulated user: their token, the shared client and the recorder."""
+
+    def __init__(self, client: httpx.AsyncClient, rec: Recorder, routes: set, uid: str | None,
+                 think: float, rnd: random.Random):
+        self.client, self.rec, self.routes, self.think_mean, self.rnd = client, rec, routes, think, rnd
+        self.headers = {"Authorization": f"Bearer fake:{uid}"} if uid else {}
+
+    async def call(self, step: str, method: str, route: str, url: str, **kw):
+        if route not in self.routes:
+            self.rec.skipped.add(step)
+            return None
+        t0 = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, headers=self.headers, **kw)
+            status = resp.status_code
+        except httpx.TimeoutException:
+            resp, status = None, "timeout"
+        except httpx.HTTPError as e:
+            resp, status = None, type(e).__name__
+        self.rec.request(step, status, (time.perf_counter() - t0) * 1000.0)
+        return resp if status == 200 else None
+
+    async def think(self):
+        if self.think_mean > 0:
+            await asyncio.sleep(self.rnd.expovariate(1.0 / self.think_mean))
+
+
+async def solver(s: Session, args):
+    subject = s.rnd.choice(SUBJECTS)
+    resp = await s.call("today", "GET", "/api/daily/{subject}/today", f"/api/daily/{subject}/today")
+    if resp is None:
+        return
+    pid = resp.json()["id"]
+    await s.think()
+    await s.call("hint", "GET", "/api/questions/{problem_id}/hint", f"/api/questions/{pid}/hint")
+    await s.think()
+    await s.call("submit", "POST", "/api/questions/{question_id}/submit", f"/api/questions/{pid}/submit",
+                 json={"selectedOption": s.rnd.choice(OPTIONS)})
+    if s.rnd.random() < args.like_rate:
+        await s.call("like", "POST", "/api/questions/{question_id}/like", f"/api/questions/{pid}/like")
+    if s.rnd.random() < args.comment_rate:
+        await s.think()
+        await s.call("comment", "POST", args.comment_route, args.comment_route.replace("{problem_id}", str(pid)),
+                     json={"text": "loadgen: nice one"})
+
+
+async def lurker(s: Session, args):
+    subject = s.rnd.choice(SUBJECTS)
+    resp = await s.call("today_anon", "GET", "/api/daily/{subject}/today", f"/api/daily/{subject}/today")
+    await s.call("quote", "GET", "/api/daily-quote", "/api/daily-quote")
+    if resp is not None:
+        await s.think()
+        pid = resp.json()["id"]
+        await s.call("solution", "GET", "/api/questions/{problem_id}/solution", f"/api/questions/{pid}/solution")
+
+
+async def reviewer(s: Session, args):
+    resp = await s.call("review_due", "GET", "/api/review/due", "/api/review/due")
+    if resp is None or not resp.json()["items"]:
+        return
+    pid = resp.json()["items"][0]["problem_id"]
+    await s.think()
+    await s.call("review_answer", "POST", "/api/review/{question_id}/answer", f"/api/review/{pid}/answer",
+                 json={"selectedOption": s.rnd.choice(OPTIONS)})
+
+
+JOURNEYS = {"solver": solver, "lurker": lurker, "reviewer": reviewer}
+SIGNED_IN = {"solver", "reviewer"}
+
+
+async def run(args) -> dict:
+    rate = parse_curve(args.curve, args.duration)
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    rnd = random.Random(args.seed)
+    run_id = f"lg{int(time.time())}"
+
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        try:
+            routes = set((await client.get("/openapi.json")).json()["paths"])
+        except (httpx.HTTPError, ValueError, KeyError):
+            raise SystemExit(f"could not read {args.base_url}/openapi.json; is the server up?")
+
+        rec = Recorder()
+        tasks: set[asyncio.Task] = set()
+        seq = 0
+
+        async def sample():
+            while True:
+                rec.active[rec.second()] = len(tasks)
+                await asyncio.sleep(0.25)
+
+        async def report():
+            shown = 0
+            while True:
+                await asyncio.sleep(args.report_every)
+                now = rec.second()
+                window = [ms for s in range(shown, now) for v in rec.latencies.get(s, {}).values() for ms in v]
+                errors = sum(n for s in range(shown, now) for n in rec.errors.get(s, {}).values())
+                window.sort()
+                span = max(now - shown, 1)
+                print(f"t={now:>5}s target={rate(now):>7.1f}/s active={len(tasks):>5} "
+                      f"rps={len(window) / span:>8.1f} p95={percentile(window, 95):>8.1f}ms "
+                      f"errors={errors}")
+                shown = now
+
+        sampler, reporter = asyncio.create_task(sample()), asyncio.create_task(report())
+        t_start = time.perf_counter()
+        while (elapsed := time.perf_counter() - t_start) < args.duration:
+            r = rate(elapsed)
+            rec.target[int(elapsed)] = r
+            if r <= 0:
+                await asyncio.sleep(0.1)
+                continue
+            # inter-arrival times of a Poisson process at the current rate
+            await asyncio.sleep(rnd.expovariate(r))
+            second = rec.second()
+            if len(tasks) >= args.max_active:
+                rec.shed[second] += 1  # client-side saturation: the server isn't keeping up
+                continue
+            rec.arrivals[second] += 1
+            journey = rnd.choices(names, weights)[0]
+            seq += 1
+            uid = None
+            if journey in SIGNED_IN:
+                uid = f"{run_id}-{seq % args.users if args.users else seq}"
+            session = Session(client, rec, routes, uid, args.think, random.Random(rnd.random()))
+            task = asyncio.create_task(JOURNEYS[journey](session, args))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.wait(tasks, timeout=args.drain)
+        for t in (sampler, reporter, *tasks):
+            t.cancel()
+
+    return {
+        "git_rev": git_rev(),
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "base_url": args.base_url,
+        "curve": args.curve,
+        "mix": mix,
+        "duration_s": args.duration,
+        "think_s": args.think,
+        "skipped_steps": sorted(rec.skipped),
+        "statuses": dict(rec.statuses),
+        "series": rec.series(),
+    }
+
+
+def saturation(series: list[dict], window: int, slo_ms: float, max_error_rate: float) -> dict:
+    """First `window`-second span breaching the SLO, and the best throughput before it."""
+    best = {"rps": 0.0, "t": None}
+    for i in range(0, max(len(series) - window + 1, 0)):
+        span = series[i:i + window]
+        n = sum(p["requests"] for p in span)
+        if not n:
+            continue
+        rps = n / window
+        p95 = max(p["p95_ms"] for p in span)
+        err_rate = sum(p["errors"] for p in span) / n
+        shed = sum(p["shed"] for p in span)
+        if p95 > slo_ms or err_rate > max_error_rate or shed:
+            return {
+                "saturated_at_s": span[0]["t"],
+                "target_rate": span[0]["target_rate"],
+                "rps": round(rps, 1),
+                "p95_ms": p95,
+                "error_rate": round(err_rate, 4),
+                "shed": shed,
+                "best_rps_before": round(best["rps"], 1),
+                "best_rps_at_s": best["t"],
+            }
+        if rps > best["rps"]:
+            best = {"rps": rps, "t": span[0]["t"]}
+    return {"saturated_at_s": None, "best_rps": round(best["rps"], 1), "best_rps_at_s": best["t"]}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Scenario-based HTTP load generator")
+    ap.add_argument("--base-url", default="http://127.0.0.1:8000")
+    ap.add_argument("--curve", default="ramp:1:100", help="arrival curve, journeys/s (see module doc)")
+    ap.add_argument("--duration", type=float, default=120.0, help="seconds of arrivals")
+    ap.add_argument("--mix", default="solver=7,lurker=2,reviewer=1", help="journey weights")
+    ap.add_argument("--think", type=float, default=1.0, help="mean think time between steps (s); 0 = none")
+    ap.add_argument("--users", type=int, default=0, help="distinct signed-in users to cycle (0 = new user per journey)")
+    ap.add_argument("--like-rate", type=float, default=0.3)
+    ap.add_argument("--comment-rate", type=float, default=0.05)
+    ap.add_argument("--comment-route", default="/api/comments/{problem_id}")
+    ap.add_argument("--connections", type=int, default=200, help="HTTP connection pool size")
+    ap.add_argument("--max-active", type=int, default=5000, help="active journeys before arrivals are shed")
+    ap.add_argument("--timeout", type=float, default=10.0, help="per-request timeout (s)")
+    ap.add_argument("--drain", type=float, default=30.0, help="seconds to let running journeys finish")
+    ap.add_argument("--report-every", type=float, default=5.0)
+    ap.add_argument("--slo-ms", type=float, default=500.0, help="p95 latency SLO")
+    ap.add_argument("--max-error-rate", type=float, default=0.01)
+    ap.add_argument("--window", type=int, default=5, help="seconds per saturation window")
+    ap.add_argument("--seed", type=int, default=44)
+    ap.add_argument("--out", help="JSON output path (default loadgen_results/<git rev>-<ts>.json)")
+    args = ap.parse_args()
+
+    report = asyncio.run(run(args))
+    report["saturation"] = saturation(report["series"], args.window, args.slo_ms, args.max_error_rate)
+
+    out = Path(args.out) if args.out else (
+        BACKEND_DIR / "loadgen_results" / f"{report['git_rev']}-{int(time.time())}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+
+    sat = report["saturation"]
+    if report["skipped_steps"]:
+        print(f"\nskipped (route not exposed): {', '.join(report['skipped_steps'])}")
+    if sat["saturated_at_s"] is None:
+        print(f"\nno saturation: best {sat['best_rps']} req/s (t={sat['best_rps_at_s']}s)")
+    else:
+        print(f"\nsaturated at t={sat['saturated_at_s']}s, target {sat['target_rate']} journeys/s: "
+              f"{sat['rps']} req/s, p95 {sat['p95_ms']}ms, errors {sat['error_rate']:.2%}, shed {sat['shed']}; "
+              + (f"best before: {sat['best_rps_before']} req/s (t={sat['best_rps_at_s']}s)"
+                 if sat["best_rps_at_s"] is not None else "breached from the first window"))
+    print(f"saved {out}")
+
+
+if __name__ == "__main__":
+    main()
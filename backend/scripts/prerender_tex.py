@@ -0,0 +1,61 @@
+# backend/scripts/prerender_tex.py
+"""
+Backfill / refresh server-side TeX renderings (services/tex_render.py).
+
+Usage (from backend/):
+  python -m scripts.prerender_tex                 # every problem, default worker count
+  python -m scripts.prerender_tex --workers 8
+  python -m scripts.prerender_tex --ids 12 13 14  # after a bulk edit
+
+Only fields whose (renderer version, text) hash is not stored yet are
+rendered, so re-running is cheap. Run it after seeding/importing problems
+outside the app, and after bumping RENDERER_VERSION.
+"""
+import argparse
+import time
+
+from sqlalchemy import select
+
+from database import SessionLocal
+from models import Problem
+from services.tex_render import WORKERS, available, make_pool, prerender
+
+BATCH = 500
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pre-render problem TeX into rendered_tex")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--ids", type=int, nargs="*", help="only these problem ids")
+    args = ap.parse_args()
+
+    if not available():
+        raise SystemExit("latex2mathml is not installed (pip install latex2mathml)")
+
+    db = SessionLocal()
+    pool = make_pool(args.workers)
+    started = time.perf_counter()
+    total = seen = 0
+    try:
+        last_id = 0
+        while True:
+            q = select(Problem).where(Problem.id > last_id).order_by(Problem.id).limit(BATCH)
+            if args.ids:
+                q = q.where(Problem.id.in_(args.ids))
+            problems = db.execute(q).scalars().all()
+            if not problems:
+                break
+            total += prerender(db, problems, pool)
+            seen += len(problems)
+            last_id = problems[-1].id
+            db.expunge_all()
+    finally:
+        if pool:
+            pool.shutdown()
+        db.close()
+
+    print(f"{seen} problems checked, {total} fields rendered in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# backend/scripts/refresh_stats.py
+"""
+Refresh the chapter/topic stats rollup (services/chapter_stats.py).
+
+Usage (from backend/):
+  python -m scripts.refresh_stats              # fold in answers since the watermark
+  python -m scripts.refresh_stats --rebuild    # drop and rebuild from all answers
+
+The app already refreshes every CHAPTER_STATS_REFRESH_INTERVAL seconds; this
+is for cron when that is off, and for the first build after upgrading. If a
+worker is refreshing at the same moment this one skips.
+"""
+import argparse
+import time
+
+from database import SessionLocal
+from services.chapter_stats import rebuild, refresh
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Refresh the chapter stats rollup")
+    ap.add_argument("--rebuild", action="store_true", help="drop the rollup and build it from scratch")
+    args = ap.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        result = rebuild(db) if args.rebuild else refresh(db)
+    finally:
+        db.close()
+    if result is None:
+        print("another process is refreshing; skipped")
+        return
+    print(f"answers {result['from']:%Y-%m-%d %H:%M:%S} .. {result['to']:%Y-%m-%d %H:%M:%S} "
+          f"-> {result['keys']} keys in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# backend/scripts/replan_reviews.py
+"""
+Nightly re-plan of the spaced-repetition queue (services/review.py).
+
+Usage (from backend/), e.g. from cron at 02:00:
+  python -m scripts.replan_reviews
+  python -m scripts.replan_reviews --grace-days 3 --per-day 20
+  python -m scripts.replan_reviews --backfill    # once: queue past wrong answers first
+
+Items missed by more than --grace-days start over at a 1-day interval and
+are spread from tomorrow on, at most --per-day per user. One UPDATE for all
+users, in one transaction.
+"""
+import argparse
+import time
+
+from database import get_engine
+from services.review import GRACE_DAYS, PER_DAY, backfill, replan_overdue
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Re-plan overdue review items")
+    ap.add_argument("--grace-days", type=int, default=GRACE_DAYS)
+    ap.add_argument("--per-day", type=int, default=PER_DAY)
+    ap.add_argument("--backfill", action="store_true", help="seed from existing wrong answers first")
+    args = ap.parse_args()
+
+    started = time.perf_counter()
+    with get_engine().begin() as conn:
+        if args.backfill:
+            print(f"{backfill(conn)} review items created from past wrong answers")
+        n = replan_overdue(conn, grace_days=args.grace_days, per_day=args.per_day)
+    print(f"{n} overdue review items re-planned in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 # backend/seed_daily.py
 from datetime import date, datetime
+import cache_bus
 from database import SessionLocal
 from models import DailyRollout, Problem
+from services.bundle import bundle_cache
+from services.daily import daily_cache
 from sqlalchemy import select
 
 def set_today(subject: str):
@@ -24,7 +27,14 @@ def set_today(subject: str):
         else:
             obj = DailyRollout(date=today, subject=subject, problem_id=pid, created_at=datetime.utcnow())
             db.add(obj)
+        # running workers drop their cached payload for the day and the offline bundle
+        key = f"{subject}:{today.isoformat()}"
+        cache_bus.notify(db, daily_cache.namespace, key)
+        cache_bus.notify(db, bundle_cache.namespace)
         db.commit()
+        # the listeners only evict local copies: the shared (Redis) one is ours to drop
+        daily_cache.delete(key)
+        bundle_cache.clear()
         print(f"Set {subject} → problem_id={pid} for {today}")
     finally:
         db.close()
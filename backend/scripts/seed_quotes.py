@@ -1,6 +1,8 @@
 import csv
+import cache_bus
 from database import SessionLocal
 from models import Quote
+from routes.quotes import quotes_cache
 
 def main():
     db = SessionLocal()
@@ -12,7 +14,9 @@ def main():
                 for r in reader
             ]
         db.add_all(rows)
+        cache_bus.notify(db, quotes_cache.namespace)  # running workers reload on commit
         db.commit()
+        quotes_cache.delete("all")  # the shared (Redis) copy; listeners only evict local ones
         print(f"✅ Inserted {len(rows)} quotes.")
     finally:
         db.close()
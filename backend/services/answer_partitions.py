@@ -0,0 +1,162 @@
+# backend/services/answer_partitions.py
+"""
+Monthly partitions of `user_answers` (Postgres only).
+
+Migration 9a4d3f2e6c71 turns user_answers into a table range-partitioned on
+created_at, one partition per month (user_answers_YYYYMM) plus a DEFAULT
+partition as a safety net. Inserts only touch the current month's partition
+and its indexes, and autovacuum works on a small hot table instead of the
+whole history. A BRIN index on created_at covers time-range scans for
+almost no space.
+
+- ensure_partitions(): create the next few months ahead of time. Runs at app
+  startup; also `python -m scripts.archive_answers ensure`.
+- archive(): for months older than the cutoff, save per-problem totals into
+  user_answer_archive_stats, then DETACH the partition (and optionally drop
+  it). Stats keep counting archived answers through archived_totals().
+
+On other databases (SQLite in benchmarks) everything here is a no-op.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+import database
+from lifecycle import on_startup
+from models import AnswerArchiveStat
+
+log = logging.getLogger(__name__)
+
+AHEAD_MONTHS = int(os.getenv("ANSWER_PARTITIONS_AHEAD", "2"))
+DEFAULT_PARTITION = "user_answers_default"
+_LOCK_KEY = 0x75615F70  # advisory lock id: workers starting together create partitions once
+
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"user_answers_{month.year}{month.month:02d}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'user_answers' AND c.relnamespace = 'public'::regnamespace"
+    )).scalar())
+
+
+def monthly_partitions(conn: Connection) -> list[tuple[date, str]]:
+    """(month, partition name) for attached monthly partitions, oldest first."""
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'user_answers'"
+    )).scalars().all()
+    out = []
+    for name in rows:
+        suffix = name.rsplit("_", 1)[-1]
+        if len(suffix) == 6 and suffix.isdigit():
+            out.append((date(int(suffix[:4]), int(suffix[4:]), 1), name))
+    return sorted(out)
+
+
+def ensure_partitions(conn: Connection, ahead: int = AHEAD_MONTHS, today: date | None = None) -> list[str]:
+    """Create partitions from this month through `ahead` months out. Returns the new ones."""
+    if not is_partitioned(conn):
+        return []
+    conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _LOCK_KEY})
+    existing = {name for _, name in monthly_partitions(conn)}
+    has_default = bool(conn.execute(text("SELECT to_regclass(:t)"), {"t": DEFAULT_PARTITION}).scalar())
+    first = month_start(today or date.today())
+    created = []
+    for i in range(ahead + 1):
+        month = add_months(first, i)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        lo, hi = month.isoformat(), add_months(month, 1).isoformat()
+        # build it standalone and pull any rows that already fell into DEFAULT,
+        # otherwise the attach would fail on the default partition's constraint
+        conn.execute(text(f"CREATE TABLE {name} (LIKE user_answers INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        if has_default:
+            conn.execute(text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE created_at >= '{lo}' AND created_at < '{hi}' RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ))
+        conn.execute(text(f"ALTER TABLE user_answers ATTACH PARTITION {name} FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+        created.append(name)
+    return created
+
+
+def archive(engine: Engine, before: date, drop: bool = False) -> list[str]:
+    """Aggregate then detach every monthly partition that ends on or before `before`."""
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            return []
+        partitions = monthly_partitions(conn)
+
+    done = []
+    for month, name in partitions:
+        if add_months(month, 1) > before:
+            break
+        # one transaction per partition: totals saved <=> partition detached
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"INSERT INTO user_answer_archive_stats (problem_id, month, attempted, solved) "
+                f"SELECT problem_id, :month, count(*), count(*) FILTER (WHERE is_correct) "
+                f"FROM {name} GROUP BY problem_id "
+                f"ON CONFLICT (problem_id, month) DO UPDATE "
+                f"SET attempted = EXCLUDED.attempted, solved = EXCLUDED.solved"
+            ), {"month": month})
+            conn.execute(text(f"ALTER TABLE user_answers DETACH PARTITION {name}"))
+            if drop:
+                conn.execute(text(f"DROP TABLE {name}"))
+        done.append(name)
+        log.info("archived %s (%s)", name, "dropped" if drop else "detached")
+    return done
+
+
+def archived_totals(db: Session, problem_ids: Iterable[int]) -> dict[int, tuple[int, int]]:
+    """problem_id -> (attempted, solved) from archived months."""
+    ids = list(problem_ids)
+    if not ids:
+        return {}
+    rows = db.execute(
+        select(AnswerArchiveStat.problem_id, func.sum(AnswerArchiveStat.attempted), func.sum(AnswerArchiveStat.solved))
+        .where(AnswerArchiveStat.problem_id.in_(ids))
+        .group_by(AnswerArchiveStat.problem_id)
+    ).all()
+    return {pid: (int(a), int(s)) for pid, a, s in rows}
+
+
+@on_startup("answer-partitions")
+def _ensure_at_startup():
+    engine = database.get_engine()
+    if engine.dialect.name != "postgresql":
+        return
+    try:
+        with engine.begin() as conn:
+            created = ensure_partitions(conn)
+        if created:
+            log.info("created user_answers partitions: %s", ", ".join(created))
+    except Exception:
+        # not fatal: rows land in the DEFAULT partition until this succeeds
+        log.exception("could not create upcoming user_answers partitions")
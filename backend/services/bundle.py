@@ -0,0 +1,69 @@
+# backend/services/bundle.py
+"""
+Offline prefetch bundle: the last and next N days of daily rollouts (all
+subjects) with question, options, hint and solution TeX, as one gzip'd JSON
+document.
+
+The bundle only changes when the day rolls over or a rollout is scheduled, so
+it is built once per (day, N) per worker and served as static bytes with a
+content-hash ETag. Clients send If-None-Match and usually get a 304.
+
+Only rollouts that already exist are included: today's rows are created on
+first request (services/daily.py), so future days show up once scheduled.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from datetime import date, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from cache import Cache
+from models import DailyRollout, Problem
+from services.daily import problem_payload, rendered_payload
+from services.tex_render import rendered_views
+
+MAX_DAYS = 7
+
+# (day, N) -> {"etag", "gz"}; bytes can't go through the shared JSON tier.
+# Renderings that land later (services/tex_render.py) show up on the next rebuild.
+bundle_cache = Cache("bundle", default_ttl=3600, max_entries=32, shared=False)
+
+
+def _build(db: Session, today: date, days: int) -> dict:
+    rows = db.execute(
+        select(DailyRollout.date, DailyRollout.subject, Problem)
+        .join(Problem, Problem.id == DailyRollout.problem_id)
+        .where(DailyRollout.date.between(today - timedelta(days=days), today + timedelta(days=days)))
+        .order_by(DailyRollout.date, DailyRollout.subject)
+    ).all()
+    views = rendered_views(db, [p for _, _, p in rows])
+
+    doc = {
+        "today": today.isoformat(),
+        "days": days,
+        "rollouts": [
+            {
+                "date": d.isoformat(),
+                "subject": subject,
+                "problem": {
+                    **problem_payload(p),
+                    "hint_tex": p.hint_tex or "",
+                    "solution_tex": p.solution_tex or "",
+                    "rendered": rendered_payload(views[p.id]),
+                },
+            }
+            for d, subject, p in rows
+        ],
+    }
+    raw = json.dumps(doc, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    # mtime=0 keeps the bytes identical across workers and rebuilds
+    gz = gzip.compress(raw, compresslevel=9, mtime=0)
+    return {"etag": '"' + hashlib.sha256(raw).hexdigest()[:32] + '"', "gz": gz}
+
+
+def get_bundle(db: Session, today: date, days: int) -> dict:
+    return bundle_cache.get_or_load(f"{today.isoformat()}:{days}", lambda: _build(db, today, days))
@@ -0,0 +1,286 @@
+# backend/services/chapter_stats.py
+"""
+Per-chapter and per-topic statistics (accuracy, attempt volume, problem
+counts) from a rollup table instead of grouping all of user_answers.
+
+`chapter_stats` holds attempted/solved totals per (subject, chapter, topic).
+refresh() folds in only the answers created since the previous run:
+
+    lo = rollup_watermarks.watermark, hi = now() - LAG
+    SELECT p.subject, p.chapter, p.topic, count(*), count(*) FILTER (WHERE ua.is_correct)
+    FROM user_answers ua JOIN problems p ON p.id = ua.problem_id
+    WHERE ua.created_at >= lo AND ua.created_at < hi      -- partition pruning + BRIN
+    GROUP BY 1, 2, 3
+    -> upsert attempted += ..., solved += ...; watermark = hi
+
+in one transaction, so the totals and the watermark never disagree, and its
+cost follows the number of new answers. created_at is stamped when an
+answer's transaction starts, so the window stays LAG behind the clock for
+transactions still in flight. The first run also folds in the archived
+months (user_answer_archive_stats) and reads every live answer. Active
+problem counts are regrouped from `problems` on each run (catalog-sized,
+only changed rows are written).
+
+The watermark row doubles as the lock: refresh() takes it FOR UPDATE SKIP
+LOCKED, so with several workers one refreshes and the rest skip. Admin edits
+that move problems between chapters/topics or re-grade their answers call
+retract() before and restore() after the change, in their own transaction,
+to move those problems' counted answers (cost follows the edited problems).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import exists, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import cache_bus
+from cache import Cache
+from lifecycle import on_shutdown, on_startup
+from models import AnswerArchiveStat, ChapterStat, Problem, RollupWatermark, SubjectEnum, UserAnswer
+from services.pyq import chapter_slug
+
+log = logging.getLogger(__name__)
+
+ROLLUP = "chapter_stats"
+LAG = timedelta(seconds=float(os.getenv("CHAPTER_STATS_LAG", "60")))
+REFRESH_INTERVAL = float(os.getenv("CHAPTER_STATS_REFRESH_INTERVAL", "60"))  # seconds, 0 = off
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)  # watermark of a rollup never built
+
+KEY = ("subject", "chapter", "topic")
+
+# subject -> chapters view; evicted on every worker when a refresh commits
+chapter_stats_cache = Cache("chapter_stats", default_ttl=REFRESH_INTERVAL or 300)
+
+
+def _aware(ts: datetime) -> datetime:
+    # SQLite hands timestamps back naive
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _insert(db: Session):
+    return pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+def _answers(lo: datetime | None, hi: datetime, problem_ids: Iterable[int] | None = None, sign: int = 1):
+    q = (
+        select(Problem.subject, Problem.chapter, Problem.topic,
+               func.count() * sign, func.count().filter(UserAnswer.is_correct) * sign)
+        .select_from(UserAnswer)
+        .join(Problem, Problem.id == UserAnswer.problem_id)
+        .where(UserAnswer.created_at < hi)
+        .group_by(Problem.subject, Problem.chapter, Problem.topic)
+    )
+    if lo is not None:
+        q = q.where(UserAnswer.created_at >= lo)
+    if problem_ids is not None:
+        q = q.where(UserAnswer.problem_id.in_(problem_ids))
+    return q
+
+
+def _archived(problem_ids: Iterable[int] | None = None, sign: int = 1):
+    q = (
+        select(Problem.subject, Problem.chapter, Problem.topic,
+               func.sum(AnswerArchiveStat.attempted) * sign, func.sum(AnswerArchiveStat.solved) * sign)
+        .select_from(AnswerArchiveStat)
+        .join(Problem, Problem.id == AnswerArchiveStat.problem_id)
+        .group_by(Problem.subject, Problem.chapter, Problem.topic)
+    )
+    if problem_ids is not None:
+        q = q.where(AnswerArchiveStat.problem_id.in_(problem_ids))
+    return q
+
+
+def _add(db: Session, totals) -> int:
+    """Upsert (subject, chapter, topic, attempted, solved) rows, adding to the totals."""
+    ins = _insert(db)(ChapterStat).from_select(
+        [*KEY, "attempted", "solved", "problem_count"],
+        totals.add_columns(literal(0)),
+    )
+    return db.execute(ins.on_conflict_do_update(
+        index_elements=list(KEY),
+        set_={
+            "attempted": ChapterStat.attempted + ins.excluded.attempted,
+            "solved": ChapterStat.solved + ins.excluded.solved,
+        },
+    )).rowcount
+
+
+def _refresh_problem_counts(db: Session):
+    counts = (
+        select(Problem.subject, Problem.chapter, Problem.topic, literal(0), literal(0),
+               func.count().filter(Problem.is_active))
+        .group_by(Problem.subject, Problem.chapter, Problem.topic)
+    )
+    ins = _insert(db)(ChapterStat).from_select([*KEY, "attempted", "solved", "problem_count"], counts)
+    db.execute(ins.on_conflict_do_update(
+        index_elements=list(KEY),
+        set_={"problem_count": ins.excluded.problem_count},
+        where=ChapterStat.problem_count != ins.excluded.problem_count,
+    ))
+    # keys whose problems have all moved elsewhere
+    db.execute(
+        update(ChapterStat)
+        .where(ChapterStat.problem_count != 0, ~exists().where(
+            Problem.subject == ChapterStat.subject,
+            Problem.chapter == ChapterStat.chapter,
+            Problem.topic == ChapterStat.topic,
+        ))
+        .values(problem_count=0)
+    )
+
+
+# ---------- refresh ----------
+
+def refresh(db: Session, now: datetime | None = None) -> Optional[dict]:
+    """Fold answers created since the last refresh into chapter_stats.
+
+    Returns {"from", "to", "keys"}, or None when another worker is refreshing.
+    """
+    now = now or datetime.now(timezone.utc)
+    db.execute(
+        _insert(db)(RollupWatermark)
+        .values(name=ROLLUP, watermark=EPOCH, refreshed_at=now)
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    db.commit()
+
+    wm = db.execute(
+        select(RollupWatermark).where(RollupWatermark.name == ROLLUP).with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if wm is None:
+        db.rollback()
+        return None
+    lo, hi = _aware(wm.watermark), now - LAG
+    if hi <= lo:
+        db.rollback()
+        return {"from": lo, "to": lo, "keys": 0}
+
+    first = lo <= EPOCH
+    if first:
+        _add(db, _archived())
+    keys = _add(db, _answers(None if first else lo, hi))
+    _refresh_problem_counts(db)
+    wm.watermark, wm.refreshed_at = hi, now
+    cache_bus.notify(db, chapter_stats_cache.namespace)
+    db.commit()
+    chapter_stats_cache.clear()
+    return {"from": lo, "to": hi, "keys": keys}
+
+
+def rebuild(db: Session) -> Optional[dict]:
+    """Drop the rollup and build it again from archived totals and all live answers."""
+    db.execute(ChapterStat.__table__.delete())
+    db.execute(RollupWatermark.__table__.delete().where(RollupWatermark.name == ROLLUP))
+    db.commit()
+    return refresh(db)
+
+
+# ---------- admin edits ----------
+
+def _adjust(db: Session, problem_ids: set[int], sign: int):
+    # waits for a running refresh, then holds it off until the edit commits
+    wm = db.execute(
+        select(RollupWatermark.watermark).where(RollupWatermark.name == ROLLUP).with_for_update()
+    ).scalar_one_or_none()
+    if wm is None or _aware(wm) <= EPOCH or not problem_ids:
+        return  # not built yet: the first refresh reads everything as it is then
+    _add(db, _archived(problem_ids, sign))
+    _add(db, _answers(None, _aware(wm), problem_ids, sign))
+
+
+def retract(db: Session, problem_ids: set[int]):
+    """Take these problems' counted answers out of the rollup (before an edit)."""
+    _adjust(db, problem_ids, -1)
+
+
+def restore(db: Session, problem_ids: set[int]):
+    """Count them again under their current chapter/topic and grades (after the edit)."""
+    _adjust(db, problem_ids, 1)
+
+
+# ---------- reads ----------
+
+def subject_view(db: Session, subject: SubjectEnum) -> dict:
+    def load():
+        as_of = db.execute(
+            select(RollupWatermark.watermark).where(RollupWatermark.name == ROLLUP)
+        ).scalar_one_or_none()
+        chapters: dict[str, dict] = {}
+        for chapter, topic, n, attempted, solved in db.execute(
+            select(ChapterStat.chapter, ChapterStat.topic, ChapterStat.problem_count,
+                   ChapterStat.attempted, ChapterStat.solved)
+            .where(ChapterStat.subject == subject)
+            .order_by(ChapterStat.chapter, ChapterStat.topic)
+        ):
+            if not n and not attempted:
+                continue
+            ch = chapters.setdefault(chapter, {
+                "chapter": chapter, "slug": chapter_slug(chapter),
+                "problem_count": 0, "attempted": 0, "solved": 0, "topics": [],
+            })
+            ch["problem_count"] += n
+            ch["attempted"] += attempted
+            ch["solved"] += solved
+            ch["topics"].append({"topic": topic, "problem_count": n, "attempted": attempted, "solved": solved,
+                                 "accuracy": solved / attempted if attempted else 0.0})
+        for ch in chapters.values():
+            ch["accuracy"] = ch["solved"] / ch["attempted"] if ch["attempted"] else 0.0
+        return {
+            "subject": subject.value,
+            "as_of": _aware(as_of).isoformat() if as_of and _aware(as_of) > EPOCH else None,
+            "chapters": list(chapters.values()),
+        }
+    return chapter_stats_cache.get_or_load(subject.value, load)
+
+
+# ---------- background refresh ----------
+
+class Refresher:
+    def __init__(self, interval: float = REFRESH_INTERVAL):
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self):
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            result = refresh(db)
+            if result and result["keys"]:
+                log.info("chapter stats: folded answers %s .. %s into %d keys",
+                         result["from"], result["to"], result["keys"])
+        except Exception:
+            db.rollback()
+            log.exception("chapter stats refresh failed; retrying next interval")
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.run_once()
+
+    def start(self):
+        if self._interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chapter-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+refresher = Refresher()
+
+on_startup("chapter-stats")(refresher.start)
+on_shutdown("chapter-stats")(refresher.stop)
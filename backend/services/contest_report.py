@@ -0,0 +1,295 @@
+# backend/services/contest_report.py
+"""
+Contest reports, computed once at close with NumPy and stored as blobs.
+
+A contest's submissions are loaded once into columnar arrays:
+
+    answers   uint8 (participants, questions)   b'A'..b'D', b'-' = unanswered
+    key       uint8 (questions,)                correct options
+    subjects  int   (questions,)                index into SUBJECTS
+    spent     int   (participants,)             seconds
+
+Every aggregate is array arithmetic on those, with no per-row Python:
+correct/wrong masks, scores (MARKS_CORRECT / MARKS_WRONG, as for PYQ papers),
+per-subject scores via a (questions, subjects) one-hot matmul, ranks and
+percentiles by searchsorted on the sorted scores, per-question correct and
+attempt rates and option distributions as column sums.
+
+The results are stored in contest_reports: user_id 0 is the contest-wide
+document (score distribution, subject breakdown, per-question stats; gzip'd
+JSON) and each participant gets a small document of their own (score, rank,
+percentile, subject scores, their answers; plain JSON, since at ~500 bytes
+gzip halves them but costs more than everything else in the build).
+Opening a report is a primary-key lookup; the contest-wide part is also
+cached since it never changes after close.
+
+Percentile is the share of participants scoring at or below you (NTA style);
+rank is 1 + the number scoring strictly higher, so ties share a rank.
+"""
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import struct
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from cache import Cache
+from models import ContestQuestion, ContestReport, ContestSubmission, Problem, SubjectEnum
+from services.pyq import MARKS_CORRECT, MARKS_WRONG
+
+UNANSWERED = ord("-")
+OPTIONS = "ABCD"
+SUBJECTS = [s.value for s in SubjectEnum]
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+HISTOGRAM_BINS = 20
+CONTEST_WIDE = 0  # contest_reports.user_id of the shared document
+
+# contest_id -> contest-wide document; immutable once the contest is closed
+report_cache = Cache("contest_report", default_ttl=3600, max_entries=256)
+
+
+@dataclass
+class Columns:
+    user_ids: np.ndarray   # (P,)
+    answers: np.ndarray    # (P, Q) uint8
+    spent: np.ndarray      # (P,)
+    problem_ids: list[int]
+    key: np.ndarray        # (Q,) uint8
+    subjects: np.ndarray   # (Q,) index into SUBJECTS
+
+
+def pack_answers(answers: dict[int, str], question_count: int) -> str:
+    """{question_no: option} -> one character per question ('-' = unanswered)."""
+    out = ["-"] * question_count
+    for no, option in answers.items():
+        out[no - 1] = option
+    return "".join(out)
+
+
+# ---------- load ----------
+
+def load(db: Session, contest_id: int) -> Columns:
+    questions = db.execute(
+        select(ContestQuestion.problem_id, Problem.correct_option, ContestQuestion.subject)
+        .join(Problem, Problem.id == ContestQuestion.problem_id)
+        .where(ContestQuestion.contest_id == contest_id)
+        .order_by(ContestQuestion.question_no)
+    ).all()
+    q = len(questions)
+    problem_ids = [r[0] for r in questions]
+    key = np.frombuffer("".join(r[1] for r in questions).encode("ascii"), dtype=np.uint8)
+    subjects = np.array([SUBJECTS.index(getattr(r[2], "value", r[2])) for r in questions], dtype=np.int64)
+
+    rows = db.execute(
+        select(ContestSubmission.user_id, ContestSubmission.answers, ContestSubmission.time_spent_seconds)
+        .where(ContestSubmission.contest_id == contest_id)
+        .order_by(ContestSubmission.user_id)
+    ).all()
+    if rows:
+        user_ids, packed, spent = zip(*rows)
+    else:
+        user_ids, packed, spent = (), (), ()
+    answers = np.frombuffer("".join(packed).encode("ascii"), dtype=np.uint8).reshape(len(rows), q)
+    return Columns(
+        user_ids=np.array(user_ids, dtype=np.int64),
+        answers=answers,
+        spent=np.array(spent, dtype=np.int64),
+        problem_ids=problem_ids,
+        key=key,
+        subjects=subjects,
+    )
+
+
+# ---------- compute ----------
+
+def _ranks(scores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(rank, percentile) per column of `scores` (P,) or (P, S)."""
+    n = scores.shape[0]
+    ordered = np.sort(scores, axis=0)
+    if scores.ndim == 1:
+        at_or_below = np.searchsorted(ordered, scores, side="right")
+    else:
+        at_or_below = np.stack(
+            [np.searchsorted(ordered[:, j], scores[:, j], side="right") for j in range(scores.shape[1])], axis=1
+        )
+    return n - at_or_below + 1, 100.0 * at_or_below / max(n, 1)
+
+
+def _distribution(scores: np.ndarray) -> dict:
+    if not scores.size:
+        return {"mean": 0.0, "max": 0, "min": 0, "percentiles": {}}
+    return {
+        "mean": round(float(scores.mean()), 2),
+        "max": int(scores.max()),
+        "min": int(scores.min()),
+        "percentiles": {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(scores, PERCENTILES))},
+    }
+
+
+def compute(cols: Columns) -> tuple[dict, dict[str, np.ndarray]]:
+    """Contest-wide aggregates, and per-participant arrays (row i = cols.user_ids[i])."""
+    a, n_questions = cols.answers, len(cols.key)
+    attempted = a != UNANSWERED
+    correct = a == cols.key
+    wrong = attempted & ~correct
+
+    onehot = (cols.subjects[:, None] == np.arange(len(SUBJECTS))).astype(np.int32)  # (Q, S)
+    s_correct = correct.astype(np.int32) @ onehot                                   # (P, S)
+    s_wrong = wrong.astype(np.int32) @ onehot
+    s_total = onehot.sum(axis=0)                                                    # questions per subject
+    s_score = MARKS_CORRECT * s_correct + MARKS_WRONG * s_wrong
+    score = s_score.sum(axis=1)
+
+    rank, percentile = _ranks(score)
+    _, s_percentile = _ranks(s_score)
+
+    p = max(a.shape[0], 1)
+    option_counts = np.stack([(a == ord(o)).sum(axis=0) for o in OPTIONS], axis=1)  # (Q, 4)
+    correct_rate = correct.sum(axis=0) / p
+    attempt_rate = attempted.sum(axis=0) / p
+    counts, edges = np.histogram(score, bins=HISTOGRAM_BINS) if score.size else (np.array([]), np.array([]))
+
+    present = [j for j, n in enumerate(s_total.tolist()) if n]
+    contest = {
+        "participants": int(a.shape[0]),
+        "max_score": MARKS_CORRECT * n_questions,
+        "score": {
+            **_distribution(score),
+            "histogram": {"edges": [round(float(e), 2) for e in edges], "counts": counts.astype(int).tolist()},
+        },
+        "subjects": {
+            SUBJECTS[j]: {"questions": int(s_total[j]), "max_score": MARKS_CORRECT * int(s_total[j]),
+                          **_distribution(s_score[:, j])}
+            for j in present
+        },
+        "questions": [
+            {
+                "question_no": i + 1,
+                "problem_id": pid,
+                "subject": SUBJECTS[subj],
+                "correct_option": chr(k),
+                "correct_rate": round(cr, 4),
+                "attempt_rate": round(ar, 4),
+                "options": dict(zip(OPTIONS, oc)),
+            }
+            for i, (pid, subj, k, cr, ar, oc) in enumerate(zip(
+                cols.problem_ids, cols.subjects.tolist(), cols.key.tolist(),
+                correct_rate.tolist(), attempt_rate.tolist(), option_counts.tolist(),
+            ))
+        ],
+        "time_spent_seconds": _distribution(cols.spent),
+    }
+    per_user = {
+        "score": score, "rank": rank, "percentile": percentile,
+        "correct": correct.sum(axis=1), "wrong": wrong.sum(axis=1),
+        "s_score": s_score, "s_correct": s_correct, "s_wrong": s_wrong, "s_percentile": s_percentile,
+    }
+    return contest, per_user
+
+
+# ---------- encode / store ----------
+
+def _json(doc: dict) -> bytes:
+    return json.dumps(doc, separators=(",", ":")).encode()
+
+
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + b"\x00" * 8   # as in scripts/gen_dataset.py
+_COPY_ROW = struct.Struct("!hiiiii")                      # 3 fields: int4, int4, bytea length
+
+
+def _store(db: Session, rows: list[tuple[int, int, bytes]]):
+    """Insert (contest_id, user_id, blob) rows: binary COPY on Postgres (about
+    2.5x faster than batched INSERTs at 100k rows), executemany elsewhere."""
+    if db.get_bind().dialect.name != "postgresql":
+        db.execute(insert(ContestReport), [{"contest_id": c, "user_id": u, "blob": b} for c, u, b in rows])
+        return
+    buf = io.BytesIO()
+    buf.write(_COPY_HEADER)
+    for contest_id, user_id, blob in rows:
+        buf.write(_COPY_ROW.pack(3, 4, contest_id, 4, user_id, len(blob)))
+        buf.write(blob)
+    buf.write(b"\xff\xff")
+    buf.seek(0)
+    with db.connection().connection.cursor() as cur:
+        cur.copy_expert("COPY contest_reports (contest_id, user_id, blob) FROM STDIN WITH (FORMAT binary)", buf)
+
+
+def _user_docs(cols: Columns, per_user: dict[str, np.ndarray]):
+    n_questions = len(cols.key)
+    s_total = np.bincount(cols.subjects, minlength=len(SUBJECTS)).tolist()
+    present = [j for j, n in enumerate(s_total) if n]
+    # one .tolist() per column, then plain Python per participant
+    columns = {k: v.tolist() for k, v in per_user.items()}
+    packed = cols.answers.tobytes().decode("ascii")
+    for i, (uid, spent) in enumerate(zip(cols.user_ids.tolist(), cols.spent.tolist())):
+        c, w = columns["correct"][i], columns["wrong"][i]
+        yield uid, {
+            "user_id": uid,
+            "score": columns["score"][i],
+            "rank": columns["rank"][i],
+            "percentile": round(columns["percentile"][i], 2),
+            "correct": c,
+            "wrong": w,
+            "unattempted": n_questions - c - w,
+            "time_spent_seconds": spent,
+            "subjects": {
+                SUBJECTS[j]: {
+                    "score": columns["s_score"][i][j],
+                    "correct": columns["s_correct"][i][j],
+                    "wrong": columns["s_wrong"][i][j],
+                    "unattempted": s_total[j] - columns["s_correct"][i][j] - columns["s_wrong"][i][j],
+                    "percentile": round(columns["s_percentile"][i][j], 2),
+                }
+                for j in present
+            },
+            "answers": packed[i * n_questions:(i + 1) * n_questions],
+        }
+
+
+def build(db: Session, contest_id: int, title: str) -> dict:
+    """Compute and store every report document of a contest (replacing old ones).
+    The caller commits. Returns timings and the participant count."""
+    t0 = time.perf_counter()
+    cols = load(db, contest_id)
+    t1 = time.perf_counter()
+    contest, per_user = compute(cols)
+    t2 = time.perf_counter()
+    rows = [(contest_id, uid, _json(doc)) for uid, doc in _user_docs(cols, per_user)]
+    rows.append((contest_id, CONTEST_WIDE, gzip.compress(_json({"contest_id": contest_id, "title": title, **contest}))))
+    t3 = time.perf_counter()
+    db.execute(delete(ContestReport).where(ContestReport.contest_id == contest_id))
+    _store(db, rows)
+    t4 = time.perf_counter()
+    return {
+        "participants": len(cols.user_ids),
+        "seconds": {"load": round(t1 - t0, 3), "compute": round(t2 - t1, 3),
+                    "encode": round(t3 - t2, 3), "store": round(t4 - t3, 3)},
+    }
+
+
+# ---------- read ----------
+
+def _doc(db: Session, contest_id: int, user_id: int) -> dict | None:
+    blob = db.execute(
+        select(ContestReport.blob).where(ContestReport.contest_id == contest_id, ContestReport.user_id == user_id)
+    ).scalar_one_or_none()
+    if blob is None:
+        return None
+    return json.loads(gzip.decompress(blob) if user_id == CONTEST_WIDE else blob)
+
+
+def report(db: Session, contest_id: int, user_id: int | None) -> dict | None:
+    """Contest-wide report plus the caller's own part ("me", None if they did
+    not take part). None until the contest is closed."""
+    contest = report_cache.get_or_load(str(contest_id), lambda: _doc(db, contest_id, CONTEST_WIDE))
+    if contest is None:
+        report_cache.delete(str(contest_id))
+        return None
+    me = _doc(db, contest_id, user_id) if user_id else None
+    return {**contest, "me": me}
@@ -0,0 +1,131 @@
+# backend/services/contests.py
+"""
+Timed contests: a fixed list of problems, one submission per user while the
+contest window is open, and reports built once when an admin closes it
+(services/contest_report.py).
+
+close() locks the contest row; submit() takes it FOR SHARE, so a submission
+either commits before the reports are computed or sees the contest closed.
+Closing again rebuilds the reports (e.g. after an answer key was corrected).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import cache_bus
+from models import Contest, ContestQuestion, ContestSubmission, Problem
+from services import contest_report
+
+MAX_QUESTIONS = 500  # contest_submissions.answers is String(500)
+
+
+class ContestClosed(Exception):
+    """Submission outside the contest window (or after it was closed)."""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(ts: datetime) -> datetime:
+    # SQLite hands timestamps back naive
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _insert(db: Session):
+    return pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+# ---------- admin ----------
+
+def create(db: Session, title: str, starts_at: datetime, ends_at: datetime, problem_ids: list[int]) -> Contest:
+    if not problem_ids:
+        raise ValueError("A contest needs at least one problem")
+    if len(problem_ids) > MAX_QUESTIONS:
+        raise ValueError(f"At most {MAX_QUESTIONS} problems per contest")
+    if len(set(problem_ids)) != len(problem_ids):
+        raise ValueError("A problem appears more than once")
+    if ends_at <= starts_at:
+        raise ValueError("ends_at must be after starts_at")
+    subjects = dict(db.execute(
+        select(Problem.id, Problem.subject).where(Problem.id.in_(problem_ids), Problem.is_active)
+    ).all())
+    missing = [i for i in problem_ids if i not in subjects]
+    if missing:
+        raise ValueError(f"Unknown or inactive problems: {missing[:20]}")
+
+    contest = Contest(title=title, starts_at=starts_at, ends_at=ends_at, question_count=len(problem_ids))
+    db.add(contest)
+    db.flush()
+    db.add_all([
+        ContestQuestion(contest_id=contest.id, question_no=no, problem_id=pid, subject=subjects[pid])
+        for no, pid in enumerate(problem_ids, start=1)
+    ])
+    db.commit()
+    return contest
+
+
+def close(db: Session, contest_id: int) -> dict | None:
+    """Close the contest (if still open) and build its reports. None if unknown."""
+    contest = db.execute(select(Contest).where(Contest.id == contest_id).with_for_update()).scalar_one_or_none()
+    if contest is None:
+        return None
+    result = contest_report.build(db, contest.id, contest.title)
+    contest.closed_at = contest.closed_at or _now()
+    contest.participant_count = result["participants"]
+    cache_bus.notify(db, contest_report.report_cache.namespace, str(contest.id))
+    db.commit()
+    contest_report.report_cache.delete(str(contest.id))
+    return {"contest_id": contest.id, "closed_at": contest.closed_at, **result}
+
+
+# ---------- users ----------
+
+def started(contest: Contest) -> bool:
+    return _aware(contest.starts_at) <= _now()
+
+
+def list_contests(db: Session, limit: int = 50) -> list[Contest]:
+    return db.execute(select(Contest).order_by(Contest.starts_at.desc()).limit(limit)).scalars().all()
+
+
+def questions(db: Session, contest_id: int) -> list[Problem]:
+    return db.execute(
+        select(Problem)
+        .join(ContestQuestion, ContestQuestion.problem_id == Problem.id)
+        .where(ContestQuestion.contest_id == contest_id)
+        .order_by(ContestQuestion.question_no)
+    ).scalars().all()
+
+
+def submit(db: Session, contest_id: int, user_id: int, answers: dict[int, str], time_spent_seconds: int) -> bool:
+    """Store (or replace) the user's answers. False if the contest does not exist."""
+    contest = db.execute(select(Contest).where(Contest.id == contest_id).with_for_update(read=True)).scalar_one_or_none()
+    if contest is None:
+        return False
+    now = _now()
+    if contest.closed_at is not None or not (_aware(contest.starts_at) <= now < _aware(contest.ends_at)):
+        db.rollback()
+        raise ContestClosed()
+    bad = [no for no in answers if not 1 <= no <= contest.question_count]
+    if bad:
+        db.rollback()
+        raise ValueError(f"No such question numbers: {sorted(bad)[:20]}")
+
+    packed = contest_report.pack_answers(answers, contest.question_count)
+    ins = _insert(db)(ContestSubmission).values(
+        contest_id=contest_id, user_id=user_id, answers=packed,
+        time_spent_seconds=time_spent_seconds, submitted_at=now,
+    )
+    db.execute(ins.on_conflict_do_update(
+        index_elements=["contest_id", "user_id"],
+        set_={"answers": ins.excluded.answers, "time_spent_seconds": ins.excluded.time_spent_seconds,
+              "submitted_at": ins.excluded.submitted_at},
+    ))
+    db.commit()
+    return True
@@ -3,15 +3,31 @@ from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 from datetime import date
 
+import cache_bus
+from cache import Cache
 # ✅ Align names with models.py
-from models import Problem as Question, DailyRollout, UserAnswer, ProblemLike
+from models import Problem as Question, DailyRollout, UserAnswer
+from services.answer_partitions import archived_totals
+from services.like_buffer import like_buffer
+from services.tex_render import QUESTION_FIELDS, rendered_views
+from services.user_state import user_state
+from tasks import post_commit_hook
+
+# (subject, date) -> public problem payload; changes once a day, or when a
+# rollout is re-pointed or its problem edited: the stamp follows all three
+daily_cache = Cache("daily", default_ttl=600, snapshot_stamp=(
+    "SELECT (SELECT count(*) || ':' || coalesce(CAST(max(updated_at) AS TEXT), '') FROM daily_rollouts)"
+    " || ':' || (SELECT coalesce(CAST(max(updated_at) AS TEXT), '') FROM problems)"
+))
+# problem_id -> [attempted, solved]; short TTL, dropped on submit
+stats_cache = Cache("stats", default_ttl=2)
 
 
 def _pick_next_question(db: Session, subject: str) -> Question | None:
     last = (
         db.query(DailyRollout)
         .filter(DailyRollout.subject == subject)
-        .order_by(DailyRollout.date.desc(), DailyRollout.id.desc())
+        .order_by(DailyRollout.date.desc())  # (date, subject) is unique: no tiebreak needed
         .first()
     )
 
@@ -45,6 +61,8 @@ def get_or_create_daily_rollout(db: Session, subject: str, today: date) -> Quest
 
     rollout = DailyRollout(subject=subject, date=today, problem_id=q.id)
     db.add(rollout)
+    # other workers' offline bundles were built without this rollout
+    cache_bus.notify(db, "bundle")
     try:
         db.commit()
     except IntegrityError:
@@ -59,7 +77,50 @@ def get_or_create_daily_rollout(db: Session, subject: str, today: date) -> Quest
     return q
 
 
-def compute_stats(db: Session, problem_id: int) -> tuple[int, int, int, float]:
+def problem_payload(q: Question) -> dict:
+    """Public, user-independent fields of a problem (safe to cache and share)."""
+    return {
+        "id": q.id,
+        "subject": getattr(q.subject, "value", q.subject),
+        "topic": q.topic,
+        "chapter": q.chapter,
+        "difficulty": getattr(q.difficulty, "value", q.difficulty),
+        "question_tex": q.question_tex,
+        "options": {
+            "A": q.option_a_tex,
+            "B": q.option_b_tex,
+            "C": q.option_c_tex,
+            "D": q.option_d_tex,
+        },
+    }
+
+
+def rendered_payload(view: dict) -> dict:
+    """Shape a tex_render view like the TeX fields of the payload."""
+    return {
+        "question": view.get("question_tex"),
+        "options": {
+            "A": view.get("option_a_tex"),
+            "B": view.get("option_b_tex"),
+            "C": view.get("option_c_tex"),
+            "D": view.get("option_d_tex"),
+        },
+        **({"hint": view["hint_tex"]} if "hint_tex" in view else {}),
+        **({"solution": view["solution_tex"]} if "solution_tex" in view else {}),
+    }
+
+
+def get_daily_problem(db: Session, subject: str, today: date) -> dict | None:
+    def load():
+        q = get_or_create_daily_rollout(db, subject, today)
+        if not q:
+            return None
+        view = rendered_views(db, [q], QUESTION_FIELDS)[q.id]
+        return {**problem_payload(q), "rendered": rendered_payload(view)}
+    return daily_cache.get_or_load(f"{subject}:{today.isoformat()}", load)
+
+
+def _count_answers(db: Session, problem_id: int) -> list[int]:
     attempted = db.query(func.count(UserAnswer.id)).filter(
         UserAnswer.problem_id == problem_id
     ).scalar() or 0
@@ -69,9 +130,35 @@ def compute_stats(db: Session, problem_id: int) -> tuple[int, int, int, float]:
         UserAnswer.is_correct.is_(True)
     ).scalar() or 0
 
-    likes = db.query(func.count(ProblemLike.id)).filter(
-        ProblemLike.problem_id == problem_id
-    ).scalar() or 0
+    # answers from archived (detached) monthly partitions
+    old_attempted, old_solved = archived_totals(db, [problem_id]).get(problem_id, (0, 0))
+    return [attempted + old_attempted, solved + old_solved]
+
+
+def invalidate_stats(problem_id: int):
+    stats_cache.delete(str(problem_id))
+
+
+def stats_after_answer(db: Session, problem_id: int, is_correct: bool) -> tuple[int, int, int, float]:
+    """compute_stats() right after an answer was committed, without a recount
+    when the totals are cached: cached + this answer. The answer-recorded hook
+    recounts right after the response."""
+    key = str(problem_id)
+    cached = stats_cache.get(key, None)
+    if cached is not None:
+        stats_cache.set(key, [cached[0] + 1, cached[1] + int(is_correct)])
+    return compute_stats(db, problem_id)
+
+
+@post_commit_hook("answer-recorded")
+def _recount_stats(db: Session, problem_id: int, **_):
+    stats_cache.set(str(problem_id), _count_answers(db, problem_id))
+
+
+def compute_stats(db: Session, problem_id: int) -> tuple[int, int, int, float]:
+    attempted, solved = stats_cache.get_or_load(str(problem_id), lambda: _count_answers(db, problem_id))
+
+    likes = like_buffer.count(db, problem_id)  # includes taps not flushed yet
 
     accuracy = float(solved) / float(attempted) if attempted else 0.0
     return attempted, solved, likes, accuracy
@@ -80,7 +167,4 @@ def compute_stats(db: Session, problem_id: int) -> tuple[int, int, int, float]:
 def has_liked(db: Session, problem_id: int, user_id: int | None) -> bool:
     if not user_id:
         return False
-    return db.query(ProblemLike.id).filter(
-        ProblemLike.problem_id == problem_id,
-        ProblemLike.user_id == user_id
-    ).first() is not None
+    return user_state.has_liked(db, user_id, problem_id)
@@ -0,0 +1,291 @@
+# backend/services/like_buffer.py
+"""
+Write-behind buffer for like toggles.
+
+Users spam the heart button, and each tap used to cost a SELECT, an
+INSERT/DELETE, a COMMIT and a COUNT. This buffer keeps the net desired
+state per (user_id, problem_id) in memory and a background thread
+flushes it in bulk every FLUSH_INTERVAL seconds. Toggling twice inside
+one window cancels out and costs no DB write at all.
+
+Reads (`is_liked`, `count`) overlay the pending state on top of what is
+in the DB, so a user always sees their own latest tap.
+
+With several workers another one may have flushed this user's taps, so the
+known DB state is only trusted for STATE_TTL seconds; past that, toggle()
+re-reads the row before flipping it. A tap on a recently seen row costs no
+query at all.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from lifecycle import on_shutdown, on_startup
+from metrics import register_cache
+from models import ProblemLike
+
+log = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = float(os.getenv("LIKE_FLUSH_INTERVAL", "0.3"))  # seconds
+COUNT_TTL = float(os.getenv("LIKE_COUNT_TTL", "10"))             # resync counts written by other workers
+STATE_TTL = float(os.getenv("LIKE_STATE_TTL", "10"))             # resync states written by other workers
+MAX_KNOWN_STATES = int(os.getenv("LIKE_MAX_KNOWN_STATES", "100000"))
+
+Key = tuple[int, int]  # (user_id, problem_id)
+
+
+class LikeBuffer:
+    def __init__(self, session_factory: Callable[[], Session], flush_interval: float = FLUSH_INTERVAL):
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        # what the DB holds (as far as this process knows) and when that was
+        # learned (monotonic), LRU-bounded
+        self._db_state: "OrderedDict[Key, tuple[bool, float]]" = OrderedDict()
+        # batch currently being written by flush()
+        self._inflight: dict[Key, bool] = {}
+        # desired states that differ from what the DB will hold once
+        # _inflight lands; not flushed yet
+        self._pending: dict[Key, bool] = {}
+        # problem_id -> (flushed like count, loaded_at)
+        self._counts: dict[int, tuple[int, float]] = {}
+        # bumped when a batch lands: a count read that overlapped it is not cached
+        self._flush_gen = 0
+        # called as fn(db, user_ids) once a batch has committed; db is committed after them
+        self._flush_hooks: list[Callable[[Session, set[int]], None]] = []
+
+        # cache effectiveness, exported by metrics.py
+        self.state_hits = self.state_misses = 0
+        self.count_hits = self.count_misses = 0
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ---------- reads ----------
+
+    def _db_liked(self, db: Session, key: Key) -> bool:
+        started = time.monotonic()
+        with self._lock:
+            known = self._db_state.get(key)
+            if known and started - known[1] < STATE_TTL:
+                self.state_hits += 1
+                self._db_state.move_to_end(key)
+                return known[0]
+            self.state_misses += 1
+
+        user_id, problem_id = key
+        liked = db.execute(
+            select(ProblemLike.id).where(
+                ProblemLike.user_id == user_id,
+                ProblemLike.problem_id == problem_id,
+            ).limit(1)
+        ).first() is not None
+
+        with self._lock:
+            known = self._db_state.get(key)
+            if known and known[1] >= started:
+                return known[0]  # a flush landed meanwhile; it knows better than our read
+            self._db_state[key] = (liked, time.monotonic())
+            self._db_state.move_to_end(key)
+            self._trim()
+            return liked
+
+    def is_liked(self, db: Session, user_id: int, problem_id: int) -> bool:
+        key = (user_id, problem_id)
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            if key in self._inflight:
+                return self._inflight[key]
+        return self._db_liked(db, key)
+
+    def buffered_for(self, user_id: int) -> dict[int, bool]:
+        """problem_id -> liked for this user's toggles that are not in the DB yet."""
+        with self._lock:
+            out = {pid: liked for (uid, pid), liked in self._inflight.items() if uid == user_id}
+            out.update((pid, liked) for (uid, pid), liked in self._pending.items() if uid == user_id)
+            return out
+
+    def _pending_deltas(self) -> dict[int, int]:
+        # caller holds self._lock; every buffered entry is a flip of the state below it
+        deltas: dict[int, int] = {}
+        for buf in (self._inflight, self._pending):
+            for (_, pid), liked in buf.items():
+                deltas[pid] = deltas.get(pid, 0) + (1 if liked else -1)
+        return deltas
+
+    def count(self, db: Session, problem_id: int) -> int:
+        return self.counts(db, (problem_id,))[problem_id]
+
+    def counts(self, db: Session, problem_ids) -> dict[int, int]:
+        """problem_id -> like count: cached ones, plus one GROUP BY for the rest."""
+        now = time.monotonic()
+        out: dict[int, int] = {}
+        missing: list[int] = []
+        with self._lock:
+            deltas = self._pending_deltas()
+            for pid in problem_ids:
+                cached = self._counts.get(pid)
+                if cached and now - cached[1] < COUNT_TTL:
+                    self.count_hits += 1
+                    out[pid] = max(cached[0] + deltas.get(pid, 0), 0)
+                else:
+                    self.count_misses += 1
+                    missing.append(pid)
+            gen = self._flush_gen
+        if not missing:
+            return out
+
+        flushed = dict(db.execute(
+            select(ProblemLike.problem_id, func.count(ProblemLike.id))
+            .where(ProblemLike.problem_id.in_(missing))
+            .group_by(ProblemLike.problem_id)
+        ).all())
+
+        with self._lock:
+            deltas = self._pending_deltas()
+            for pid in missing:
+                n = flushed.get(pid, 0)
+                if self._flush_gen == gen:
+                    self._counts[pid] = (n, now)
+                out[pid] = max(n + deltas.get(pid, 0), 0)
+        return out
+
+    # ---------- writes ----------
+
+    def toggle(self, db: Session, user_id: int, problem_id: int) -> bool:
+        """Flip the user's like and return the new state. No DB write happens here."""
+        key = (user_id, problem_id)
+        in_db = self._db_liked(db, key)
+        with self._lock:
+            base = self._inflight.get(key, self._db_state.get(key, (in_db, 0.0))[0])
+            new_state = not self._pending.get(key, base)
+            if new_state == base:
+                self._pending.pop(key, None)  # toggled back: nothing to write
+            else:
+                self._pending[key] = new_state
+        return new_state
+
+    def flush(self) -> int:
+        """Write the net pending state in one transaction. Returns rows touched."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+
+            to_add = [k for k, liked in batch.items() if liked]
+            to_remove = [k for k, liked in batch.items() if not liked]
+
+            db = self._session_factory()
+            try:
+                if to_add:
+                    rows = [{"user_id": u, "problem_id": p} for u, p in to_add]
+                    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+                    db.execute(insert(ProblemLike).values(rows).on_conflict_do_nothing())
+                if to_remove:
+                    db.execute(
+                        delete(ProblemLike).where(
+                            tuple_(ProblemLike.user_id, ProblemLike.problem_id).in_(to_remove)
+                        )
+                    )
+                db.commit()
+            except Exception:
+                db.rollback()
+                log.exception("like flush failed; re-queueing %d toggles", len(batch))
+                with self._lock:
+                    self._inflight = {}
+                    for k, liked in batch.items():
+                        if k in self._pending:
+                            self._pending.pop(k)  # tapped back meanwhile: net zero
+                        else:
+                            self._pending[k] = liked
+                return 0
+            finally:
+                db.close()
+
+            # while the hooks run, readers still see the batch through _inflight
+            self._after_flush({u for u, _ in batch})
+            with self._lock:
+                self._inflight = {}
+                self._flush_gen += 1
+                flushed_at = time.monotonic()
+                for (u, p), liked in batch.items():
+                    self._db_state[(u, p)] = (liked, flushed_at)
+                    self._db_state.move_to_end((u, p))
+                    # a cached count may or may not include this batch: re-read it
+                    self._counts.pop(p, None)
+                self._trim()
+            return len(batch)
+
+    def on_flush(self, fn: Callable[[Session, set[int]], None]):
+        self._flush_hooks.append(fn)
+
+    def _after_flush(self, user_ids: set[int]):
+        if not self._flush_hooks:
+            return
+        db = self._session_factory()
+        try:
+            for fn in self._flush_hooks:
+                fn(db, user_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            log.exception("like flush hook failed")
+        finally:
+            db.close()
+
+    def _trim(self):
+        # caller holds self._lock
+        while len(self._db_state) > MAX_KNOWN_STATES:
+            self._db_state.popitem(last=False)
+
+    # ---------- lifecycle ----------
+
+    def _run(self):
+        while not self._stop.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                log.exception("like flusher crashed; continuing")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="like-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()  # drain whatever is left
+
+
+def _new_session() -> Session:
+    from database import SessionLocal
+    return SessionLocal()
+
+
+like_buffer = LikeBuffer(_new_session)
+
+on_startup("like-flusher")(like_buffer.start)
+on_shutdown("like-flusher")(like_buffer.stop)  # drain pending likes before the worker exits
+
+register_cache("like_state", lambda: (like_buffer.state_hits, like_buffer.state_misses))
+register_cache("like_count", lambda: (like_buffer.count_hits, like_buffer.count_misses))
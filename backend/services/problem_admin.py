@@ -0,0 +1,236 @@
+# backend/services/problem_admin.py
+"""
+Admin batch edits of `problems`: create, patch and deactivate many rows in
+one request (e.g. correcting 5,000 answer keys is one call, not 5,000).
+
+Each batch is one transaction around one set-based statement:
+
+    create      INSERT ... VALUES (...), (...) RETURNING id, updated_at
+    patch       WITH v(id, expected, <fields>) AS (VALUES ...)
+                UPDATE problems SET <field> = v.<field>, updated_at = now() FROM v
+                WHERE problems.id = v.id AND problems.updated_at = v.expected
+                RETURNING problems.id, problems.updated_at
+    deactivate  the same UPDATE with is_active = false
+
+`updated_at` is the optimistic-concurrency token: every patch names the
+version it was made against, and rows edited since (or missing) come back as
+conflicts. Atomic batches (the default) roll back on any conflict; the rest
+apply what matched and report the conflicts.
+
+Follow-up work stays in the same transaction and is set-based too: answers
+to problems whose key changed are re-graded (answers in archived partitions
+keep their grade), PYQ filter copies are re-synced, and the chapter stats
+rollup moves the edited problems' answers to their new chapter, topic or
+grade. Only what the edited rows feed is dropped, in this worker after
+commit and in the others through cache_bus.py: the daily payloads of
+rollouts that show them, the bundle if one of those rollouts is in its
+window and the stats counters of re-graded problems. The TeX pre-render is
+queued for changed fields.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import Boolean, DateTime, Integer, case, cast, column, func, insert, select, update, values
+from sqlalchemy.orm import Session
+
+import cache_bus
+from cache import Cache
+from models import DailyRollout, Problem, UserAnswer
+from services import chapter_stats, pyq
+from services.bundle import MAX_DAYS, bundle_cache
+from services.daily import daily_cache, stats_cache
+from services.tex_render import FIELDS as TEX_FIELDS, rerender_after_commit
+
+MAX_BATCH = 10_000
+
+PATCHABLE = (
+    "subject", "topic", "chapter", "difficulty",
+    "question_tex", "option_a_tex", "option_b_tex", "option_c_tex", "option_d_tex",
+    "correct_option", "hint_tex", "solution_tex", "is_active",
+)
+NULLABLE = {"hint_tex", "solution_tex"}
+PYQ_COPIED = {"subject", "chapter", "difficulty"}
+STATS_KEYED = {"subject", "chapter", "topic", "correct_option"}
+
+
+def _stamp(db: Session):
+    """The new `updated_at`: the DB's now(), the clock of every other writer
+    (server defaults) and of the refresh watermarks. SQLite (benchmarks) gets
+    a Python timestamp: CURRENT_TIMESTAMP has whole seconds only, too coarse
+    for a concurrency token."""
+    if db.get_bind().dialect.name == "sqlite":
+        return datetime.now(timezone.utc)
+    return func.now()
+
+
+def _check_size(items: list) -> None:
+    if not items:
+        raise ValueError("Empty batch")
+    if len(items) > MAX_BATCH:
+        raise ValueError(f"At most {MAX_BATCH} problems per batch")
+
+
+# ---------- reads ----------
+
+def list_problems(db: Session, ids: list[int] | None = None, subject: str | None = None,
+                  chapter: str | None = None, after_id: int = 0, limit: int = 100) -> list[Problem]:
+    """Admin listing with the `updated_at` versions that patches must quote (keyset on id)."""
+    q = select(Problem).where(Problem.id > after_id)
+    if ids:
+        q = q.where(Problem.id.in_(ids))
+    if subject:
+        q = q.where(Problem.subject == subject)
+    if chapter:
+        q = q.where(Problem.chapter == chapter)
+    return db.execute(q.order_by(Problem.id).limit(limit)).scalars().all()
+
+
+# ---------- writes ----------
+
+def create_batch(db: Session, items: list[dict]) -> dict:
+    _check_size(items)
+    stamp = _stamp(db)
+    rows = db.execute(
+        insert(Problem)
+        .values(created_at=stamp, updated_at=stamp)
+        .returning(Problem.id, Problem.updated_at, sort_by_parameter_order=True),
+        items,
+    ).all()
+    rerender_after_commit(db, [r.id for r in rows])
+    db.commit()
+    return {"applied": [{"id": r.id, "updated_at": r.updated_at} for r in rows], "conflicts": []}
+
+
+def deactivate_batch(db: Session, versions: list[dict], atomic: bool = True) -> dict:
+    return patch_batch(db, [{**v, "is_active": False} for v in versions], atomic)
+
+
+def patch_batch(db: Session, patches: list[dict], atomic: bool = True) -> dict:
+    """Apply `patches` ({"id", "updated_at", <field>: value, ...}) as one UPDATE.
+
+    Returns {"applied": [{id, updated_at}], "conflicts": [{id, current_updated_at}]};
+    with atomic=True nothing is applied when there are conflicts.
+    """
+    _check_size(patches)
+    ids = [p["id"] for p in patches]
+    if len(set(ids)) != len(ids):
+        raise ValueError("A problem appears more than once in the batch")
+
+    fields = [f for f in PATCHABLE if any(f in p for p in patches)]
+    if not fields:
+        raise ValueError("Nothing to change")
+    for p in patches:
+        for f in fields:
+            if p.get(f, "") is None and f not in NULLABLE:
+                raise ValueError(f"{f} cannot be null (problem {p['id']})")
+
+    # answers counted in the chapter rollup move with their problem / new grade
+    regroup = STATS_KEYED.intersection(fields)
+    if regroup:
+        chapter_stats.retract(db, set(ids))
+
+    v = _patch_values(patches, fields)
+    assignments = {"updated_at": _stamp(db)}
+    for f in fields:
+        new = cast(v.c[f], Problem.__table__.c[f].type)
+        flag = v.c.get(f"set_{f}")
+        assignments[f] = new if flag is None else case((flag, new), else_=getattr(Problem, f))
+
+    rows = db.execute(
+        update(Problem)
+        .where(Problem.id == v.c.id, Problem.updated_at == v.c.expected)
+        .values(assignments)
+        .returning(Problem.id, Problem.updated_at)
+    ).all()
+    applied = {r.id for r in rows}
+
+    conflicts = []
+    if len(applied) < len(ids):
+        stale = [i for i in ids if i not in applied]
+        current = dict(db.execute(select(Problem.id, Problem.updated_at).where(Problem.id.in_(stale))).all())
+        conflicts = [{"id": i, "current_updated_at": current.get(i)} for i in stale]
+        if atomic:
+            db.rollback()
+            return {"applied": [], "conflicts": conflicts}
+
+    if not applied:
+        db.rollback()
+        return {"applied": [], "conflicts": conflicts}
+
+    regraded = set()
+    if "correct_option" in fields:
+        regraded = {p["id"] for p in patches if p["id"] in applied and "correct_option" in p}
+        _regrade(db, regraded)
+    if regroup:
+        chapter_stats.restore(db, set(ids))
+    if PYQ_COPIED.intersection(fields):
+        pyq.sync_problem_copies(db, applied)
+    if TEX_FIELDS.keys() & set(fields):
+        rerender_after_commit(db, applied)
+    rollouts = db.execute(
+        select(DailyRollout.subject, DailyRollout.date).where(DailyRollout.problem_id.in_(applied))
+    ).all()
+    stale = _stale(rollouts, regraded)
+    for c, keys in stale:
+        cache_bus.notify(db, c.namespace, *keys)  # other workers evict on commit
+
+    db.commit()
+    for c, keys in stale:
+        if keys:
+            c.delete(*keys)
+        else:
+            c.clear()
+    return {"applied": [{"id": r.id, "updated_at": r.updated_at} for r in rows], "conflicts": conflicts}
+
+
+def _patch_values(patches: list[dict], fields: list[str]):
+    """VALUES rows (id, expected, <field>[, set_<field>]...): a set_<field> flag
+    only for fields some patches leave alone, so they keep their current value."""
+    cols = [column("id", Integer), column("expected", DateTime(timezone=True))]
+    partial = [f for f in fields if not all(f in p for p in patches)]
+    for f in fields:
+        cols.append(column(f, Problem.__table__.c[f].type))
+        if f in partial:
+            cols.append(column(f"set_{f}", Boolean))
+
+    def row(p: dict) -> tuple:
+        out = [p["id"], p["updated_at"]]
+        for f in fields:
+            out.append(p.get(f))
+            if f in partial:
+                out.append(f in p)
+        return tuple(out)
+
+    return values(*cols, name="v").data([row(p) for p in patches]).cte("v")
+
+
+def _regrade(db: Session, problem_ids: set[int]):
+    """Re-grade live answers against the new keys; only rows whose grade flips are written."""
+    if not problem_ids:
+        return
+    graded = UserAnswer.chosen_option == Problem.correct_option
+    db.execute(
+        update(UserAnswer)
+        .where(
+            UserAnswer.problem_id == Problem.id,
+            Problem.id.in_(problem_ids),
+            UserAnswer.is_correct.is_distinct_from(graded),
+        )
+        .values(is_correct=graded)
+    )
+
+
+def _stale(rollouts: Iterable[tuple[str, date]], regraded: set[int]) -> list[tuple[Cache, list[str]]]:
+    """(cache, keys) the edited rows feed; no keys means the whole cache."""
+    rollouts = list(rollouts)
+    out = []
+    if rollouts:
+        out.append((daily_cache, [f"{subject}:{d.isoformat()}" for subject, d in rollouts]))
+        today = date.today()
+        if any(abs((d - today).days) <= MAX_DAYS for _, d in rollouts):
+            out.append((bundle_cache, []))
+    if regraded:
+        out.append((stats_cache, [str(i) for i in regraded]))
+    return out
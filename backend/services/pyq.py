@@ -0,0 +1,346 @@
+# backend/services/pyq.py
+"""
+Previous-year questions (PYQ): papers, per-paper question mapping, import and
+paper stats.
+
+PYQ questions are ordinary `problems` rows (so hints, solutions, TeX
+pre-rendering, likes and /questions/{id}/submit all work on them), mapped
+into papers by `pyq_questions`. The mapping rows carry copies of the filter
+columns (exam, year, date, shift, subject, chapter, difficulty), so a chapter
+or year listing is one query on one composite index:
+
+    ix_pyq_questions_chapter (subject, chapter, exam, exam_date)
+    ix_pyq_questions_year    (year, shift, subject)
+
+`pyq_chapter_counts` holds the per-chapter Mains/Advanced totals for the
+chapter grid, refreshed for the touched chapters on every import.
+
+Paper stats are running totals on `pyq_papers` (attempt_count, score_sum),
+bumped with an atomic UPDATE in the attempt's own transaction; the average
+score is score_sum / attempt_count, never a scan of pyq_attempts.
+"""
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from models import (
+    DifficultyEnum, ExamEnum, Problem, PyqAttempt, PyqChapterCount, PyqPaper, PyqQuestion, SubjectEnum, UserAnswer,
+)
+
+MARKS_CORRECT = 4
+MARKS_WRONG = -1
+
+# frontend routes use full subject names (/pyq/mathematics/...)
+SUBJECT_ALIASES = {"mathematics": "math", "maths": "math", "math": "math", "physics": "physics", "chemistry": "chemistry"}
+
+REQUIRED = (
+    "exam", "exam_date", "shift", "question_no", "subject", "chapter", "difficulty",
+    "question_tex", "option_a_tex", "option_b_tex", "option_c_tex", "option_d_tex", "correct_option",
+)
+
+
+def subject_of(name: str) -> SubjectEnum:
+    return SubjectEnum(SUBJECT_ALIASES[name.lower()])
+
+
+def chapter_slug(name: str) -> str:
+    # same as PYQPage.tsx: lower, spaces -> '-', '&' -> 'and'
+    return re.sub(r"\s+", "-", name.lower()).replace("&", "and")
+
+
+def _paper_title(exam: ExamEnum, d: date, shift: int) -> str:
+    name = "JEE Main" if exam is ExamEnum.mains else "JEE Advanced"
+    return f"{name} {d:%d %b %Y} Shift {shift}"
+
+
+# ---------- import ----------
+
+def import_rows(db: Session, rows: Iterable[dict]) -> dict:
+    """Bulk import PYQ rows (one per question; see REQUIRED). Idempotent per
+    (paper, question_no): rows already imported are skipped. Commits once."""
+    by_paper: dict[tuple, list[dict]] = defaultdict(list)
+    for i, r in enumerate(rows, 1):
+        missing = [k for k in REQUIRED if not str(r.get(k) or "").strip()]
+        if missing:
+            raise ValueError(f"row {i}: missing {', '.join(missing)}")
+        exam = ExamEnum(r["exam"].strip().lower())
+        d = date.fromisoformat(str(r["exam_date"]).strip())
+        by_paper[(exam, d, int(r["shift"]))].append(r)
+
+    if not by_paper:
+        return {"papers": 0, "questions": 0, "skipped": 0, "problem_ids": []}
+
+    # papers: find existing, create the rest
+    keys = list(by_paper)
+    papers = {
+        (p.exam, p.exam_date, p.shift): p.id
+        for p in db.execute(
+            select(PyqPaper).where(tuple_(PyqPaper.exam, PyqPaper.exam_date, PyqPaper.shift).in_(keys))
+        ).scalars()
+    }
+    new_papers = [k for k in keys if k not in papers]
+    if new_papers:
+        ids = db.execute(
+            insert(PyqPaper).returning(PyqPaper.id, sort_by_parameter_order=True),
+            [{"exam": e, "year": d.year, "exam_date": d, "shift": s, "title": _paper_title(e, d, s),
+              "question_count": 0, "max_score": 0, "attempt_count": 0, "score_sum": 0}
+             for e, d, s in new_papers],
+        ).scalars().all()
+        papers.update(zip(new_papers, ids))
+
+    # skip question numbers that are already in
+    have = set(db.execute(
+        select(PyqQuestion.paper_id, PyqQuestion.question_no).where(PyqQuestion.paper_id.in_(papers.values()))
+    ).all())
+
+    todo = []
+    for key, prow in by_paper.items():
+        for r in prow:
+            if (papers[key], int(r["question_no"])) not in have:
+                todo.append((key, r))
+    skipped = sum(len(v) for v in by_paper.values()) - len(todo)
+
+    if todo:
+        problem_ids = db.execute(
+            insert(Problem).returning(Problem.id, sort_by_parameter_order=True),
+            [{
+                "subject": subject_of(r["subject"]),
+                "topic": (r.get("topic") or r["chapter"]).strip(),
+                "chapter": r["chapter"].strip(),
+                "difficulty": DifficultyEnum(r["difficulty"].strip().lower()),
+                "question_tex": r["question_tex"],
+                "option_a_tex": r["option_a_tex"],
+                "option_b_tex": r["option_b_tex"],
+                "option_c_tex": r["option_c_tex"],
+                "option_d_tex": r["option_d_tex"],
+                "correct_option": r["correct_option"].strip().upper(),
+                "hint_tex": r.get("hint_tex") or None,
+                "solution_tex": r.get("solution_tex") or None,
+                "attempt_count": 0,
+                "solve_count": 0,
+            } for _, r in todo],
+        ).scalars().all()
+
+        db.execute(insert(PyqQuestion), [{
+            "paper_id": papers[(exam, d, shift)],
+            "problem_id": pid,
+            "question_no": int(r["question_no"]),
+            "exam": exam, "year": d.year, "exam_date": d, "shift": shift,
+            "subject": subject_of(r["subject"]),
+            "chapter": r["chapter"].strip(),
+            "difficulty": DifficultyEnum(r["difficulty"].strip().lower()),
+        } for ((exam, d, shift), r), pid in zip(todo, problem_ids)])
+
+        touched_papers = {papers[k] for k, _ in todo}
+        _refresh_paper_sizes(db, touched_papers)
+        _refresh_chapter_counts(db, {(subject_of(r["subject"]), r["chapter"].strip()) for _, r in todo})
+    else:
+        problem_ids = []
+
+    db.commit()
+    return {"papers": len(new_papers), "questions": len(todo), "skipped": skipped, "problem_ids": list(problem_ids)}
+
+
+def _refresh_paper_sizes(db: Session, paper_ids: set[int]):
+    n = (
+        select(func.count(PyqQuestion.id))
+        .where(PyqQuestion.paper_id == PyqPaper.id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(PyqPaper)
+        .where(PyqPaper.id.in_(paper_ids))
+        .values(question_count=n, max_score=n * MARKS_CORRECT)
+    )
+
+
+def _refresh_chapter_counts(db: Session, chapters: set[tuple[SubjectEnum, str]]):
+    keys = list(chapters)
+    db.execute(delete(PyqChapterCount).where(tuple_(PyqChapterCount.subject, PyqChapterCount.chapter).in_(keys)))
+    db.execute(insert(PyqChapterCount).from_select(
+        ["subject", "chapter", "exam", "question_count"],
+        select(PyqQuestion.subject, PyqQuestion.chapter, PyqQuestion.exam, func.count(PyqQuestion.id))
+        .where(tuple_(PyqQuestion.subject, PyqQuestion.chapter).in_(keys))
+        .group_by(PyqQuestion.subject, PyqQuestion.chapter, PyqQuestion.exam),
+    ))
+
+
+def sync_problem_copies(db: Session, problem_ids: set[int]):
+    """Re-copy subject/chapter/difficulty after those columns changed on
+    `problems` (admin edits), then refresh the old and new chapters' counts."""
+    def chapters():
+        return set(db.execute(
+            select(PyqQuestion.subject, PyqQuestion.chapter)
+            .where(PyqQuestion.problem_id.in_(problem_ids))
+            .distinct()
+        ).all())
+
+    before = chapters()
+    if not before:
+        return
+    db.execute(
+        update(PyqQuestion)
+        .where(PyqQuestion.problem_id == Problem.id, Problem.id.in_(problem_ids))
+        .values(subject=Problem.subject, chapter=Problem.chapter, difficulty=Problem.difficulty)
+    )
+    _refresh_chapter_counts(db, before | chapters())
+
+
+# ---------- reads ----------
+
+def chapter_grid(db: Session, subject: SubjectEnum) -> list[dict]:
+    grid: dict[str, dict] = {}
+    for chapter, exam, n in db.execute(
+        select(PyqChapterCount.chapter, PyqChapterCount.exam, PyqChapterCount.question_count)
+        .where(PyqChapterCount.subject == subject)
+        .order_by(PyqChapterCount.chapter)
+    ):
+        row = grid.setdefault(chapter, {"chapter": chapter, "slug": chapter_slug(chapter), "mains": 0, "advanced": 0})
+        row[exam.value] = n
+    for row in grid.values():
+        row["total"] = row["mains"] + row["advanced"]
+    return list(grid.values())
+
+
+def resolve_chapter(db: Session, subject: SubjectEnum, slug_or_name: str) -> str | None:
+    want = chapter_slug(slug_or_name)
+    for (chapter,) in db.execute(
+        select(PyqChapterCount.chapter).where(PyqChapterCount.subject == subject).distinct()
+    ):
+        if chapter_slug(chapter) == want:
+            return chapter
+    return None
+
+
+def _question_rows(db: Session, where, order_by, limit: int, offset: int) -> list[dict]:
+    q = (
+        select(
+            PyqQuestion.problem_id, PyqQuestion.paper_id, PyqQuestion.question_no, PyqQuestion.exam,
+            PyqQuestion.exam_date, PyqQuestion.shift, PyqQuestion.difficulty, Problem.question_tex,
+        )
+        .join(Problem, Problem.id == PyqQuestion.problem_id)
+        .where(*where)
+        .order_by(*order_by)
+        .limit(limit)
+        .offset(offset)
+    )
+    return [
+        {
+            "problem_id": r.problem_id,
+            "paper_id": r.paper_id,
+            "question_no": r.question_no,
+            "exam": r.exam.value,
+            "date": r.exam_date,
+            "shift": r.shift,
+            "difficulty": r.difficulty.value,
+            "preview": r.question_tex[:200],
+        }
+        for r in db.execute(q)
+    ]
+
+
+def chapter_questions(db: Session, subject: SubjectEnum, chapter: str, exam: ExamEnum | None = None,
+                      difficulty: DifficultyEnum | None = None, limit: int = 50, offset: int = 0) -> list[dict]:
+    where = [PyqQuestion.subject == subject, PyqQuestion.chapter == chapter]
+    if exam is not None:
+        where.append(PyqQuestion.exam == exam)
+    if difficulty is not None:
+        where.append(PyqQuestion.difficulty == difficulty)
+    return _question_rows(
+        db, where, (PyqQuestion.exam_date.desc(), PyqQuestion.shift, PyqQuestion.question_no), limit, offset,
+    )
+
+
+def year_questions(db: Session, year: int, shift: int | None = None, subject: SubjectEnum | None = None,
+                   exam: ExamEnum | None = None, limit: int = 50, offset: int = 0) -> list[dict]:
+    """Questions asked in `year`, optionally one shift / subject (ix_pyq_questions_year)."""
+    where = [PyqQuestion.year == year]
+    if shift is not None:
+        where.append(PyqQuestion.shift == shift)
+    if subject is not None:
+        where.append(PyqQuestion.subject == subject)
+    if exam is not None:
+        where.append(PyqQuestion.exam == exam)
+    return _question_rows(
+        db, where, (PyqQuestion.exam_date.desc(), PyqQuestion.shift, PyqQuestion.question_no), limit, offset,
+    )
+
+
+def solved_ids(db: Session, user_id: int, problem_ids: Iterable[int]) -> set[int]:
+    """The problems among `problem_ids` this user answered correctly."""
+    ids = list(problem_ids)
+    if not ids:
+        return set()
+    return set(db.execute(
+        select(UserAnswer.problem_id)
+        .where(UserAnswer.user_id == user_id, UserAnswer.problem_id.in_(ids), UserAnswer.is_correct.is_(True))
+    ).scalars())
+
+
+def paper_view(p: PyqPaper) -> dict:
+    return {
+        "id": p.id,
+        "exam": p.exam.value,
+        "year": p.year,
+        "exam_date": p.exam_date,
+        "shift": p.shift,
+        "title": p.title,
+        "question_count": p.question_count,
+        "max_score": p.max_score,
+        "attempt_count": p.attempt_count,
+        "average_score": p.score_sum / p.attempt_count if p.attempt_count else 0.0,
+    }
+
+
+def list_papers(db: Session, year: int | None = None, exam: ExamEnum | None = None) -> list[dict]:
+    q = select(PyqPaper)
+    if year is not None:
+        q = q.where(PyqPaper.year == year)
+    if exam is not None:
+        q = q.where(PyqPaper.exam == exam)
+    q = q.order_by(PyqPaper.exam_date.desc(), PyqPaper.shift)
+    return [paper_view(p) for p in db.execute(q).scalars()]
+
+
+def paper_problem_ids(db: Session, paper_id: int) -> list[int]:
+    return list(db.execute(
+        select(PyqQuestion.problem_id).where(PyqQuestion.paper_id == paper_id).order_by(PyqQuestion.question_no)
+    ).scalars())
+
+
+# ---------- attempts ----------
+
+def score_attempt(db: Session, paper_id: int, user_id: int, answers: dict[int, str]) -> dict:
+    """Grade a full-paper attempt, store it and bump the paper's running totals."""
+    key = dict(db.execute(
+        select(PyqQuestion.problem_id, Problem.correct_option)
+        .join(Problem, Problem.id == PyqQuestion.problem_id)
+        .where(PyqQuestion.paper_id == paper_id)
+    ).all())
+
+    correct = sum(1 for pid, choice in answers.items() if pid in key and key[pid] == choice)
+    wrong = sum(1 for pid, choice in answers.items() if pid in key and key[pid] != choice)
+    score = correct * MARKS_CORRECT + wrong * MARKS_WRONG
+
+    db.add(PyqAttempt(paper_id=paper_id, user_id=user_id, score=score, correct=correct, wrong=wrong))
+    count, total = db.execute(
+        update(PyqPaper)
+        .where(PyqPaper.id == paper_id)
+        .values(attempt_count=PyqPaper.attempt_count + 1, score_sum=PyqPaper.score_sum + score)
+        .returning(PyqPaper.attempt_count, PyqPaper.score_sum)
+    ).one()
+    db.commit()
+    return {
+        "score": score,
+        "correct": correct,
+        "wrong": wrong,
+        "unanswered": len(key) - correct - wrong,
+        "paper_attempts": count,
+        "paper_average": total / count if count else 0.0,
+    }
@@ -0,0 +1,181 @@
+# backend/services/review.py
+"""
+Spaced-repetition review queue (SM-2).
+
+A problem enters a user's queue the first time they answer it wrong and is
+rescheduled every time it is answered again: right after /questions/{id}/submit
+commits (answer-recorded post-commit hook) and inline in /review/{id}/answer:
+
+    wrong:   repetitions = 0, interval = 1 day, ease -= 0.54 (min 1.3), lapses += 1
+    correct: repetitions += 1, interval = 1, 6, then interval * ease days
+
+Items whose interval grows past RETIRE_DAYS are considered learnt and removed.
+
+The queue read is one range scan on ix_review_items_user_due
+(user_id, due_at), so it costs O(log n + limit) however long the history is.
+
+replan_overdue() is the nightly batch (scripts/replan_reviews.py): items
+missed by more than GRACE_DAYS are reset to a 1-day interval and spread over
+the next days, at most PER_DAY per user, in one UPDATE. backfill() seeds the
+queue once from wrong answers recorded before this existed.
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, String, cast, exists, func, insert, literal, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from models import Problem, ReviewItem, UserAnswer
+from tasks import post_commit_hook
+
+QUALITY_CORRECT = 4
+QUALITY_WRONG = 1
+MIN_EASE = 1.3
+RETIRE_DAYS = int(os.getenv("REVIEW_RETIRE_DAYS", "180"))
+GRACE_DAYS = int(os.getenv("REVIEW_GRACE_DAYS", "2"))
+PER_DAY = int(os.getenv("REVIEW_PER_DAY", "30"))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _schedule(item: ReviewItem, quality: int, now: datetime):
+    if quality < 3:
+        item.repetitions = 0
+        item.interval_days = 1
+        item.lapses = (item.lapses or 0) + 1
+    else:
+        item.repetitions = (item.repetitions or 0) + 1
+        if item.repetitions == 1:
+            item.interval_days = 1
+        elif item.repetitions == 2:
+            item.interval_days = 6
+        else:
+            item.interval_days = round(item.interval_days * item.ease)
+    item.ease = max(MIN_EASE, item.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    item.due_at = now + timedelta(days=item.interval_days)
+    item.last_reviewed_at = now
+
+
+def record_answer(db: Session, user_id: int, problem_id: int, is_correct: bool,
+                  now: Optional[datetime] = None) -> Optional[ReviewItem]:
+    """Update the schedule for an answer. Caller commits. Returns the item, or
+    None when the problem is not (or no longer) in the user's queue."""
+    now = now or _now()
+    item = db.get(ReviewItem, (user_id, problem_id))
+    if item is None:
+        if is_correct:
+            return None  # only mistakes come back for review
+        item = ReviewItem(user_id=user_id, problem_id=problem_id, interval_days=0, ease=2.5, repetitions=0, lapses=0)
+        db.add(item)
+
+    _schedule(item, QUALITY_CORRECT if is_correct else QUALITY_WRONG, now)
+    if item.interval_days > RETIRE_DAYS:
+        db.delete(item)
+        return None
+    return item
+
+
+@post_commit_hook("answer-recorded")
+def _schedule_after_answer(db: Session, user_id: Optional[int], problem_id: int, is_correct: bool, **_):
+    if user_id is not None:
+        record_answer(db, user_id, problem_id, is_correct)
+
+
+def due_items(db: Session, user_id: int, limit: int = 20, now: Optional[datetime] = None) -> list[dict]:
+    rows = db.execute(
+        select(
+            ReviewItem.problem_id, ReviewItem.due_at, ReviewItem.repetitions, ReviewItem.lapses,
+            Problem.subject, Problem.chapter, Problem.difficulty, Problem.question_tex,
+        )
+        .join(Problem, Problem.id == ReviewItem.problem_id)
+        .where(ReviewItem.user_id == user_id, ReviewItem.due_at <= (now or _now()))
+        .order_by(ReviewItem.due_at)
+        .limit(limit)
+    )
+    return [
+        {
+            "problem_id": r.problem_id,
+            "due_at": r.due_at,
+            "repetitions": r.repetitions,
+            "lapses": r.lapses,
+            "subject": r.subject.value,
+            "chapter": r.chapter,
+            "difficulty": r.difficulty.value,
+            "preview": r.question_tex[:200],
+        }
+        for r in rows
+    ]
+
+
+def next_due_at(db: Session, user_id: int) -> Optional[datetime]:
+    # min() over a (user_id, due_at) index is a single probe
+    return db.execute(select(func.min(ReviewItem.due_at)).where(ReviewItem.user_id == user_id)).scalar()
+
+
+# ---------- nightly batch ----------
+
+def _days_after(conn: Connection, base: datetime, days):
+    if conn.dialect.name == "postgresql":
+        return literal(base, DateTime(timezone=True)) + func.make_interval(0, 0, 0, cast(days, Integer))
+    # SQLite (benchmarks)
+    return func.datetime(literal(base.strftime("%Y-%m-%d %H:%M:%S")), "+" + cast(days, String) + " days")
+
+
+def replan_overdue(conn: Connection, now: Optional[datetime] = None, grace_days: int = GRACE_DAYS,
+                   per_day: int = PER_DAY) -> int:
+    """Reset items overdue by more than `grace_days` and spread them from
+    tomorrow on, `per_day` per user, oldest first. Returns rows updated."""
+    now = now or _now()
+    greatest = func.greatest if conn.dialect.name == "postgresql" else func.max
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    ranked = (
+        select(
+            ReviewItem.user_id,
+            ReviewItem.problem_id,
+            (func.row_number().over(partition_by=ReviewItem.user_id, order_by=ReviewItem.due_at) - 1).label("rn"),
+        )
+        .where(ReviewItem.due_at < now - timedelta(days=grace_days))
+        .subquery()
+    )
+    res = conn.execute(
+        update(ReviewItem)
+        .where(ReviewItem.user_id == ranked.c.user_id, ReviewItem.problem_id == ranked.c.problem_id)
+        .values(
+            due_at=_days_after(conn, tomorrow, ranked.c.rn // per_day),
+            interval_days=1,
+            repetitions=0,
+            ease=greatest(MIN_EASE, ReviewItem.ease - 0.2),
+        )
+    )
+    return res.rowcount
+
+
+def backfill(conn: Connection) -> int:
+    """Queue every (user, problem) with a wrong answer and no review item yet,
+    due a day after the answer. Run replan_overdue() afterwards to spread them."""
+    wrong = (
+        select(
+            UserAnswer.user_id,
+            UserAnswer.problem_id,
+            func.min(UserAnswer.created_at).label("first_wrong"),
+        )
+        .where(UserAnswer.is_correct.is_(False), UserAnswer.user_id.is_not(None))
+        .group_by(UserAnswer.user_id, UserAnswer.problem_id)
+        .subquery()
+    )
+    res = conn.execute(insert(ReviewItem).from_select(
+        ["user_id", "problem_id", "due_at", "interval_days", "ease", "repetitions", "lapses"],
+        select(
+            wrong.c.user_id, wrong.c.problem_id, wrong.c.first_wrong,
+            literal(1), literal(2.5), literal(0), literal(1),
+        ).where(~exists().where(
+            ReviewItem.user_id == wrong.c.user_id, ReviewItem.problem_id == wrong.c.problem_id,
+        )),
+    ))
+    return res.rowcount
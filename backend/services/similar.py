@@ -0,0 +1,418 @@
+# backend/services/similar.py
+"""
+"Similar problems" from a precomputed nearest-neighbour table.
+
+Every active problem is a TF-IDF vector over hashed n-grams:
+
+    word unigrams + bigrams of question_tex (TeX commands count as words)
+    "topic:<topic>" and "chapter:<chapter>" as single extra terms
+    -> crc32 into 2**20 buckets (stable across processes, no vocabulary)
+    tf = 1 + log(count), idf = log((1 + n) / (1 + df)) + 1, rows L2-normalised
+    buckets in more than MAX_DF of the problems are dropped (stop words;
+    only once a subject has MIN_DOCS_FOR_MAX_DF problems)
+
+Neighbours come from the same subject, so each subject is its own index
+(idf included). The vectors live in NumPy arrays as CSR (indptr/indices/
+data) plus the transposed postings; cosine scores of a block of problems
+against the whole subject are a sparse product done with one np.bincount
+over the (query term, posting) pairs. The best K per problem are written to
+problem_neighbors (COPY on Postgres), so the endpoint is one indexed join
+and nothing is computed per request.
+
+refresh() is incremental: problems added or edited since the watermark
+(updated_at, kept in rollup_watermarks like services/chapter_stats.py) are
+searched against everything, and each of them is merged into the other
+problems' lists where it beats their current K-th neighbour. Only lists
+that change are rewritten. Neighbours that were deactivated are filtered at
+read time; when many problems changed at once (or on --rebuild) the whole
+table is recomputed, which also refreshes every idf.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from lifecycle import on_shutdown, on_startup
+from models import Problem, ProblemNeighbor, RollupWatermark
+from services.daily import problem_payload
+
+log = logging.getLogger(__name__)
+
+INDEX = "problem_neighbors"
+K = int(os.getenv("SIMILAR_K", "10"))
+LAG = timedelta(seconds=float(os.getenv("SIMILAR_LAG", "60")))
+REFRESH_INTERVAL = float(os.getenv("SIMILAR_REFRESH_INTERVAL", "300"))  # seconds, 0 = off
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+BUCKETS = 1 << 20
+MAX_DF = 0.5            # drop buckets present in more than this share of problems
+MIN_DOCS_FOR_MAX_DF = 50
+TOPIC_WEIGHT = 3.0      # term frequency of the topic / chapter terms
+CHAPTER_WEIGHT = 2.0
+MIN_SCORE = 0.05        # weaker matches are not listed
+FULL_REFRESH_SHARE = 0.2
+BLOCK_PAIRS = 20_000_000   # (query term, posting) pairs per bincount
+BLOCK_CELLS = 16_000_000   # block rows x problems in one score matrix
+
+_WORD = re.compile(r"\\[a-z]+|[a-z0-9]+")
+
+
+def _aware(ts: datetime) -> datetime:
+    # SQLite hands timestamps back naive
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _insert(db: Session):
+    return pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+# ---------- vectors ----------
+
+def _terms(question_tex: str, topic: str, chapter: str) -> dict[int, float]:
+    """Hashed bucket -> term frequency for one problem."""
+    words = _WORD.findall((question_tex or "").lower())
+    counts = Counter(words)
+    counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    tf: dict[int, float] = {}
+    for term, n in counts.items():
+        b = zlib.crc32(term.encode()) & (BUCKETS - 1)
+        tf[b] = tf.get(b, 0.0) + 1.0 + math.log(n)
+    for term, w in ((f"topic:{topic.lower()}", TOPIC_WEIGHT), (f"chapter:{chapter.lower()}", CHAPTER_WEIGHT)):
+        b = zlib.crc32(term.encode()) & (BUCKETS - 1)
+        tf[b] = tf.get(b, 0.0) + w
+    return tf
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(s, e) for every (s, e) pair."""
+    lens = ends - starts
+    offsets = np.repeat(starts - (np.cumsum(lens) - lens), lens)
+    return np.arange(int(lens.sum())) + offsets
+
+
+@dataclass
+class Index:
+    ids: np.ndarray        # (n,) problem ids of one subject, ascending
+    updated: list          # (n,) updated_at
+    indptr: np.ndarray     # CSR rows
+    indices: np.ndarray    # buckets
+    data: np.ndarray       # tf-idf, rows L2-normalised
+    post_ptr: np.ndarray   # (BUCKETS + 1,) postings of each bucket
+    post_doc: np.ndarray
+    post_w: np.ndarray
+
+    @property
+    def n(self) -> int:
+        return len(self.ids)
+
+    def work(self) -> np.ndarray:
+        """(query term, posting) pairs each row's scores cost."""
+        df = np.diff(self.post_ptr)
+        row = np.repeat(np.arange(self.n), np.diff(self.indptr))
+        return np.bincount(row, weights=df[self.indices], minlength=self.n)
+
+
+def build_index(rows) -> Index:
+    """rows: (id, topic, chapter, question_tex, updated_at) of one subject, ordered by id."""
+    n = len(rows)
+    terms = [_terms(r[3], r[1], r[2]) for r in rows]
+    lens = np.fromiter((len(t) for t in terms), dtype=np.int64, count=n)
+    buckets = np.fromiter((b for t in terms for b in t), dtype=np.int64, count=int(lens.sum()))
+    tf = np.fromiter((w for t in terms for w in t.values()), dtype=np.float64, count=len(buckets))
+    row = np.repeat(np.arange(n), lens)
+
+    df = np.bincount(buckets, minlength=BUCKETS)
+    keep = df[buckets] <= (MAX_DF * n if n >= MIN_DOCS_FOR_MAX_DF else n)
+    buckets, tf, row = buckets[keep], tf[keep], row[keep]
+    data = tf * (np.log((1 + n) / (1 + df[buckets])) + 1)
+    norms = np.sqrt(np.bincount(row, weights=data * data, minlength=n))
+    data = (data / np.where(norms > 0, norms, 1)[row]).astype(np.float32)
+
+    order = np.argsort(buckets, kind="stable")
+    return Index(
+        ids=np.array([r[0] for r in rows], dtype=np.int64),
+        updated=[_aware(r[4]) for r in rows],
+        indptr=np.concatenate([[0], np.cumsum(np.bincount(row, minlength=n))]),
+        indices=buckets,
+        data=data,
+        post_ptr=np.concatenate([[0], np.cumsum(np.bincount(buckets, minlength=BUCKETS))]),
+        post_doc=row[order],
+        post_w=data[order],
+    )
+
+
+def _scores(ix: Index, rows: np.ndarray) -> np.ndarray:
+    """(len(rows), n) cosine similarities; the row itself scores 0."""
+    c = len(rows)
+    q_pos = _ranges(ix.indptr[rows], ix.indptr[rows + 1])
+    q_row = np.repeat(np.arange(c), np.diff(ix.indptr)[rows])
+    q_bucket = ix.indices[q_pos]
+    lo, hi = ix.post_ptr[q_bucket], ix.post_ptr[q_bucket + 1]
+    pair = np.repeat(np.arange(len(q_pos)), hi - lo)
+    pos = _ranges(lo, hi)
+    s = np.bincount(
+        q_row[pair] * ix.n + ix.post_doc[pos],
+        weights=ix.data[q_pos][pair] * ix.post_w[pos],
+        minlength=c * ix.n,
+    ).reshape(c, ix.n)
+    s[np.arange(c), rows] = 0
+    return s
+
+
+def _blocks(ix: Index, rows: np.ndarray, work: np.ndarray):
+    """Split `rows` so each score block stays under BLOCK_PAIRS / BLOCK_CELLS."""
+    max_rows = max(1, BLOCK_CELLS // max(ix.n, 1))
+    start, acc = 0, 0.0
+    for i, w in enumerate(work[rows].tolist()):
+        if i > start and (acc + w > BLOCK_PAIRS or i - start >= max_rows):
+            yield rows[start:i]
+            start, acc = i, 0.0
+        acc += w
+    if start < len(rows):
+        yield rows[start:]
+
+
+def _top(idx: np.ndarray, sc: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Best k columns of each row (descending); -1 where the score is below MIN_SCORE.
+
+    Always k columns wide: with fewer candidates the rest is padded with -1 / -inf.
+    """
+    if sc.shape[1] < k:
+        pad = k - sc.shape[1]
+        idx = np.concatenate([idx, np.full((idx.shape[0], pad), -1, dtype=np.int64)], axis=1)
+        sc = np.concatenate([sc, np.full((sc.shape[0], pad), -np.inf)], axis=1)
+    part = np.argpartition(-sc, k - 1, axis=1)[:, :k]
+    top_sc = np.take_along_axis(sc, part, 1)
+    order = np.argsort(-top_sc, axis=1, kind="stable")
+    top_sc = np.take_along_axis(top_sc, order, 1)
+    top_idx = np.take_along_axis(np.take_along_axis(idx, part, 1), order, 1)
+    top_idx[top_sc < MIN_SCORE] = -1
+    return top_idx, top_sc
+
+
+# ---------- table ----------
+
+def _load_table(db: Session) -> tuple[np.ndarray, ...]:
+    """problem_neighbors as columns (problem_id, rank, neighbor_id, score)."""
+    rows = db.execute(
+        select(ProblemNeighbor.problem_id, ProblemNeighbor.rank, ProblemNeighbor.neighbor_id, ProblemNeighbor.score)
+        .where(ProblemNeighbor.rank <= K)
+    ).all()
+    if not rows:
+        return tuple(np.array([], dtype=t) for t in (np.int64, np.int64, np.int64, np.float64))
+    return tuple(np.array(c) for c in zip(*rows))
+
+
+def _current(ix: Index, table: tuple[np.ndarray, ...]) -> tuple[np.ndarray, np.ndarray]:
+    """The subject's lists as (n, K) row indices (-1 = none) and scores."""
+    cur_idx = np.full((ix.n, K), -1, dtype=np.int64)
+    cur_sc = np.zeros((ix.n, K))
+    pid, rank, nid, score = table
+
+    def row_of(ids):
+        at = np.minimum(np.searchsorted(ix.ids, ids), ix.n - 1)
+        return np.where(ix.ids[at] == ids, at, -1)
+
+    r, nb = row_of(pid), row_of(nid)
+    ok = (r >= 0) & (nb >= 0)  # both still active
+    cur_idx[r[ok], rank[ok] - 1] = nb[ok]
+    cur_sc[r[ok], rank[ok] - 1] = score[ok]
+    return cur_idx, cur_sc
+
+
+def _write(db: Session, ix: Index, rows: np.ndarray, top_idx: np.ndarray, top_sc: np.ndarray,
+           replace: bool = True):
+    """Write the neighbour lists of index rows `rows` (replacing theirs)."""
+    pids = ix.ids[rows].tolist()
+    for i in range(0, len(pids), 10_000) if replace else ():
+        db.execute(delete(ProblemNeighbor).where(ProblemNeighbor.problem_id.in_(pids[i:i + 10_000])))
+    r, rank = np.nonzero(top_idx >= 0)
+    if not len(r):
+        return
+    columns = (ix.ids[rows[r]].tolist(), (rank + 1).tolist(),
+               ix.ids[top_idx[r, rank]].tolist(), top_sc[r, rank].round(4).tolist())
+    if db.get_bind().dialect.name != "postgresql":
+        db.execute(insert(ProblemNeighbor), [
+            {"problem_id": p, "rank": k, "neighbor_id": q, "score": s} for p, k, q, s in zip(*columns)
+        ])
+        return
+    # 260k rows for a full build: COPY is ~10x faster than batched INSERTs
+    buf = io.StringIO("".join(f"{p}\t{k}\t{q}\t{s}\n" for p, k, q, s in zip(*columns)))
+    with db.connection().connection.cursor() as cur:
+        cur.copy_from(buf, "problem_neighbors", columns=("problem_id", "rank", "neighbor_id", "score"))
+
+
+def _search_all(db: Session, ix: Index) -> int:
+    work = ix.work()
+    for block in _blocks(ix, np.arange(ix.n), work):
+        s = _scores(ix, block)
+        top_idx, top_sc = _top(np.broadcast_to(np.arange(ix.n), s.shape), s, K)
+        _write(db, ix, block, top_idx, top_sc, replace=False)
+    return ix.n
+
+
+def _search_changed(db: Session, ix: Index, changed: np.ndarray, table: tuple[np.ndarray, ...]) -> int:
+    cur_idx, cur_sc = _current(ix, table)
+    before = cur_idx.copy()
+    is_changed = np.zeros(ix.n, dtype=bool)
+    is_changed[changed] = True
+    # entries pointing at edited problems are re-scored below
+    cur_sc = np.where((cur_idx < 0) | is_changed[np.maximum(cur_idx, 0)], -np.inf, cur_sc)
+    cur_idx = np.where(np.isfinite(cur_sc), cur_idx, -1)
+
+    own_idx = np.full((ix.n, K), -1, dtype=np.int64)
+    own_sc = np.zeros((ix.n, K))
+    others = ~is_changed
+    for block in _blocks(ix, changed, ix.work()):
+        s = _scores(ix, block)
+        own_idx[block], own_sc[block] = _top(np.broadcast_to(np.arange(ix.n), s.shape), s, K)
+        # the block as candidates for everyone else's list
+        cand_idx = np.concatenate([cur_idx[others], np.broadcast_to(block, (int(others.sum()), len(block)))], axis=1)
+        cand_sc = np.concatenate([cur_sc[others], s.T[others]], axis=1)
+        top_idx, top_sc = _top(cand_idx, cand_sc, K)
+        cur_idx[others] = top_idx
+        cur_sc[others] = np.where(top_idx >= 0, top_sc, -np.inf)
+    cur_idx[changed], cur_sc[changed] = own_idx[changed], own_sc[changed]
+
+    touched = np.nonzero(is_changed | (cur_idx != before).any(axis=1))[0]
+    _write(db, ix, touched, cur_idx[touched], cur_sc[touched])
+    return len(touched)
+
+
+# ---------- refresh ----------
+
+def refresh(db: Session, full: bool = False, now: datetime | None = None) -> Optional[dict]:
+    """Bring problem_neighbors up to date with problems changed since the last run.
+
+    Returns {"problems", "searched", "rewritten", "full"}, or None when another
+    worker is refreshing.
+    """
+    now = now or datetime.now(timezone.utc)
+    db.execute(
+        _insert(db)(RollupWatermark)
+        .values(name=INDEX, watermark=EPOCH, refreshed_at=now)
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    db.commit()
+
+    wm = db.execute(
+        select(RollupWatermark).where(RollupWatermark.name == INDEX).with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if wm is None:
+        db.rollback()
+        return None
+    lo, hi = _aware(wm.watermark), now - LAG
+    full = full or lo <= EPOCH
+    if not full and not db.scalar(
+        select(func.count()).select_from(Problem).where(Problem.updated_at >= lo, Problem.updated_at < hi)
+    ):
+        wm.watermark, wm.refreshed_at = max(lo, hi), now
+        db.commit()
+        return {"problems": None, "searched": 0, "rewritten": 0, "full": False}
+
+    by_subject: dict[str, list] = {}
+    for r in db.execute(
+        select(Problem.subject, Problem.id, Problem.topic, Problem.chapter, Problem.question_tex, Problem.updated_at)
+        .where(Problem.is_active)
+        .order_by(Problem.id)
+    ):
+        by_subject.setdefault(getattr(r[0], "value", r[0]), []).append(r[1:])
+    total = sum(len(rows) for rows in by_subject.values())
+    changed_total = sum(lo <= _aware(r[4]) < hi for rows in by_subject.values() for r in rows)
+    full = full or changed_total > FULL_REFRESH_SHARE * total
+
+    searched = rewritten = 0
+    if full:
+        db.execute(delete(ProblemNeighbor))
+    else:
+        table = _load_table(db)
+    for rows in by_subject.values():
+        if len(rows) < 2:
+            continue
+        ix = build_index(rows)
+        if full:
+            n = _search_all(db, ix)
+            searched, rewritten = searched + n, rewritten + n
+            continue
+        changed = np.array([i for i, ts in enumerate(ix.updated) if lo <= ts < hi], dtype=np.int64)
+        if len(changed):
+            searched += len(changed)
+            rewritten += _search_changed(db, ix, changed, table)
+    wm.watermark, wm.refreshed_at = max(lo, hi), now
+    db.commit()
+    return {"problems": total, "searched": searched, "rewritten": rewritten, "full": full}
+
+
+# ---------- reads ----------
+
+def similar(db: Session, problem_id: int, limit: int = K) -> list[dict]:
+    """Active problems most like `problem_id`, best first (one indexed join)."""
+    rows = db.execute(
+        select(Problem, ProblemNeighbor.score)
+        .join(ProblemNeighbor, ProblemNeighbor.neighbor_id == Problem.id)
+        .where(ProblemNeighbor.problem_id == problem_id, Problem.is_active)
+        .order_by(ProblemNeighbor.rank)
+        .limit(limit)
+    ).all()
+    return [{**problem_payload(p), "score": score} for p, score in rows]
+
+
+# ---------- background refresh ----------
+
+class Refresher:
+    def __init__(self, interval: float = REFRESH_INTERVAL):
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self):
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            result = refresh(db)
+            if result and result["searched"]:
+                log.info("similar problems: searched %d, rewrote %d lists%s",
+                         result["searched"], result["rewritten"], " (full)" if result["full"] else "")
+        except Exception:
+            db.rollback()
+            log.exception("similar problems refresh failed; retrying next interval")
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.run_once()
+
+    def start(self):
+        if self._interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="similar-problems", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+refresher = Refresher()
+
+on_startup("similar-problems")(refresher.start)
+on_shutdown("similar-problems")(refresher.stop)
@@ -0,0 +1,177 @@
+# backend/services/stats_stream.py
+"""
+Live stats for daily problems over Server-Sent Events.
+
+Instead of every open DPP page polling `compute_stats`, each worker runs one
+aggregator thread. Once per TICK seconds it reads attempted/solved for every
+problem somebody in this process is watching (one GROUP BY query plus one
+for archived totals, on a replica when one is configured; like counts come
+from services/like_buffer.py, one GROUP BY for the ones not cached) and pushes only
+the problems whose numbers changed. Fan-out to subscribers happens on the event loop: one
+`call_soon_threadsafe` per changed problem, no matter how many watchers.
+
+Subscribers always get the latest value rather than a backlog; a slow client
+simply skips intermediate ticks.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import case, func, select
+
+from db_routing import read_session
+from lifecycle import on_shutdown, on_startup
+from metrics import STATS_STREAM_SUBSCRIBERS
+from models import UserAnswer
+from services.answer_partitions import archived_totals
+from services.daily import stats_cache
+from services.like_buffer import like_buffer
+
+log = logging.getLogger(__name__)
+
+TICK = float(os.getenv("STATS_STREAM_INTERVAL", "1"))  # seconds
+
+
+class Subscriber:
+    __slots__ = ("problem_id", "loop", "event", "latest")
+
+    def __init__(self, problem_id: int, loop: asyncio.AbstractEventLoop):
+        self.problem_id = problem_id
+        self.loop = loop
+        self.event = asyncio.Event()
+        self.latest: Optional[dict] = None
+
+    async def next(self) -> dict:
+        await self.event.wait()
+        self.event.clear()
+        return self.latest
+
+
+class StatsHub:
+    def __init__(self, tick: float = TICK):
+        self._tick = tick
+        self._lock = threading.Lock()
+        self._subs: dict[int, set[Subscriber]] = {}
+        self._last: dict[int, dict] = {}  # problem_id -> last published payload
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ---------- subscribers (event loop side) ----------
+
+    def subscribe(self, problem_id: int) -> Subscriber:
+        sub = Subscriber(problem_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subs.setdefault(problem_id, set()).add(sub)
+            last = self._last.get(problem_id)
+        if last is not None:
+            sub.latest = last
+            sub.event.set()
+        STATS_STREAM_SUBSCRIBERS.inc()
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        with self._lock:
+            subs = self._subs.get(sub.problem_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.problem_id]
+                    self._last.pop(sub.problem_id, None)
+        STATS_STREAM_SUBSCRIBERS.dec()
+
+    def _deliver(self, loop: asyncio.AbstractEventLoop, problem_id: int, payload: dict):
+        # runs on `loop`
+        with self._lock:
+            subs = [s for s in self._subs.get(problem_id, ()) if s.loop is loop]
+        for s in subs:
+            s.latest = payload
+            s.event.set()
+
+    # ---------- aggregator (thread side) ----------
+
+    def _read(self, problem_ids: list[int]) -> dict[int, dict]:
+        db = read_session()
+        try:
+            rows = db.execute(
+                select(
+                    UserAnswer.problem_id,
+                    func.count(UserAnswer.id),
+                    func.coalesce(func.sum(case((UserAnswer.is_correct.is_(True), 1), else_=0)), 0),
+                )
+                .where(UserAnswer.problem_id.in_(problem_ids))
+                .group_by(UserAnswer.problem_id)
+            ).all()
+            counts = {pid: (int(a), int(s)) for pid, a, s in rows}
+            archived = archived_totals(db, problem_ids)
+            likes = like_buffer.counts(db, problem_ids)
+
+            out = {}
+            for pid in problem_ids:
+                attempted, solved = counts.get(pid, (0, 0))
+                old_attempted, old_solved = archived.get(pid, (0, 0))
+                attempted, solved = attempted + old_attempted, solved + old_solved
+                stats_cache.set(str(pid), [attempted, solved])  # polling clients benefit too
+                out[pid] = {
+                    "problem_id": pid,
+                    "attempted": attempted,
+                    "solved": solved,
+                    "accuracy": float(solved) / float(attempted) if attempted else 0.0,
+                    "likes_count": likes[pid],
+                }
+            return out
+        finally:
+            db.close()
+
+    def tick(self) -> int:
+        """Read watched problems once and publish the ones that changed. Returns #published."""
+        with self._lock:
+            watched = list(self._subs)
+        if not watched:
+            return 0
+
+        fresh = self._read(watched)
+
+        published = 0
+        for pid, payload in fresh.items():
+            with self._lock:
+                if pid not in self._subs or self._last.get(pid) == payload:
+                    continue
+                self._last[pid] = payload
+                loops = {s.loop for s in self._subs[pid]}
+            for loop in loops:
+                try:
+                    loop.call_soon_threadsafe(self._deliver, loop, pid, payload)
+                except RuntimeError:
+                    pass  # loop already closed (worker shutting down)
+            published += 1
+        return published
+
+    def _run(self):
+        while not self._stop.wait(self._tick):
+            try:
+                self.tick()
+            except Exception:
+                log.exception("stats stream tick failed; retrying next tick")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stats-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+stats_hub = StatsHub()
+
+on_startup("stats-stream")(stats_hub.start)
+on_shutdown("stats-stream")(stats_hub.stop)
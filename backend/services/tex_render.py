@@ -0,0 +1,269 @@
+# backend/services/tex_render.py
+"""
+Server-side TeX pre-rendering.
+
+Every TeX field of a Problem (question, options, hint, solution) is turned
+into HTML with the math as MathML, once, and stored in `rendered_tex` keyed
+by a hash of (renderer version, mode, source). Identical text shared by many
+problems ("Both A and B") is rendered and stored once, and editing a problem
+only renders the fields whose text actually changed.
+
+When it happens:
+- App workers: committing a new/edited Problem queues its id; a background
+  dispatcher renders the missing hashes in a process pool (TEX_RENDER_WORKERS).
+- Scripts / backfill: `python -m scripts.prerender_tex`.
+
+Reads never render: a field without a stored rendering comes back as None and
+the frontend keeps using KaTeX for it.
+
+Delimiters follow the frontend (DailyQuestionPage smartWrap*): $...$, $$...$$,
+\\(...\\), \\[...\\], and a field with no delimiters that looks like bare LaTeX
+is treated as one formula. Text between formulas is HTML-escaped (markdown in
+it is not interpreted). Bump RENDERER_VERSION when the output format changes.
+
+Needs the optional `latex2mathml` package; without it nothing is queued and
+every rendered field is None.
+"""
+from __future__ import annotations
+
+import hashlib
+import html
+import importlib.util
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from lifecycle import on_shutdown, on_startup
+from models import Problem, RenderedTex
+
+log = logging.getLogger(__name__)
+
+RENDERER_VERSION = "mathml-1"
+WORKERS = int(os.getenv("TEX_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# field -> display mode (hint/solution are shown as blocks, like the frontend)
+FIELDS = {
+    "question_tex": "inline",
+    "option_a_tex": "inline",
+    "option_b_tex": "inline",
+    "option_c_tex": "inline",
+    "option_d_tex": "inline",
+    "hint_tex": "block",
+    "solution_tex": "block",
+}
+QUESTION_FIELDS = ("question_tex", "option_a_tex", "option_b_tex", "option_c_tex", "option_d_tex")
+
+_MATH = re.compile(
+    r"(?<!\\)\$\$(.+?)(?<!\\)\$\$"   # $$...$$
+    r"|\\\[(.+?)\\\]"                # \[...\]
+    r"|(?<!\\)\$(.+?)(?<!\\)\$"      # $...$
+    r"|\\\((.+?)\\\)",               # \(...\)
+    re.DOTALL,
+)
+_BARE_LATEX = re.compile(r"\\[a-zA-Z]+|[_^{}]")
+
+
+def available() -> bool:
+    return importlib.util.find_spec("latex2mathml") is not None
+
+
+def content_hash(tex: str, mode: str) -> str:
+    return hashlib.sha256(f"{RENDERER_VERSION}\0{mode}\0{tex}".encode("utf-8")).hexdigest()
+
+
+def _formula(latex: str, display: str) -> str:
+    from latex2mathml.converter import convert
+    try:
+        return convert(latex.strip(), display=display)
+    except Exception:
+        # leave broken TeX visible instead of failing the whole field
+        return f'<code class="tex-error">{html.escape(latex)}</code>'
+
+
+def render_tex(tex: str, mode: str = "inline") -> str:
+    """TeX-with-text -> HTML+MathML. Pure function (runs in worker processes)."""
+    if not _MATH.search(tex):
+        if _BARE_LATEX.search(tex):
+            t = tex.strip()
+            if t.startswith("(") and t.endswith(")"):
+                t = t[1:-1]
+            return _formula(t, mode)
+        return html.escape(tex).replace("\n", "<br>")
+
+    out, pos = [], 0
+    for m in _MATH.finditer(tex):
+        out.append(html.escape(tex[pos:m.start()]).replace("\n", "<br>"))
+        block, bracket, inline, paren = m.groups()
+        out.append(_formula(block or bracket, "block") if (block or bracket) else _formula(inline or paren, "inline"))
+        pos = m.end()
+    out.append(html.escape(tex[pos:]).replace("\n", "<br>"))
+    return "".join(out)
+
+
+def _render_item(item: tuple[str, str]) -> str:
+    tex, mode = item
+    return render_tex(tex, mode)
+
+
+def make_pool(workers: int = WORKERS) -> Optional[ProcessPoolExecutor]:
+    # spawn, not fork: the app process has DB pools and threads we must not copy
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+# ---------- storage ----------
+
+def _texts(problems: Iterable[Problem], fields: Iterable[str]) -> dict[str, tuple[str, str]]:
+    """hash -> (tex, mode) for every non-empty field."""
+    out = {}
+    for p in problems:
+        for f in fields:
+            tex = getattr(p, f)
+            if tex:
+                out[content_hash(tex, FIELDS[f])] = (tex, FIELDS[f])
+    return out
+
+
+def _stored(db: Session, hashes: list[str]) -> dict[str, str]:
+    found = {}
+    for i in range(0, len(hashes), 500):
+        chunk = hashes[i:i + 500]
+        found.update(db.execute(
+            select(RenderedTex.content_hash, RenderedTex.html).where(RenderedTex.content_hash.in_(chunk))
+        ).all())
+    return found
+
+
+def rendered_views(db: Session, problems: list[Problem], fields: Iterable[str] = FIELDS) -> dict[int, dict[str, Optional[str]]]:
+    """problem_id -> {field: html or None}, with one lookup for all problems."""
+    fields = tuple(fields)
+    stored = _stored(db, list(_texts(problems, fields)))
+    return {
+        p.id: {
+            f: stored.get(content_hash(getattr(p, f), FIELDS[f])) if getattr(p, f) else None
+            for f in fields
+        }
+        for p in problems
+    }
+
+
+def prerender(db: Session, problems: list[Problem], pool: Optional[ProcessPoolExecutor] = None) -> int:
+    """Render and store whatever is missing for these problems. Returns #new renderings."""
+    todo = _texts(problems, FIELDS)
+    for h in _stored(db, list(todo)):
+        todo.pop(h)
+    if not todo:
+        return 0
+
+    items = list(todo.items())
+    sources = [src for _, src in items]
+    if pool is not None and len(sources) > 1:
+        htmls = list(pool.map(_render_item, sources, chunksize=16))
+    else:
+        htmls = [_render_item(s) for s in sources]
+
+    rows = [{"content_hash": h, "renderer": RENDERER_VERSION, "html": out} for (h, _), out in zip(items, htmls)]
+    ins = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    for i in range(0, len(rows), 500):
+        db.execute(ins(RenderedTex).values(rows[i:i + 500]).on_conflict_do_nothing(index_elements=["content_hash"]))
+    db.commit()
+    return len(rows)
+
+
+# ---------- background re-rendering on ingest/edit ----------
+
+class TexRenderQueue:
+    def __init__(self, workers: int = WORKERS):
+        self._workers = workers
+        self._dispatcher: Optional[ThreadPoolExecutor] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None
+
+    def submit(self, problem_ids: set[int]):
+        with self._lock:
+            if self._dispatcher is None or not problem_ids:
+                return
+            self._dispatcher.submit(self._render_ids, sorted(problem_ids))
+
+    def _render_ids(self, problem_ids: list[int]):
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            problems = db.execute(select(Problem).where(Problem.id.in_(problem_ids))).scalars().all()
+            n = prerender(db, problems, self._pool)
+            if n:
+                log.info("pre-rendered %d TeX fields for problems %s", n, problem_ids[:10])
+        except Exception:
+            log.exception("TeX pre-render failed for problems %s", problem_ids[:10])
+        finally:
+            db.close()
+
+    def start(self):
+        if not available():
+            log.info("latex2mathml not installed; TeX pre-rendering disabled")
+            return
+        with self._lock:
+            if self._dispatcher is None:
+                # one dispatcher keeps DB work serial; the process pool does the CPU part
+                self._dispatcher = ThreadPoolExecutor(1, thread_name_prefix="tex-render")
+                self._pool = make_pool(self._workers)
+
+    def stop(self):
+        with self._lock:
+            dispatcher, pool = self._dispatcher, self._pool
+            self._dispatcher = self._pool = None
+        if dispatcher:
+            dispatcher.shutdown(wait=True, cancel_futures=True)
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+tex_queue = TexRenderQueue()
+
+on_startup("tex-render")(tex_queue.start)
+on_shutdown("tex-render")(tex_queue.stop)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_problems(session, flush_context):
+    if not tex_queue.running:
+        return
+    ids = session.info.setdefault("tex_render_ids", set())
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Problem):
+            continue
+        state = inspect(obj)
+        if obj in session.new or any(state.attrs[f].history.has_changes() for f in FIELDS):
+            ids.add(obj.id)
+
+
+def rerender_after_commit(session: Session, problem_ids: Iterable[int]):
+    """For set-based INSERT/UPDATEs, which the flush hook never sees."""
+    if tex_queue.running:
+        session.info.setdefault("tex_render_ids", set()).update(problem_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_changed_problems(session):
+    ids = session.info.pop("tex_render_ids", None)
+    if ids:
+        tex_queue.submit(ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_changed_problems(session):
+    session.info.pop("tex_render_ids", None)
@@ -0,0 +1,188 @@
+# backend/services/user_state.py
+"""
+Per-user answered/liked problem ids, for hydrating problem views and lists.
+
+Each user's state is two sorted `array('i')`s (4 bytes per id) loaded with a
+single UNION ALL query, then kept current by the write paths:
+
+    user_state.note_answer(user_id, problem_id)   # routes/attempts.py, after the commit
+    user_state.note_flushed(db, user_ids)         # like_buffer, once likes are in the DB
+
+Membership for any number of problem ids is a bisect per id, with no DB
+round trips:
+
+    answered = user_state.answered(db, user_id, [p.id for p in problems])
+
+Likes that are still sitting in services/like_buffer.py are overlaid, so a
+tap shows up immediately.
+
+Across workers: every committed write bumps a per-user version in the
+`user_state_ver` cache (Redis-backed when REDIS_URL is set) and announces the
+user on the cache bus (cache_bus.py), which evicts the other workers' local
+copy of that version; a local entry whose version no longer matches is
+reloaded. Answers are announced from a post-commit task (tasks.py), so the
+request's own session is never committed on their behalf. Likes are
+announced once like_buffer has flushed them. Entries expire after
+USER_STATE_TTL, or after USER_STATE_LOCAL_TTL when neither Redis nor the bus
+can tell this worker about writes made elsewhere.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Iterable
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.orm import Session
+
+import cache_bus
+from cache import Cache, is_coherent
+from metrics import register_cache
+from models import ProblemLike, UserAnswer
+from services.like_buffer import like_buffer
+from tasks import post_commit, post_commit_hook
+
+TTL = float(os.getenv("USER_STATE_TTL", "600"))
+LOCAL_TTL = float(os.getenv("USER_STATE_LOCAL_TTL", "5"))  # no Redis, no bus: other workers' writes go unseen
+MAX_USERS = int(os.getenv("USER_STATE_MAX_USERS", "50000"))
+
+# user_id -> write version; lets other workers notice their copy is stale
+_versions = Cache("user_state_ver", default_ttl=TTL * 2)
+
+
+def _contains(arr: array, x: int) -> bool:
+    i = bisect_left(arr, x)
+    return i < len(arr) and arr[i] == x
+
+
+def _with(arr: array, x: int, present: bool) -> array:
+    """Copy of `arr` with x added/removed (copy-on-write: readers bisect without the lock)."""
+    i = bisect_left(arr, x)
+    found = i < len(arr) and arr[i] == x
+    if present == found:
+        return arr
+    out = array("i", arr)
+    if present:
+        insort(out, x)
+    else:
+        del out[i]
+    return out
+
+
+class _Entry:
+    __slots__ = ("answered", "liked", "version", "loaded_at")
+
+    def __init__(self, answered: array, liked: array, version, loaded_at: float):
+        self.answered = answered
+        self.liked = liked
+        self.version = version
+        self.loaded_at = loaded_at
+
+
+class UserStateCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self.hits = self.misses = 0
+
+    def _load(self, db: Session, user_id: int, version) -> _Entry:
+        rows = db.execute(union_all(
+            select(literal("a"), UserAnswer.problem_id).where(UserAnswer.user_id == user_id),
+            select(literal("l"), ProblemLike.problem_id).where(ProblemLike.user_id == user_id),
+        )).all()
+        answered = array("i", sorted({pid for kind, pid in rows if kind == "a"}))
+        liked = array("i", sorted({pid for kind, pid in rows if kind == "l"}))
+        return _Entry(answered, liked, version, time.monotonic())
+
+    def _entry(self, db: Session, user_id: int) -> _Entry:
+        version = _versions.get(str(user_id), None)
+        ttl = TTL if _versions.shared or is_coherent() else LOCAL_TTL
+        with self._lock:
+            e = self._entries.get(user_id)
+            if e is not None and e.version == version and time.monotonic() - e.loaded_at < ttl:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return e
+            self.misses += 1
+
+        if version is None and not _versions.shared:
+            # a local-only token, so a bus eviction of it (a write elsewhere) forces a reload
+            version = time.time_ns()
+            _versions.set(str(user_id), version)
+        e = self._load(db, user_id, version)
+        with self._lock:
+            self._entries[user_id] = e
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > MAX_USERS:
+                self._entries.popitem(last=False)
+        return e
+
+    # ---------- reads ----------
+
+    def answered(self, db: Session, user_id: int, problem_ids: Iterable[int]) -> set[int]:
+        e = self._entry(db, user_id)
+        return {pid for pid in problem_ids if _contains(e.answered, pid)}
+
+    def liked(self, db: Session, user_id: int, problem_ids: Iterable[int]) -> set[int]:
+        e = self._entry(db, user_id)
+        buffered = like_buffer.buffered_for(user_id)
+        return {
+            pid for pid in problem_ids
+            if buffered.get(pid, _contains(e.liked, pid))
+        }
+
+    def has_answered(self, db: Session, user_id: int, problem_id: int) -> bool:
+        return problem_id in self.answered(db, user_id, (problem_id,))
+
+    def has_liked(self, db: Session, user_id: int, problem_id: int) -> bool:
+        return problem_id in self.liked(db, user_id, (problem_id,))
+
+    # ---------- writes ----------
+
+    def _publish(self, db: Session, user_ids: Iterable[int]):
+        """Bump the users' versions and evict them on the other workers.
+
+        Only for writes that have committed: a worker that reloads on the
+        eviction must already see the new rows. The NOTIFY goes out when the
+        caller commits `db`.
+        """
+        version = time.time_ns()
+        keys = [str(u) for u in user_ids]
+        with self._lock:
+            for user_id in user_ids:
+                e = self._entries.get(user_id)
+                if e is not None:
+                    e.version = version
+        for key in keys:
+            _versions.set(key, version)
+        cache_bus.notify(db, _versions.namespace, *keys)
+
+    def note_answer(self, user_id: int, problem_id: int):
+        """Call after the answer has committed; other workers hear of it from a post-commit task."""
+        with self._lock:
+            e = self._entries.get(user_id)
+            if e is not None:
+                e.answered = _with(e.answered, problem_id, True)
+        post_commit.emit("user-state-changed", user_ids=[user_id])
+
+    def note_flushed(self, db: Session, user_ids: Iterable[int]):
+        """like_buffer wrote these users' likes: every worker, this one included, reloads."""
+        user_ids = list(user_ids)
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+        self._publish(db, user_ids)
+
+user_state = UserStateCache()
+like_buffer.on_flush(user_state.note_flushed)
+
+
+@post_commit_hook("user-state-changed")
+def _announce(db: Session, user_ids: list[int], **_):
+    user_state._publish(db, user_ids)
+
+register_cache("user_state", lambda: (user_state.hits, user_state.misses))
@@ -0,0 +1,112 @@
+# backend/sql_profiler.py
+"""
+Per-request SQL profiling (opt-in with SQL_PROFILE=1).
+
+Counts statements and DB time for every request and reports them as a
+`Server-Timing` header (visible in the browser devtools Network tab):
+
+    Server-Timing: db;dur=4.21;desc="7 queries", app;dur=9.80
+
+Identical statement shapes repeated N+ times in one request (e.g. the
+per-subject loop in routes/dpp.get_today_all) are flagged as suspected
+N+1 patterns: logged with the route, and counted in `X-SQL-Suspect-N1`.
+
+When disabled nothing is installed: no engine listeners, no middleware.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import database
+
+log = logging.getLogger(__name__)
+
+ENABLED = os.getenv("SQL_PROFILE") == "1"
+N1_THRESHOLD = int(os.getenv("SQL_PROFILE_N1_THRESHOLD", "3"))
+
+
+class RequestProfile:
+    __slots__ = ("count", "db_time", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0  # seconds
+        self.shapes: Counter[str] = Counter()
+
+    def suspects(self, threshold: int = N1_THRESHOLD) -> list[tuple[str, int]]:
+        return [(s, n) for s, n in self.shapes.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+def _shape(statement: str) -> str:
+    # statements are already parameterized; only whitespace differs between call sites
+    return " ".join(statement.split())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("sql_profile_t0", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    prof = _current.get()
+    if prof is None:
+        return
+    stack = conn.info.get("sql_profile_t0")
+    if stack:
+        prof.db_time += time.perf_counter() - stack.pop()
+    prof.count += 1
+    prof.shapes[_shape(statement)] += 1
+
+
+def instrument_engine(engine: Engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+async def _profile_request(request: Request, call_next):
+    prof = RequestProfile()
+    token = _current.set(prof)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    total_ms = (time.perf_counter() - started) * 1000.0
+
+    response.headers.append(
+        "Server-Timing",
+        f'db;dur={prof.db_time * 1000.0:.2f};desc="{prof.count} queries", app;dur={total_ms:.2f}',
+    )
+    suspects = prof.suspects()
+    if suspects:
+        response.headers["X-SQL-Suspect-N1"] = str(len(suspects))
+        route = getattr(request.scope.get("route"), "path", request.url.path)
+        for shape, n in suspects:
+            log.warning("suspected N+1 on %s %s: %dx %s", request.method, route, n, shape[:300])
+    return response
+
+
+def install(app: FastAPI):
+    """Hook the engine (once it exists) and add the middleware; no-op unless SQL_PROFILE=1."""
+    if not ENABLED:
+        return
+    database.on_engine_created(instrument_engine)
+    app.middleware("http")(_profile_request)
+    log.info("SQL profiling enabled (N+1 threshold=%d)", N1_THRESHOLD)
@@ -0,0 +1,159 @@
+# backend/tasks.py
+"""
+Post-commit hooks: side effects that don't need to hold up the response.
+
+Modules register hooks by event name; write handlers emit the event once
+their own transaction has committed:
+
+    @post_commit_hook("answer-recorded")
+    def _refresh_stats(db, problem_id, **_): ...
+
+    db.commit()
+    post_commit.emit("answer-recorded", problem_id=qid, user_id=uid, is_correct=ok)
+
+Each (hook, event) pair becomes one task on a bounded in-process queue,
+served by POST_COMMIT_WORKERS threads. A task gets its own Session (committed
+when the hook returns, rolled back if it raises) and is retried up to
+POST_COMMIT_ATTEMPTS times with exponential backoff, so hooks must be safe to
+run twice.
+
+Back-pressure: when the queue is full, emit() waits up to
+POST_COMMIT_PUT_TIMEOUT and then runs the task in the calling thread, so a
+burst slows the producers down instead of dropping work or growing memory.
+
+Shutdown drains: emit() runs tasks inline from then on, and the workers
+finish what is queued (up to POST_COMMIT_DRAIN_TIMEOUT) before exiting. Past
+the timeout stop() returns anyway, even with a full queue and stuck hooks.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable
+
+from database import SessionLocal
+from lifecycle import on_shutdown, on_startup
+from metrics import POST_COMMIT_QUEUE_DEPTH, POST_COMMIT_TASKS
+
+log = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("POST_COMMIT_WORKERS", "4"))
+MAX_QUEUE = int(os.getenv("POST_COMMIT_MAX_QUEUE", "10000"))
+ATTEMPTS = int(os.getenv("POST_COMMIT_ATTEMPTS", "3"))
+BACKOFF = float(os.getenv("POST_COMMIT_BACKOFF", "0.2"))          # seconds, doubled per retry
+PUT_TIMEOUT = float(os.getenv("POST_COMMIT_PUT_TIMEOUT", "0.05"))  # then run inline
+DRAIN_TIMEOUT = float(os.getenv("POST_COMMIT_DRAIN_TIMEOUT", "10"))
+POLL_SECONDS = 0.5  # how quickly idle workers notice the stop event
+
+Hook = Callable[..., None]
+
+_hooks: dict[str, list[tuple[str, Hook]]] = {}
+_STOP = object()
+
+
+def post_commit_hook(event: str):
+    def deco(fn: Hook) -> Hook:
+        _hooks.setdefault(event, []).append((fn.__module__ + "." + fn.__name__, fn))
+        return fn
+    return deco
+
+
+class PostCommitQueue:
+    def __init__(self, workers: int = WORKERS, max_queue: int = MAX_QUEUE):
+        self._workers = workers
+        self._q: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._threads: list[threading.Thread] = []
+        self._accepting = False
+        self._stop = threading.Event()  # fallback when no _STOP can be queued
+        POST_COMMIT_QUEUE_DEPTH.set_function(self._q.qsize)
+
+    # ---------- producer side ----------
+
+    def emit(self, event: str, **payload):
+        """Schedule every hook registered for `event`. Call after the commit."""
+        for name, fn in _hooks.get(event, ()):
+            task = (name, fn, payload)
+            if not self._accepting:
+                self._run(task)  # not started (scripts) or shutting down
+                continue
+            try:
+                self._q.put(task, timeout=PUT_TIMEOUT)
+            except queue.Full:
+                POST_COMMIT_TASKS.labels(name, "inline").inc()
+                self._run(task)
+
+    # ---------- worker side ----------
+
+    def _run(self, task):
+        name, fn, payload = task
+        for attempt in range(1, ATTEMPTS + 1):
+            db = SessionLocal()
+            try:
+                fn(db, **payload)
+                db.commit()
+                POST_COMMIT_TASKS.labels(name, "ok").inc()
+                return
+            except Exception:
+                db.rollback()
+                if attempt == ATTEMPTS:
+                    POST_COMMIT_TASKS.labels(name, "failed").inc()
+                    log.exception("post-commit hook %s failed after %d attempts: %r", name, attempt, payload)
+                    return
+                POST_COMMIT_TASKS.labels(name, "retried").inc()
+                time.sleep(BACKOFF * 2 ** (attempt - 1))
+            finally:
+                db.close()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                task = self._q.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+            try:
+                if task is _STOP:
+                    return
+                self._run(task)
+            finally:
+                self._q.task_done()
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self._workers):
+            t = threading.Thread(target=self._loop, name=f"post-commit-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        self._accepting = True
+
+    def stop(self, timeout: float = DRAIN_TIMEOUT):
+        """Stop accepting, drain what is queued, then stop the workers."""
+        self._accepting = False
+        deadline = time.monotonic() + timeout
+        for _ in self._threads:
+            try:
+                # behind everything already queued
+                self._q.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                break  # workers stuck on a full queue: the stop event below ends them
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        self._stop.set()  # whoever is still busy exits after its current task
+        left = self._q.qsize()
+        if left:
+            log.warning("post-commit queue: %d tasks not drained within %.0fs", left, timeout)
+        self._threads = []
+
+    def join(self):
+        """Block until everything queued so far has run (scripts/benchmarks)."""
+        self._q.join()
+
+
+post_commit = PostCommitQueue()
+
+on_startup("post-commit")(post_commit.start)
+on_shutdown("post-commit")(post_commit.stop)
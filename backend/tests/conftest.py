@@ -0,0 +1,57 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures. Tests run against a throwaway SQLite file (no Postgres
+needed); run from backend/:
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="crakk-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'test.db')}")
+os.environ.setdefault("CACHE_SNAPSHOT", "0")
+os.environ.setdefault("CACHE_BUS", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from database import Base, SessionLocal, get_engine  # noqa: E402
+from models import DifficultyEnum, Problem, SubjectEnum, User  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    engine = get_engine()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_problem(db):
+    def make(text: str = "a block on a ramp", subject: SubjectEnum = SubjectEnum.physics, **kw) -> Problem:
+        p = Problem(
+            subject=subject, topic="kinematics", chapter="Motion", difficulty=DifficultyEnum.easy,
+            question_tex=text, option_a_tex="1", option_b_tex="2", option_c_tex="3", option_d_tex="4",
+            correct_option="A", **kw,
+        )
+        db.add(p)
+        db.commit()
+        return p
+    return make
+
+
+@pytest.fixture
+def make_user(db):
+    def make(uid: str = "u1", **kw) -> User:
+        u = User(firebase_uid=uid, email=f"{uid}@example.com", **kw)
+        db.add(u)
+        db.commit()
+        return u
+    return make
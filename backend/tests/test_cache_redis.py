@@ -0,0 +1,122 @@
+# backend/tests/test_cache_redis.py
+"""The Redis tier of cache.py against a local stand-in server (fakeredis over TCP)."""
+import itertools
+import socket
+import threading
+import time
+
+import pytest
+
+import cache
+
+fakeredis = pytest.importorskip("fakeredis")
+redis = pytest.importorskip("redis")
+
+_ns = itertools.count()
+
+
+@pytest.fixture(scope="module")
+def redis_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = fakeredis.TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    server.daemon_threads = True  # don't wait for client connections at exit
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{port}/0"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tier(redis_url, monkeypatch):
+    t = cache._RedisTier(redis_url)
+    monkeypatch.setattr(cache, "_redis", t)
+    monkeypatch.setattr(cache, "_coherent", False)
+    yield t
+    t.call("flushall")
+
+
+def _workers(n=2, **kw):
+    """n Cache objects on one namespace: n workers sharing the Redis tier."""
+    ns = f"t{next(_ns)}"
+    return [cache.Cache(ns, **kw) for _ in range(n)]
+
+
+def test_value_set_by_one_worker_is_read_by_another(tier):
+    a, b = _workers()
+    assert a.shared and b.shared
+    a.set("k", {"x": 1})
+    assert b.get("k") == {"x": 1}
+    assert tier.call("exists", a._rkey("k")) == 1
+
+
+def test_delete_removes_the_shared_copy(tier):
+    a, b = _workers()
+    a.set("k", 1)
+    a.delete("k")
+    assert tier.call("exists", a._rkey("k")) == 0
+    assert b.get("k", None) is None
+
+
+def test_single_flight_across_workers(tier):
+    a, b = _workers()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.3)
+        return "v"
+
+    results = []
+    threads = [threading.Thread(target=lambda c=c: results.append(c.get_or_load("k", loader))) for c in (a, b)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["v", "v"]
+    assert len(calls) == 1  # the other worker waited on the SET NX lock and read the value
+    assert tier.call("exists", a._rkey("k") + ":lock") == 0
+
+
+def test_load_overlapping_a_delete_is_not_kept(tier):
+    (a,) = _workers(1)
+    started, release = threading.Event(), threading.Event()
+
+    def loader():
+        started.set()
+        release.wait(2)
+        return "old"
+
+    t = threading.Thread(target=lambda: a.get_or_load("k", loader))
+    t.start()
+    started.wait(2)
+    a.delete("k")  # a write landed while the old value was being built
+    release.set()
+    t.join()
+    assert a.get("k", None) is None
+    assert tier.call("exists", a._rkey("k")) == 0
+
+
+def test_local_copies_are_short_lived_unless_coherent(tier):
+    a, b = _workers(default_ttl=600)
+    a.set("k", 1)
+    ((_, left, _),) = a.export_local()
+    assert left <= cache.LOCAL_TTL_WITH_REDIS
+
+    cache.set_coherent(True)
+    b.set("k", 2)
+    ((_, left, _),) = b.export_local()
+    assert left > cache.LOCAL_TTL_WITH_REDIS
+
+
+def test_unreachable_redis_falls_back_to_local(monkeypatch):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]  # nothing listens here
+    monkeypatch.setattr(cache, "_redis", cache._RedisTier(f"redis://127.0.0.1:{port}/0"))
+    (a,) = _workers(1)
+    a.set("k", 1)
+    assert a.get("k") == 1
+    assert a.get_or_load("m", lambda: 2) == 2
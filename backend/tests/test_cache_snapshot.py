@@ -0,0 +1,52 @@
+# backend/tests/test_cache_snapshot.py
+import os
+import time
+
+import cache_snapshot
+from cache import Cache
+
+
+def _worker(monkeypatch, pid):
+    monkeypatch.setattr(cache_snapshot, "_own_file", lambda path: f"{path}.{pid}")
+
+
+def test_workers_keep_separate_snapshots_and_startup_takes_the_newest(db, tmp_path, monkeypatch):
+    c = Cache("snaptest", default_ttl=60, shared=False, snapshot_stamp="SELECT 1")
+    monkeypatch.setattr(cache_snapshot, "_snapshotted", lambda: {"snaptest": c})
+    path = str(tmp_path / "crakk-cache.snapshot")
+
+    _worker(monkeypatch, 101)
+    c.set("k", "old")
+    assert cache_snapshot.save(path) == 1
+    os.utime(path + ".101", (time.time() - 60, time.time() - 60))
+
+    _worker(monkeypatch, 102)
+    c.clear()
+    c.set("k", "new")
+    cache_snapshot.save(path)
+
+    assert sorted(os.listdir(tmp_path)) == ["crakk-cache.snapshot.101", "crakk-cache.snapshot.102"]
+    c.clear()
+    assert cache_snapshot.load(path) == {"snaptest": 1}
+    assert c.get("k") == "new"
+
+
+def test_load_skips_unreadable_files_and_prunes_expired_ones(db, tmp_path, monkeypatch):
+    c = Cache("snaptest", default_ttl=60, shared=False, snapshot_stamp="SELECT 1")
+    monkeypatch.setattr(cache_snapshot, "_snapshotted", lambda: {"snaptest": c})
+    path = str(tmp_path / "crakk-cache.snapshot")
+
+    _worker(monkeypatch, 101)
+    c.set("k", "good")
+    cache_snapshot.save(path)
+    os.utime(path + ".101", (time.time() - 60, time.time() - 60))
+    (tmp_path / "crakk-cache.snapshot.102").write_bytes(b"garbage")
+    expired = tmp_path / "crakk-cache.snapshot.103"
+    expired.write_bytes(b"garbage")
+    old = time.time() - cache_snapshot.MAX_AGE - 60
+    os.utime(expired, (old, old))
+
+    c.clear()
+    assert cache_snapshot.load(path) == {"snaptest": 1}
+    assert c.get("k") == "good"
+    assert not expired.exists()
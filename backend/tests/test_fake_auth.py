@@ -0,0 +1,35 @@
+# backend/tests/test_fake_auth.py
+import pytest
+
+import firebase_admin_init
+
+
+@pytest.fixture
+def fresh_check(monkeypatch):
+    monkeypatch.setattr(firebase_admin_init, "_fake_checked", False)
+    monkeypatch.delenv("GOOGLE_APPLICATION_CREDENTIALS", raising=False)
+    monkeypatch.setattr(firebase_admin_init, "SERVICE_ACCOUNT_FILE", "/nonexistent/serviceAccountKey.json")
+    return monkeypatch
+
+
+@pytest.mark.parametrize("url", [
+    "sqlite:////tmp/x.db",
+    "postgresql+psycopg2://postgres@127.0.0.1:5432/crakk_bench",
+    "postgresql+psycopg2://postgres@/postgres?host=/tmp/pgdata",
+])
+def test_fake_auth_allowed_on_local_databases(fresh_check, url):
+    fresh_check.setenv("DATABASE_URL", url)
+    firebase_admin_init.check_fake_auth()
+
+
+def test_fake_auth_refused_on_remote_database(fresh_check):
+    fresh_check.setenv("DATABASE_URL", "postgresql+psycopg2://app:pw@db.example.com:5432/crakk")
+    with pytest.raises(RuntimeError):
+        firebase_admin_init.check_fake_auth()
+
+
+def test_fake_auth_refused_with_credentials(fresh_check):
+    fresh_check.setenv("DATABASE_URL", "sqlite:////tmp/x.db")
+    fresh_check.setenv("GOOGLE_APPLICATION_CREDENTIALS", "/secrets/key.json")
+    with pytest.raises(RuntimeError):
+        firebase_admin_init.check_fake_auth()
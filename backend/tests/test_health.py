@@ -0,0 +1,42 @@
+# backend/tests/test_health.py
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from health import is_db_down_error
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+
+def _op(orig):
+    return OperationalError("SELECT 1", {}, orig)
+
+
+@pytest.mark.parametrize("message", [
+    'could not connect to server: Connection refused\n\tIs the server running on host "db"?',
+    "server closed the connection unexpectedly",
+    "timeout expired",
+])
+def test_connection_failures_are_down(message):
+    assert is_db_down_error(_op(psycopg2.OperationalError(message)))
+
+
+@pytest.mark.parametrize("orig", [
+    sqlite3.OperationalError("database is locked"),
+    sqlite3.OperationalError("no such table: problems"),
+    psycopg2.OperationalError("invalid dsn: missing \"=\" after \"x\""),
+])
+def test_other_operational_errors_are_not(orig):
+    assert not is_db_down_error(_op(orig))
+
+
+def test_invalidated_connection_is_down():
+    err = _op(sqlite3.OperationalError("disk I/O error"))
+    err.connection_invalidated = True
+    assert is_db_down_error(err)
+
+
+def test_non_operational_errors_are_not():
+    assert not is_db_down_error(IntegrityError("INSERT", {}, sqlite3.IntegrityError("UNIQUE constraint failed")))
+    assert not is_db_down_error(ValueError("boom"))
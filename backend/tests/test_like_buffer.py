@@ -0,0 +1,59 @@
+# backend/tests/test_like_buffer.py
+from database import SessionLocal
+from services.like_buffer import LikeBuffer
+
+
+def test_count_read_during_flush_is_not_double_counted(db, make_problem, make_user):
+    p, u = make_problem(), make_user()
+
+    def session_factory():
+        # a request reads the count right after the batch commits, while it is still in flight
+        s = SessionLocal()
+        commit = s.commit
+
+        def commit_then_count():
+            commit()
+            buf.count(db, p.id)
+        s.commit = commit_then_count
+        return s
+
+    buf = LikeBuffer(session_factory)
+    assert buf.toggle(db, u.id, p.id) is True  # no count cached yet: the read above is a miss
+    assert buf.flush() == 1
+    assert buf.count(db, p.id) == 1
+    assert buf.is_liked(db, u.id, p.id)
+
+
+def test_toggle_twice_writes_nothing(db, make_problem, make_user):
+    p, u = make_problem(), make_user()
+    buf = LikeBuffer(SessionLocal)
+    buf.toggle(db, u.id, p.id)
+    buf.toggle(db, u.id, p.id)
+    assert buf.flush() == 0
+    assert buf.count(db, p.id) == 0
+
+
+def test_counts_for_many_problems_is_one_query(db, make_problem, make_user):
+    from sqlalchemy import event
+
+    from database import get_engine
+    from models import ProblemLike
+
+    ps, u, v = [make_problem() for _ in range(4)], make_user("u1"), make_user("u2")
+    db.add_all([ProblemLike(user_id=v.id, problem_id=ps[0].id), ProblemLike(user_id=v.id, problem_id=ps[1].id)])
+    db.commit()
+    buf = LikeBuffer(SessionLocal)
+    ids = [p.id for p in ps]
+    buf.toggle(db, u.id, ids[1])  # pending, not flushed
+
+    statements = []
+    listener = lambda *a: statements.append(a[2])  # noqa: E731
+    event.listen(get_engine(), "before_cursor_execute", listener)
+    try:
+        counts = buf.counts(db, ids)
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", listener)
+
+    assert counts == {ids[0]: 1, ids[1]: 2, ids[2]: 0, ids[3]: 0}
+    assert len(statements) == 1
+    assert buf.counts(db, [ids[1]]) == {ids[1]: 2}  # now cached
@@ -0,0 +1,18 @@
+# backend/tests/test_problem_admin.py
+from services import problem_admin
+
+ITEM = dict(subject="physics", topic="t", chapter="c", difficulty="easy", question_tex="q", option_a_tex="a",
+            option_b_tex="b", option_c_tex="c", option_d_tex="d", correct_option="A")
+
+
+def test_patch_against_an_old_version_conflicts(db):
+    (created,) = problem_admin.create_batch(db, [ITEM])["applied"]
+    first = problem_admin.patch_batch(db, [{**created, "hint_tex": "h"}])
+    (applied,) = first["applied"]
+    assert applied["updated_at"] != created["updated_at"]
+
+    stale = problem_admin.patch_batch(db, [{**created, "hint_tex": "h2"}])
+    assert stale["applied"] == [] and stale["conflicts"][0]["id"] == created["id"]
+
+    again = problem_admin.patch_batch(db, [{**applied, "hint_tex": "h3"}])
+    assert [r["id"] for r in again["applied"]] == [created["id"]]
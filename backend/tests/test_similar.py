@@ -0,0 +1,37 @@
+# backend/tests/test_similar.py
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from models import Problem, ProblemNeighbor
+from services import similar
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_top_pads_to_k_columns():
+    sc = np.array([[0.9, 0.5, 0.7]])
+    idx, top = similar._top(np.array([[4, 5, 6]]), sc, 5)
+    assert idx.shape == top.shape == (1, 5)
+    assert idx[0].tolist() == [4, 6, 5, -1, -1]
+
+
+def test_incremental_refresh_on_subject_smaller_than_k(db, make_problem, monkeypatch):
+    monkeypatch.setattr(similar, "FULL_REFRESH_SHARE", 1.0)  # keep the edit on the incremental path
+    words = ["velocity", "acceleration", "projectile", "momentum", "friction"]
+    for w in words:
+        make_problem(f"a {w} problem about a block and {w} on a ramp", created_at=T0, updated_at=T0)
+    assert len(words) < similar.K
+
+    now = T0 + timedelta(hours=1)
+    assert similar.refresh(db, full=True, now=now)["full"]
+
+    edited = db.query(Problem).order_by(Problem.id).first()
+    edited.question_tex = "a velocity problem about a block sliding with friction"
+    edited.updated_at = now
+    db.commit()
+
+    result = similar.refresh(db, now=now + timedelta(hours=1))
+    assert not result["full"] and result["searched"] == 1
+    ranks = [r for (r,) in db.query(ProblemNeighbor.rank).filter_by(problem_id=edited.id)]
+    assert 0 < len(ranks) < similar.K
@@ -0,0 +1,37 @@
+# backend/tests/test_tasks.py
+import threading
+import time
+
+import tasks
+
+
+def test_stop_returns_with_a_full_queue_and_a_stuck_worker(db, monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+
+    def stuck(db, **_):
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setitem(tasks._hooks, "test-stuck", [("stuck", stuck)])
+    q = tasks.PostCommitQueue(workers=1, max_queue=1)
+    q.start()
+    q.emit("test-stuck")
+    assert started.wait(2)
+    q.emit("test-stuck")  # fills the queue behind the stuck task
+
+    t0 = time.monotonic()
+    q.stop(timeout=0.3)
+    assert time.monotonic() - t0 < 1.0
+    release.set()
+
+
+def test_stop_drains_what_is_queued(db, monkeypatch):
+    done = []
+    monkeypatch.setitem(tasks._hooks, "test-count", [("count", lambda db, i, **_: done.append(i))])
+    q = tasks.PostCommitQueue(workers=2, max_queue=100)
+    q.start()
+    for i in range(20):
+        q.emit("test-count", i=i)
+    q.stop(timeout=5)
+    assert sorted(done) == list(range(20))
@@ -0,0 +1,30 @@
+# backend/tests/test_user_state.py
+from models import ProblemLike, UserAnswer
+from services.user_state import UserStateCache, _versions
+
+
+def test_note_answer_updates_this_worker_and_bumps_the_version(db, make_problem, make_user):
+    p, u = make_problem(), make_user()
+    state = UserStateCache()
+    assert state.answered(db, u.id, [p.id]) == set()
+    before = _versions.get(str(u.id), None)
+
+    db.add(UserAnswer(user_id=u.id, problem_id=p.id, chosen_option="A", is_correct=True))
+    db.commit()
+    state.note_answer(u.id, p.id)  # post-commit queue not started: the announce runs inline
+
+    assert state.answered(db, u.id, [p.id]) == {p.id}
+    assert _versions.get(str(u.id), None) != before
+
+
+def test_note_flushed_reloads_from_the_db(db, make_problem, make_user):
+    p, u = make_problem(), make_user()
+    state = UserStateCache()
+    assert state.liked(db, u.id, [p.id]) == set()
+
+    db.add(ProblemLike(user_id=u.id, problem_id=p.id))
+    db.commit()
+    state.note_flushed(db, [u.id])
+    db.commit()
+
+    assert state.liked(db, u.id, [p.id]) == {p.id}
@@ -1,4 +1,10 @@
-from backend.database import engine
+import os
+import sys
+
+# backend modules import each other without the "backend." prefix
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from database import engine
 from sqlalchemy import inspect
 
 insp = inspect(engine)